@@ -77,6 +77,8 @@ LOCAL_DATA_LOG_FILE = os.path.join(LOCAL_DATA_LOG_DIR, "titandash.log")
 LOCAL_DATA_DEBUG_DIR = os.path.join(LOCAL_DATA_DIR, "debug")
 # File to store titandash debug json data in.
 LOCAL_DATA_DEBUG_FILE = os.path.join(LOCAL_DATA_DEBUG_DIR, "debug.json")
+# File to store learned template locations in.
+LOCAL_DATA_LOCATIONS_FILE = os.path.join(LOCAL_DATA_DIR, "locations.json")
 
 # Testing directory.
 TEST_DIR = os.path.join(TITANDASH_DIR, "tests")
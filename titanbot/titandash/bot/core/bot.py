@@ -13,7 +13,13 @@ from titanauth.authentication.wrapper import AuthWrapper
 
 from .maps import *
 from .props import Props
-from .grabber import Grabber
+from .grabber import Grabber, ColorCheck
+from .templates import templates
+from .locations import locations
+from .matchcache import matches
+from .digits import digits
+from .state import ScreenClassifier
+from .tracker import StageTracker
 from .stats import Stats
 from .wrap import DynamicAttrs
 from .decorators import BotProperty as bot_property
@@ -22,7 +28,7 @@ from .utilities import (
     click_on_point, click_on_image, drag_mouse, strfdelta,
     strfnumber, sleep, send_raid_notification, globals
 )
-from .constants import FUNCTION_LOOP_TIMEOUT, BOSS_LOOP_TIMEOUT
+from .constants import FUNCTION_LOOP_TIMEOUT, BOSS_LOOP_TIMEOUT, CAPTURE_PRODUCER_ENABLED
 from .live import LiveConfiguration, LiveLogger
 
 from pyautogui import FailSafeException
@@ -32,7 +38,12 @@ from apscheduler.schedulers.background import BackgroundScheduler
 
 import datetime
 import random
-import win32clipboard
+
+# Raid results are copied through the clipboard, only available through win32.
+try:
+    import win32clipboard
+except ImportError:
+    win32clipboard = None
 
 
 class TerminationEncountered(Exception):
@@ -72,7 +83,6 @@ class Bot(object):
         self.PAUSE = False
         self.VALID_AUTHENTICATION = True
 
-        self.last_stage = None
         self.owned_artifacts = None
         self.next_artifact_index = None
         self.next_artifact_upgrade = None
@@ -117,10 +127,18 @@ class Bot(object):
         self.props = Props(
             instance=self.instance
         )
+        # Templates are shared between every bot instance in the process,
+        # preloading only ever decodes each image once.
+        templates.preload()
         self.grabber = Grabber(
             window=self.window,
             logger=self.logger
         )
+        # Screen states are classified from a single batched search of the
+        # current frame, re-used until input is sent to the window.
+        self.classifier = ScreenClassifier(
+            grabber=self.grabber
+        )
         self.stats = Stats(
             instance=self.instance,
             images=self.images,
@@ -129,6 +147,16 @@ class Bot(object):
             configuration=configuration,
             logger=self.logger.logger
         )
+        # The current stage is only parsed once the stage region changes
+        # within the frames captured by the grabber.
+        self.tracker = StageTracker(
+            grabber=self.grabber,
+            props=self.props,
+            parse=self.stats.parse_stage,
+            logger=self.logger.logger,
+            validate=self.valid_stage
+        )
+        self.tracker.start()
 
         self.instance.log = self.stats.session.log
         self.instance.start(session=self.stats.session)
@@ -394,12 +422,25 @@ class Bot(object):
             self.logger.warning("text: {text}".format(text=stage_text))
             self.ADVANCED_START = None
 
+    def valid_stage(self, stage):
+        """
+        Determine whether or not a stage parsed is valid, stages above the stage cap, or below the users
+        advanced start are parsed incorrectly.
+        """
+        if stage > STAGE_CAP:
+            return False
+        if self.ADVANCED_START and stage < self.ADVANCED_START:
+            return False
+
+        return True
+
     @bot_property(interval=3, wrap_name=False)
     def parse_current_stage(self):
         """
-        Attempt to update the current stage attribute through an OCR check in game. The current_stage
-        attribute is initialized as None, and if the current stage parsed here is unable to be coerced into
-        an integer, it will be set back to None.
+        Attempt to update the current stage attribute through our stage tracker. The stage region is checked
+        for changes, and the stage is only parsed when the region has changed since the stage was last parsed.
+        Frames captured while the bot is running are checked for changes as they're captured, the stage itself is only
+        parsed here, so capturing a frame never waits on a parse.
 
         When using the attribute, a check should be performed to ensure it isn't None before running
         numeric friendly conditionals.
@@ -407,21 +448,7 @@ class Bot(object):
         Note, we do not wrap our current function implementation since we use this function
         through our background scheduler implementation.
         """
-        try:
-            stage = int(self.stats.stage_ocr())
-            if stage > STAGE_CAP:
-                return
-            if self.ADVANCED_START and stage < self.ADVANCED_START:
-                return
-
-            self.logger.debug("current stage parsed as: {stage}".format(stage=strfnumber(number=stage)))
-            self.last_stage = self.props.current_stage
-            self.props.current_stage = stage
-
-        # ValueError when the parsed stage isn't able to be coerced.
-        except ValueError:
-            self.logger.debug("current stage could not be parsed... skipping.")
-            pass
+        self.tracker.track()
 
     @bot_property(queueable=True, reload=True, tooltip="Calculate the enabled minigames as well as the order they are executed.")
     def calculate_minigames_order(self):
@@ -539,8 +566,11 @@ class Bot(object):
                 ready = True
 
         # Our first timed threshold is one of our main thresholds, if that has not been reached yet,
-        # then we go ahead and check the rest of our thresholds.
+        # then we go ahead and check the rest of our thresholds. The stage region is tracked first, so any
+        # stage change since the stage was last tracked is used.
         if not ready:
+            self.tracker.track()
+
             # Current stage must not be None, using time gate before this check. stage == None is only possible when
             # OCR checks are failing, this can happen when a stage change happens as the check takes place, causing
             # the image recognition to fail. OR if the parsed text doesn't pass the validation checks when parse is
@@ -1036,11 +1066,12 @@ class Bot(object):
                         pause=0.5
                     )
 
-        def can_level(key):
+        def can_level(keys):
             """
-            Check to see if a skill can currently be levelled or not.
+            Check to see which of the skills specified can currently be levelled, probing every skill in a single frame.
             """
-            return not self.grabber.point_is_color(point=SKILL_CAN_LEVEL_LOCS[key], color=self.colors.SKILL_CANT_LEVEL)
+            cant_level = self.grabber.probe(checks=[ColorCheck(point=SKILL_CAN_LEVEL_LOCS[key], color=self.colors.SKILL_CANT_LEVEL) for key in keys])
+            return {key: not cant for key, cant in zip(keys, cant_level)}
 
         def active(key):
             """
@@ -1061,6 +1092,10 @@ class Bot(object):
                     # for use with the skill levelling events.
                     self.goto_master(collapsed=False)
 
+                    # Checking every uncapped skill at once, this is only checked again
+                    # once a skill has been levelled and our gold has been spent.
+                    levellable = can_level(keys=list(uncapped))
+
                     # Looping through all available uncapped skills.
                     for skill, values in uncapped.items():
                         if active(key=skill):
@@ -1068,7 +1103,7 @@ class Bot(object):
                             continue
                         # Can the skill even be levelled at this point?
                         # If we do not have enough gold, we should just skip this process.
-                        if not can_level(key=skill):
+                        if not levellable[skill]:
                             self.logger.info("{skill} can not be levelled currently and will not be levelled yet.".format(skill=skill))
                             continue
 
@@ -1100,6 +1135,8 @@ class Bot(object):
                                 region=SKILL_LEVEL_COORDS[skill]
                             )
 
+                        levellable.update(can_level(keys=list(uncapped)))
+
                 # Recalculate the next skill level process.
                 self.calculate_next_skills_level()
                 return True
@@ -1555,14 +1592,15 @@ class Bot(object):
         """
         Determine whether or not any artifacts should be purchased, and purchase them.
         """
-        def purchase_new(image, point, color):
+        def purchase_new(image, point, available):
             """
-            Given an image, point and color, use as a helper function to either discover or enchant an artifact.
+            Given an image, point and whether or not the point is the color expected, use as a helper
+            function to either discover or enchant an artifact.
             """
             # Is the image on the screen?
             if self.grabber.search(image=image, bool_only=True):
                 # Is the specified color present in the point chosen.
-                if self.grabber.point_is_color(point=point, color=color):
+                if available:
                     # Click to enchant/discover artifact.
                     self.logger.info("performing...")
                     self.click(
@@ -1579,6 +1617,8 @@ class Bot(object):
                         interval=0.5,
                         pause=2
                     )
+                    return True
+            return False
 
         # Check for discovery/enchantment first.
         if self.configuration.enable_artifact_discover_enchant:
@@ -1586,19 +1626,29 @@ class Bot(object):
             if not self.goto_artifacts():
                 return False
 
+            # Both discovery and enchantment colors are checked in a single frame.
+            discover, enchant = self.grabber.probe(checks=[
+                ColorCheck(point=self.locs.discover_point, color=self.colors.DISCOVER),
+                ColorCheck(point=self.locs.enchant_point, color=self.colors.ENCHANT)
+            ])
+
             # Checking for discover available.
             self.logger.info("checking if artifact discovery can be performed.")
-            purchase_new(
+            discovered = purchase_new(
                 image=self.images.discover,
                 point=self.locs.discover_point,
-                color=self.colors.DISCOVER
+                available=discover
             )
+            # Discovering an artifact spends relics, so enchantment must be checked again.
+            if discovered:
+                enchant = self.grabber.point_is_color(point=self.locs.enchant_point, color=self.colors.ENCHANT)
+
             # Checking for enchant available.
             self.logger.info("checking if artifact enchantment can be performed.")
             purchase_new(
                 image=self.images.enchant,
                 point=self.locs.enchant_point,
-                color=self.colors.ENCHANT
+                available=enchant
             )
 
         if self.configuration.enable_artifact_purchase:
@@ -2194,6 +2244,10 @@ class Bot(object):
                     pause=1
                 )
 
+                if win32clipboard is None:
+                    self.logger.warning("clipboard is unavailable on this platform, giving up...")
+                    return False
+
                 win32clipboard.OpenClipboard()
                 results = win32clipboard.GetClipboardData()
                 win32clipboard.CloseClipboard()
@@ -2443,7 +2497,7 @@ class Bot(object):
         We can do this by simply making sure that our settings icon is available on the screen,
         since this button is ALWAYS visible as long as no panel is expanded currently.
         """
-        if self.grabber.search(image=[self.images.settings, self.images.clan_raid_ready, self.images.clan_no_raid], bool_only=True):
+        if self.classifier.classify().screen:
             return True
 
         # If we reach this point, it means our settings are not yet available, let's minimize
@@ -2464,13 +2518,13 @@ class Bot(object):
         return self.no_panel()
 
     @not_in_transition
-    def goto_panel(self, panel, icon, top_find, bottom_find, collapsed=True, top=True, equipment_tab=None):
+    def goto_panel(self, panel, top_find, bottom_find, collapsed=True, top=True, equipment_tab=None):
         """
         Goto a specific panel, panel represents the key of this panel, also used when determining what panel
         to click on initially.
 
-        Icon represents the image in game that represents a panel being open. This image is searched
-        for initially before attempting to move to the top or bottom of the specified panel.
+        The current screen state is classified initially to determine which panel is open (if any), before
+        attempting to move to the top or bottom of the specified panel.
 
         NOTE: This function will return a boolean to determine if the panel was reached successfully. This can be
               used to exit out of actions or other pieces of bot functionality early if something has gone wrong.
@@ -2482,7 +2536,7 @@ class Bot(object):
             collapse_expand="collapsed" if collapsed else "expanded", top_bot="top" if top else "bottom", panel=panel))
 
         loops = 0
-        while not self.grabber.search(icon, bool_only=True):
+        while not self.classifier.classify().is_open(panel):
             if loops == FUNCTION_LOOP_TIMEOUT:
                 self.logger.warning("error occurred while travelling to {panel} panel, exiting function early.".format(panel=panel))
                 return False
@@ -2498,7 +2552,7 @@ class Bot(object):
             # Ensure the panel is expanded/collapsed appropriately.
             loops = 0
             if collapsed:
-                while not self.grabber.search(self.images.expand_panel, bool_only=True):
+                while not self.classifier.classify().collapsed:
                     if loops == FUNCTION_LOOP_TIMEOUT:
                         self.logger.warning("unable to collapse panel: {panel}, exiting function early.".format(panel=panel))
                         return False
@@ -2510,7 +2564,7 @@ class Bot(object):
                         offset=1
                     )
             else:
-                while not self.grabber.search(self.images.collapse_panel, bool_only=True):
+                while not self.classifier.classify().expanded:
                     if loops == FUNCTION_LOOP_TIMEOUT:
                         self.logger.warning("unable to expand panel: {panel}, exiting function early.".format(panel=panel))
                         return False
@@ -2605,7 +2659,6 @@ class Bot(object):
         """
         return self.goto_panel(
             "master",
-            self.images.master_active,
             self.images.master,
             self.images.silent_march,
             collapsed=collapsed,
@@ -2618,7 +2671,6 @@ class Bot(object):
         """
         return self.goto_panel(
             "heroes",
-            self.images.heroes_active,
             None,
             None,
             collapsed=collapsed,
@@ -2631,7 +2683,6 @@ class Bot(object):
         """
         return self.goto_panel(
             "equipment",
-            self.images.equipment_active,
             None,
             None,
             collapsed=collapsed,
@@ -2645,7 +2696,6 @@ class Bot(object):
         """
         return self.goto_panel(
             "pets",
-            self.images.pets_active,
             None,
             None,
             collapsed=collapsed,
@@ -2658,7 +2708,6 @@ class Bot(object):
         """
         return self.goto_panel(
             "artifacts",
-            self.images.artifacts_active,
             None,
             None,
             collapsed=collapsed,
@@ -2671,7 +2720,6 @@ class Bot(object):
         """
         return self.goto_panel(
             "shop",
-            self.images.shop_active,
             self.images.shop_keeper,
             None,
             collapsed=collapsed,
@@ -2704,7 +2752,7 @@ class Bot(object):
         """
         Instruct the bot to make sure no panels are currently open.
         """
-        while self.grabber.search(image=self.images.exit_panel, bool_only=True):
+        while self.classifier.classify().exit:
             loops = 0
             while loops != FUNCTION_LOOP_TIMEOUT:
                 found = self.find_and_click(
@@ -2818,6 +2866,9 @@ class Bot(object):
         # type functions.
         if self.scheduler.state == STATE_STOPPED:
             self.scheduler.start()
+        # Frames are produced in the background for the duration of the session if enabled.
+        if CAPTURE_PRODUCER_ENABLED:
+            self.window.start_producer()
 
         # Parse current skill levels, done once on initialization
         # and taken care of by our prestige function for every prestige.
@@ -2941,6 +2992,16 @@ class Bot(object):
                 # Stop the schedulers functionality once the session has been stopped.
                 if self.scheduler.state in [STATE_RUNNING, STATE_PAUSED]:
                     self.scheduler.shutdown(wait=False)
+                self.window.close()
+
+                # Learned template locations are persisted so the next session can make use of them.
+                self.logger.info("template locations: {stats}".format(stats=locations.stats()))
+                locations.save()
+                self.logger.info("match cache: {stats}".format(stats=matches.stats()))
+                self.logger.info("digit recognizer: {stats}".format(stats=digits.stats()))
+                self.logger.info("ocr cache: {stats}".format(stats=self.stats.ocr_cache.stats()))
+                self.logger.info("stage tracker: {stats}".format(stats=self.tracker.stats()))
+                self.tracker.stop()
 
                 self.stats.session.end = timezone.now()
                 self.stats.session.save()
@@ -0,0 +1,415 @@
+from threading import Lock
+
+import numpy as np
+import sys
+import ctypes
+import ctypes.util
+
+# Capture backends rely on platform specific libraries, only the libraries
+# available on the current platform are ever imported.
+try:
+    import win32gui
+    import win32ui
+    import win32con
+    from ctypes import windll
+except ImportError:
+    win32gui = win32ui = win32con = windll = None
+
+try:
+    from Xlib import X
+    from Xlib.display import Display
+    from Xlib.protocol import rq
+except ImportError:
+    X = Display = rq = None
+
+
+class CaptureBackendUnavailable(Exception):
+    pass
+
+
+class CaptureBackend(object):
+    """
+    Base capture backend, a backend is responsible for grabbing the pixels present in a single window.
+
+    Backends return the window as a (height, width, 4) BGRX array. A region (x1, y1, x2, y2) in window
+    bitmap coordinates may be specified, backends only grab the pixels within it where the platform allows.
+    """
+    name = None
+
+    def __init__(self, window):
+        self.window = window
+
+    def __str__(self):
+        return "{name} ({window})".format(name=self.name, window=self.window.hwnd)
+
+    def __repr__(self):
+        return "<CaptureBackend: {backend}>".format(backend=self)
+
+    @classmethod
+    def available(cls):
+        """
+        Determine if the backend can be used on the current platform.
+        """
+        return True
+
+    def grab(self, region=None):
+        """
+        Grab the contents of the window (or a region of the window) as a BGRX array.
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """
+        Release any resources held by the backend.
+        """
+        pass
+
+
+class DebugCaptureBackend(CaptureBackend):
+    """
+    Debug backend used by debug windows, blank arrays of the window size are always returned.
+    """
+    name = "debug"
+
+    def grab(self, region=None):
+        if region:
+            return np.zeros((region[3] - region[1], region[2] - region[0], 4), dtype=np.uint8)
+        return np.zeros((self.window.height, self.window.width, 4), dtype=np.uint8)
+
+
+class GdiCaptureBackend(CaptureBackend):
+    """
+    Windows backend, making use of PrintWindow so the window may be visible or behind another window.
+
+    Region grabs clip our memory dc to the region before the window is printed, so the window only paints
+    the pixels within the region, which are blitted out of the bitmap and read back on their own.
+
+    Device contexts and bitmaps are created once per window and re-used for every grab, only being
+    re-created when the size of the window changes. Grabs are locked per window, so separate windows
+    may be captured in parallel.
+    """
+    name = "gdi"
+
+    def __init__(self, window):
+        super(GdiCaptureBackend, self).__init__(window=window)
+        self._lock = Lock()
+        self._size = None
+        self._save_dc = None
+        self._save_bitmap = None
+        self._region_dc = None
+        self._region_bitmaps = dict()
+
+    @classmethod
+    def available(cls):
+        return win32gui is not None
+
+    def _setup(self, size):
+        """
+        Create the device contexts and bitmap used to capture a window of the specified size.
+        """
+        self._release()
+
+        hwnd_dc = win32gui.GetWindowDC(self.window.hwnd)
+        mfc_dc = win32ui.CreateDCFromHandle(hwnd_dc)
+        self._save_dc = mfc_dc.CreateCompatibleDC()
+        self._save_bitmap = win32ui.CreateBitmap()
+        self._save_bitmap.CreateCompatibleBitmap(mfc_dc, size[0], size[1])
+        self._save_dc.SelectObject(self._save_bitmap)
+        self._region_dc = mfc_dc.CreateCompatibleDC()
+
+        # Our memory dcs are independent of the window dc once created, which
+        # can be released right away instead of being held for the window lifetime.
+        mfc_dc.DeleteDC()
+        win32gui.ReleaseDC(self.window.hwnd, hwnd_dc)
+
+        self._size = size
+
+    def _release(self):
+        """
+        Release any device contexts and bitmaps currently held, dcs must be deleted before their bitmaps.
+        """
+        if self._save_dc is not None:
+            self._region_dc.DeleteDC()
+            self._save_dc.DeleteDC()
+            win32gui.DeleteObject(self._save_bitmap.GetHandle())
+            for bitmap in self._region_bitmaps.values():
+                win32gui.DeleteObject(bitmap.GetHandle())
+
+        self._size = None
+        self._save_dc = None
+        self._save_bitmap = None
+        self._region_dc = None
+        self._region_bitmaps = dict()
+
+    def _region_bitmap(self, size):
+        """
+        Retrieve the bitmap used to store regions of the specified size, regions are fixed
+        throughout the bot, so only a handful of these are ever created.
+        """
+        if size not in self._region_bitmaps:
+            bitmap = win32ui.CreateBitmap()
+            bitmap.CreateCompatibleBitmap(self._save_dc, size[0], size[1])
+            self._region_bitmaps[size] = bitmap
+
+        return self._region_bitmaps[size]
+
+    def grab(self, region=None):
+        with self._lock:
+            # Captures are sized by the current client rect, not the cached geometry of the window,
+            # so a resized window is captured at its new size and the window can detect the change.
+            rect = win32gui.GetClientRect(self.window.hwnd)
+            size = rect[2] - self.window.x_subtract, rect[3]
+            if size != self._size:
+                self._setup(size=size)
+
+            if region:
+                hdc = self._save_dc.GetSafeHdc()
+                windll.gdi32.IntersectClipRect(hdc, region[0], region[1], region[2], region[3])
+                try:
+                    windll.user32.PrintWindow(self.window.hwnd, hdc, 0)
+                finally:
+                    windll.gdi32.SelectClipRgn(hdc, None)
+
+                width, height = region[2] - region[0], region[3] - region[1]
+                self._region_dc.SelectObject(self._region_bitmap(size=(width, height)))
+                self._region_dc.BitBlt((0, 0), (width, height), self._save_dc, (region[0], region[1]), win32con.SRCCOPY)
+
+                bmp_str = self._region_bitmaps[(width, height)].GetBitmapBits(True)
+                return np.frombuffer(bmp_str, dtype=np.uint8).reshape(height, width, 4)
+
+            windll.user32.PrintWindow(self.window.hwnd, self._save_dc.GetSafeHdc(), 0)
+
+            # Bitmap bits are already laid out as BGRX rows, the array is a view into them.
+            bmp_str = self._save_bitmap.GetBitmapBits(True)
+            return np.frombuffer(bmp_str, dtype=np.uint8).reshape(size[1], size[0], 4)
+
+    def close(self):
+        with self._lock:
+            self._release()
+
+
+if rq is not None:
+    class _ShmQueryVersion(rq.ReplyRequest):
+        _request = rq.Struct(
+            rq.Card8("opcode"),
+            rq.Opcode(0),
+            rq.RequestLength(),
+        )
+        _reply = rq.Struct(
+            rq.ReplyCode(),
+            rq.Bool("shared_pixmaps"),
+            rq.Card16("sequence_number"),
+            rq.ReplyLength(),
+            rq.Card16("major_version"),
+            rq.Card16("minor_version"),
+            rq.Card16("uid"),
+            rq.Card16("gid"),
+            rq.Card8("pixmap_format"),
+            rq.Pad(15),
+        )
+
+    class _ShmAttach(rq.Request):
+        _request = rq.Struct(
+            rq.Card8("opcode"),
+            rq.Opcode(1),
+            rq.RequestLength(),
+            rq.Card32("shmseg"),
+            rq.Card32("shmid"),
+            rq.Bool("read_only"),
+            rq.Pad(3),
+        )
+
+    class _ShmDetach(rq.Request):
+        _request = rq.Struct(
+            rq.Card8("opcode"),
+            rq.Opcode(2),
+            rq.RequestLength(),
+            rq.Card32("shmseg"),
+        )
+
+    class _ShmGetImage(rq.ReplyRequest):
+        _request = rq.Struct(
+            rq.Card8("opcode"),
+            rq.Opcode(4),
+            rq.RequestLength(),
+            rq.Drawable("drawable"),
+            rq.Int16("x"),
+            rq.Int16("y"),
+            rq.Card16("width"),
+            rq.Card16("height"),
+            rq.Card32("plane_mask"),
+            rq.Card8("format"),
+            rq.Pad(3),
+            rq.Card32("shmseg"),
+            rq.Card32("offset"),
+        )
+        _reply = rq.Struct(
+            rq.ReplyCode(),
+            rq.Card8("depth"),
+            rq.Card16("sequence_number"),
+            rq.ReplyLength(),
+            rq.Card32("visual"),
+            rq.Card32("size"),
+            rq.Pad(16),
+        )
+
+
+class _SharedMemorySegment(object):
+    """
+    System V shared memory segment, attached to both our process and the x server.
+    """
+    IPC_PRIVATE = 0
+    IPC_CREAT = 0o1000
+    IPC_RMID = 0
+
+    def __init__(self, size):
+        self.size = size
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        self._libc.shmget.restype = ctypes.c_int
+        self._libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        self._libc.shmat.restype = ctypes.c_void_p
+        self._libc.shmdt.argtypes = [ctypes.c_void_p]
+        self._libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+        self.shmid = self._libc.shmget(self.IPC_PRIVATE, size, self.IPC_CREAT | 0o600)
+        if self.shmid < 0:
+            raise CaptureBackendUnavailable("unable to allocate shared memory segment: errno {errno}".format(errno=ctypes.get_errno()))
+
+        self.address = self._libc.shmat(self.shmid, None, 0)
+        if self.address in (None, ctypes.c_void_p(-1).value):
+            self.remove()
+            raise CaptureBackendUnavailable("unable to attach shared memory segment: errno {errno}".format(errno=ctypes.get_errno()))
+
+        self.buffer = (ctypes.c_ubyte * size).from_address(self.address)
+
+    def remove(self):
+        """
+        Mark the segment for removal, it is destroyed once every process has detached.
+        """
+        self._libc.shmctl(self.shmid, self.IPC_RMID, None)
+
+    def detach(self):
+        self.buffer = None
+        self._libc.shmdt(self.address)
+
+
+class XlibCaptureBackend(CaptureBackend):
+    """
+    Linux (X11) backend, making use of the MIT-SHM extension when the x server supports it so
+    that window contents are written directly into a shared memory buffer by the server.
+
+    Falling back to a regular GetImage request when shared memory is not available (ie: remote displays).
+    Region grabs request a sub-image from the server, only the region is ever transferred.
+    """
+    name = "xlib"
+
+    def __init__(self, window):
+        super(XlibCaptureBackend, self).__init__(window=window)
+        self._lock = Lock()
+        self._display = None
+        self._drawable = None
+        self._shm_opcode = None
+        self._shm_seg = None
+        self._shm_segment = None
+
+    @classmethod
+    def available(cls):
+        return Display is not None and not sys.platform.startswith("win")
+
+    def _setup(self):
+        """
+        Open our display connection and query the shared memory extension, only done once per backend.
+        """
+        self._display = Display()
+        self._drawable = self._display.create_resource_object("window", int(self.window.hwnd))
+
+        if self._display.has_extension("MIT-SHM"):
+            self._shm_opcode = self._display.display.get_extension_major("MIT-SHM")
+            _ShmQueryVersion(display=self._display.display, opcode=self._shm_opcode)
+
+    def _attach(self, size):
+        """
+        Allocate and attach a shared memory segment large enough to store the specified amount of bytes.
+        """
+        self._detach()
+        self._shm_segment = _SharedMemorySegment(size=size)
+        self._shm_seg = self._display.display.allocate_resource_id()
+
+        _ShmAttach(display=self._display.display, opcode=self._shm_opcode, shmseg=self._shm_seg, shmid=self._shm_segment.shmid, read_only=False)
+        self._display.sync()
+
+        # Both our process and the x server are attached, the segment can be marked
+        # for removal now so it is always freed, even if we exit uncleanly.
+        self._shm_segment.remove()
+
+    def _detach(self):
+        if self._shm_segment is not None:
+            _ShmDetach(display=self._display.display, opcode=self._shm_opcode, shmseg=self._shm_seg)
+            self._display.sync()
+            self._shm_segment.detach()
+            self._shm_segment = None
+            self._shm_seg = None
+
+    def grab(self, region=None):
+        with self._lock:
+            if self._display is None:
+                self._setup()
+
+            # Window geometry is retrieved from the x server directly.
+            geometry = self._drawable.get_geometry()
+            x, y, width, height = 0, 0, geometry.width, geometry.height
+            if region:
+                x, y, width, height = region[0], region[1], region[2] - region[0], region[3] - region[1]
+
+            if self._shm_opcode is None:
+                data = self._drawable.get_image(x, y, width, height, X.ZPixmap, 0xffffffff).data
+                return np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4)
+
+            # Our segment is always large enough to store the entire window, so region
+            # grabs of any size can share it without re-attaching.
+            size = geometry.width * geometry.height * 4
+            if self._shm_segment is None or self._shm_segment.size < size:
+                self._attach(size=size)
+
+            _ShmGetImage(display=self._display.display, opcode=self._shm_opcode, drawable=self._drawable, x=x, y=y, width=width, height=height, plane_mask=0xffffffff, format=X.ZPixmap, shmseg=self._shm_seg, offset=0)
+
+            # The shared buffer is re-used by the next grab, frames may outlive that, so a single
+            # copy is taken out of shared memory here.
+            return np.frombuffer(self._shm_segment.buffer, dtype=np.uint8, count=width * height * 4).reshape(height, width, 4).copy()
+
+    def close(self):
+        with self._lock:
+            if self._display is not None:
+                self._detach()
+                self._display.close()
+                self._display = None
+
+
+CAPTURE_BACKENDS = {
+    backend.name: backend for backend in (DebugCaptureBackend, GdiCaptureBackend, XlibCaptureBackend)
+}
+
+
+def capture_backend(window, name=None):
+    """
+    Retrieve the capture backend that should be used for the specified window.
+
+    An explicit backend name may be specified, otherwise the first backend available on the current
+    platform is used. Debug windows always make use of the debug backend.
+    """
+    if name:
+        backend = CAPTURE_BACKENDS[name]
+        if not backend.available():
+            raise CaptureBackendUnavailable("capture backend: {name} is not available on this platform.".format(name=name))
+        return backend(window=window)
+
+    if window.debug:
+        return DebugCaptureBackend(window=window)
+
+    for backend in (GdiCaptureBackend, XlibCaptureBackend):
+        if backend.available():
+            return backend(window=window)
+
+    raise CaptureBackendUnavailable("no capture backend is available on this platform.")
@@ -46,6 +46,103 @@ FUNCTION_LOOP_TIMEOUT = 40
 # In which case, we can continue and attempt to up this damage and try again later.
 BOSS_LOOP_TIMEOUT = int(FUNCTION_LOOP_TIMEOUT / 4)
 
+# Maximum age (in seconds) of a captured frame before the grabber will capture a new one. Frames are
+# always re-captured once any input has been sent to the window, regardless of their age.
+GRABBER_FRAME_STALENESS = 0.25
+
+# Number of threads used to match multiple templates against a single frame in parallel.
+SEARCH_POOL_WORKERS = 4
+
+# Matcher used to search for templates in the entire frame by default ("full", "pyramid").
+# The pyramid matcher finds candidates on a downscaled frame and only refines them at full resolution.
+SEARCH_MATCHER = "full"
+# Pyramid level (frame downscaled by 2 ** level) used to find candidates, lowered for any templates
+# that would be smaller than the minimum size (in pixels) at that level.
+PYRAMID_LEVEL = 1
+PYRAMID_MIN_SIZE = 16
+# Candidates are any downscaled matches within the slack of our precision, up to a maximum amount.
+PYRAMID_SLACK = 0.3
+PYRAMID_CANDIDATES = 16
+# Radius (in downscaled pixels) suppressed around each candidate, and refined at full resolution.
+PYRAMID_RADIUS = 2
+
+# Templates found at the same location (within the tolerance, in pixels) enough times in a row are considered
+# stable, stable templates are searched for in a padded region around that location before the entire frame.
+LOCATION_STABLE_HITS = 3
+LOCATION_TOLERANCE = 2
+LOCATION_PADDING = 12
+# Matches found in the padded region must score within this margin of the score the template was learned with,
+# weaker matches may be a different occurrence of the template, so the entire frame is searched instead.
+LOCATION_MARGIN = 0.05
+# Every so often, a stable template is searched for in the entire frame anyways, to ensure
+# templates that may be present more than once on the screen are detected as ambiguous.
+LOCATION_AUDIT_INTERVAL = 25
+
+# Template signatures sample the average intensity of each cell in a (grid x grid) layout over the template. A template
+# is only rejected at its learned location when the correlation of the samples is less than the correlation specified,
+# and the intersection of their normalized intensity histograms is less than the threshold.
+SIGNATURE_GRID = 6
+SIGNATURE_CORRELATION = 0.4
+SIGNATURE_HISTOGRAM_BINS = 8
+SIGNATURE_HISTOGRAM_THRESHOLD = 0.6
+
+# Maximum amount of match results cached, results are keyed on the content of the region matched against, so
+# repeatedly searching for the same template in an unchanged region re-uses the last result instead of matching again.
+MATCH_CACHE_SIZE = 512
+
+# Artifact icon cells are located in artifact panel screenshots as runs of rows whose contrast (standard deviation
+# of the intensity across the row) is at least this amount, rows between cells are a flat background.
+ARTIFACT_CELL_CONTRAST = 15
+# Artifacts are centered within their cell, only windows within this radius (in pixels) of the center are classified.
+ARTIFACT_CELL_RADIUS = 4
+# Maximum amount of artifact screenshots waiting to be recognized while parsing artifacts, scrolling waits
+# for the recognition worker once this many screenshots are waiting, bounding the screenshots held in memory.
+ARTIFACT_QUEUE_SIZE = 4
+
+# Maximum amount of tesseract engines kept alive in process, one engine is used by each thread parsing text at once.
+OCR_POOL_WORKERS = 4
+
+# Maximum amount of text cached from parsed regions, text is keyed on the region parsed and a fingerprint of its pixels,
+# so regions that haven't changed since they were last parsed re-use their previous text.
+OCR_CACHE_SIZE = 64
+# Time (in seconds) text of each kind remains cached, kinds not present here are never cached.
+OCR_CACHE_TTL = {
+    "stage": 60,
+    "advance_start": 300,
+    "skill": 300,
+    "clan_name": 600,
+    "clan_code": 600,
+}
+
+# The stage region is binarized at this threshold (the white stage digits) when checking it for changes, the stage is
+# only parsed again once more than this amount of pixels in the binarized region differ from when it was last parsed.
+STAGE_CHANGE_THRESHOLD = 230
+STAGE_CHANGE_PIXELS = 4
+
+# Digit glyphs are scaled into a square of this size (in pixels) before being correlated against the digit bank.
+DIGIT_GLYPH_SIZE = 16
+# Glyphs shorter than this ratio of the tallest glyph in a mask, or mostly outside of its rows, are treated as noise.
+DIGIT_HEIGHT_RATIO = 0.75
+# Numbers are only trusted when every digit correlates with its template by at least this score, and by this margin
+# over the next best digit, numbers that aren't trusted are parsed by tesseract instead.
+DIGIT_SCORE = 0.75
+DIGIT_MARGIN = 0.1
+# Every trusted number read this many times is also parsed by tesseract, to determine how often the two agree.
+DIGIT_AUDIT_INTERVAL = 20
+
+# Specify the capture backend used to grab window contents ("gdi", "xlib", "debug").
+# Leaving this as None will choose the first backend available on the current platform.
+CAPTURE_BACKEND = None
+
+# Background frame producer, when enabled, each bot window captures frames on a separate thread into a
+# ring buffer of preallocated frames, the grabber then reads the latest frame instead of capturing itself.
+CAPTURE_PRODUCER_ENABLED = False
+CAPTURE_PRODUCER_FPS = 10
+CAPTURE_RING_SIZE = 3
+
+# Maximum age (in seconds) of a windows cached title and geometry before it's retrieved again.
+WINDOW_GEOMETRY_TTL = 2
+
 # Specify the filter strings used to find emulator windows.
 NOX_WINDOW_FILTER = [
     "nox", "noxplayer",
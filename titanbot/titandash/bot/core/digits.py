@@ -0,0 +1,265 @@
+from .maps import IMAGES
+from .frame import Frame
+from .ocr import ocr
+from .constants import LOGGER_NAME, DIGIT_GLYPH_SIZE, DIGIT_HEIGHT_RATIO, DIGIT_SCORE, DIGIT_MARGIN, DIGIT_AUDIT_INTERVAL
+
+from PIL import Image
+
+from collections import namedtuple
+from threading import Lock
+
+import cv2
+import numpy as np
+import logging
+import os
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Number read from a thresholded mask, along with the lowest score of any digit against its template, the
+# lowest margin of any digit over the next best digit, and whether or not the number can be trusted.
+RecognizedNumber = namedtuple("RecognizedNumber", ["text", "score", "margin", "confident"])
+
+
+def process_stage(image, scale=5, threshold=100):
+    """
+    Preprocess an image of a number in the games digit font (stage, advance start) into the thresholded mask read by
+    the digit recognizer and tesseract. The image is upscaled and binarized, blobs smaller than the threshold are removed.
+    """
+    frame = image if isinstance(image, Frame) else Frame(image=image)
+
+    # Resize image.
+    image = cv2.resize(frame.array, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    # Create gray scale.
+    image = Frame.to_gray(array=image)
+    # Perform threshold on image.
+    retr, mask = cv2.threshold(image, 230, 255, cv2.THRESH_BINARY)
+
+    # Find contours.
+    contours, hier = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    # Draw black over counters smaller than 200, removing un wanted blobs from stage image.
+    for contour in contours:
+        if cv2.contourArea(contour) < threshold:
+            cv2.drawContours(mask, [contour], 0, (0,), -1)
+
+    return Image.fromarray(mask)
+
+
+class DigitRecognizer(object):
+    """
+    DigitRecognizer reads the numbers present in thresholded masks of the games fixed digit font.
+
+    The mask is segmented into connected components (glyphs), ordered from left to right. Each glyph is centered
+    in a square, scaled to a fixed size and normalized, so every glyph is correlated against the entire digit bank
+    (one learned template per digit) with a single matrix product.
+
+    Numbers that aren't read confidently are parsed by tesseract instead, confident numbers are periodically
+    parsed by tesseract as well so the agreement between the two can be reported.
+    """
+    def __init__(self, templates=IMAGES["DIGITS"], size=DIGIT_GLYPH_SIZE, ratio=DIGIT_HEIGHT_RATIO, score=DIGIT_SCORE, margin=DIGIT_MARGIN, audit=DIGIT_AUDIT_INTERVAL):
+        self.templates = templates
+        self.size = size
+        self.ratio = ratio
+        self.score = score
+        self.margin = margin
+        self.audit = audit
+
+        self._digits = sorted(templates)
+        self._bank = None
+        self._lock = Lock()
+
+        # Counters used to determine how often tesseract is avoided, and how often both agree.
+        self.recognized = 0
+        self.fallbacks = 0
+        self.audits = 0
+        self.agreements = 0
+
+    @staticmethod
+    def _normalize(matrix):
+        """
+        Normalize every row of a matrix to zero mean and unit length, rows that are flat are left as zeros.
+        """
+        matrix = matrix - matrix.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    @property
+    def bank(self):
+        if self._bank is None:
+            with self._lock:
+                if self._bank is None:
+                    self._bank = self.load()
+        return self._bank
+
+    def load(self):
+        """
+        Load the digit bank from our digit templates, digits without a template are never recognized.
+        """
+        bank = np.zeros((len(self._digits), self.size * self.size), dtype=np.float32)
+        for index, digit in enumerate(self._digits):
+            path = self.templates[digit]
+            if not os.path.exists(path):
+                logger.warning("digit template {path} does not exist, digit {digit} will not be recognized.".format(path=path, digit=digit))
+                continue
+
+            template = np.asarray(Image.open(path).convert("L"), dtype=np.float32)
+            bank[index] = cv2.resize(template, (self.size, self.size), interpolation=cv2.INTER_AREA).ravel()
+
+        return self._normalize(bank)
+
+    def save(self):
+        """
+        Save the digit bank as our digit templates, so digits learned are available to every session.
+        """
+        for digit, template in zip(self._digits, self.bank):
+            if not template.any():
+                continue
+
+            span = template.max() - template.min()
+            image = (template - template.min()) / span * 255 if span else np.zeros_like(template)
+            Image.fromarray(image.reshape(self.size, self.size).round().astype(np.uint8)).save(self.templates[digit])
+
+    def glyphs(self, mask):
+        """
+        Segment a thresholded mask into a matrix of normalized glyphs (one per row), ordered from left to right.
+
+        Components that are much shorter than the tallest component, or that sit mostly outside of its rows,
+        are noise left behind by the threshold and are ignored.
+        """
+        mask = np.asarray(mask)
+        if mask.ndim == 3:
+            mask = mask[:, :, 0]
+
+        count, labels, stats, centroids = cv2.connectedComponentsWithStats((mask > 0).astype(np.uint8), connectivity=8)
+        stats = stats[1:]
+        if not len(stats):
+            return np.zeros((0, self.size * self.size), dtype=np.float32)
+
+        top, height = stats[np.argmax(stats[:, cv2.CC_STAT_HEIGHT]), [cv2.CC_STAT_TOP, cv2.CC_STAT_HEIGHT]]
+        glyphs = []
+        for label in np.argsort(stats[:, cv2.CC_STAT_LEFT]):
+            x, y, w, h = stats[label, :4]
+            overlap = min(y + h, top + height) - max(y, top)
+            if h < height * self.ratio or overlap < h * self.ratio:
+                continue
+
+            side = max(w, h)
+            square = np.zeros((side, side), dtype=np.float32)
+            square[(side - h) // 2:(side - h) // 2 + h, (side - w) // 2:(side - w) // 2 + w] = labels[y:y + h, x:x + w] == label + 1
+            glyphs.append(cv2.resize(square, (self.size, self.size), interpolation=cv2.INTER_AREA).ravel())
+
+        if not glyphs:
+            return np.zeros((0, self.size * self.size), dtype=np.float32)
+
+        return self._normalize(np.array(glyphs, dtype=np.float32))
+
+    def recognize(self, mask):
+        """
+        Recognize the number present in a thresholded mask.
+        """
+        glyphs = self.glyphs(mask=mask)
+        if not len(glyphs):
+            return RecognizedNumber(text="", score=0.0, margin=0.0, confident=False)
+
+        scores = glyphs.dot(self.bank.T)
+        ranked = np.sort(scores, axis=1)
+        best = ranked[:, -1]
+        margin = best - ranked[:, -2] if ranked.shape[1] > 1 else best
+
+        score, margin = float(best.min()), float(margin.min())
+        return RecognizedNumber(
+            text="".join(self._digits[index] for index in np.argmax(scores, axis=1)),
+            score=score,
+            margin=margin,
+            confident=score >= self.score and margin >= self.margin
+        )
+
+    def read(self, mask, fallback):
+        """
+        Read the number present in a thresholded mask. The fallback is called with the mask to parse the number
+        when it isn't recognized confidently, or when a confident number is being audited.
+
+        The number returned retains the score and margin of the recognizer, numbers parsed by the
+        fallback are never confident.
+        """
+        number = self.recognize(mask=mask)
+        if number.confident:
+            with self._lock:
+                self.recognized += 1
+                recognized = self.recognized
+            if not self.audit or recognized % self.audit != 0:
+                return number
+
+            text = "".join(filter(lambda x: x.isdigit(), fallback(mask)))
+            with self._lock:
+                self.audits += 1
+                if text == number.text:
+                    self.agreements += 1
+            if text != number.text:
+                logger.debug("digit recognizer disagrees with tesseract: {number} != {text}".format(number=number.text, text=text))
+
+            return number
+
+        with self._lock:
+            self.fallbacks += 1
+        logger.debug("digit recognizer is not confident ({number}), falling back to tesseract.".format(number=number))
+        return number._replace(text="".join(filter(lambda x: x.isdigit(), fallback(mask))))
+
+    def learn(self, samples):
+        """
+        Learn the digit bank from samples of (mask, text), each template becomes the average of every glyph
+        of its digit. Digits not present in any sample retain their current template.
+
+        Samples whose glyphs don't line up with their text are skipped, the amount of samples learned is returned.
+        """
+        learned = {digit: [] for digit in self._digits}
+        count = 0
+        for mask, text in samples:
+            glyphs = self.glyphs(mask=mask)
+            if len(glyphs) != len(text):
+                logger.warning("{length} glyphs found for sample {text}, skipping sample.".format(length=len(glyphs), text=text))
+                continue
+
+            for glyph, digit in zip(glyphs, text):
+                learned[digit].append(glyph)
+            count += 1
+
+        bank = self.bank.copy()
+        for index, digit in enumerate(self._digits):
+            if learned[digit]:
+                bank[index] = np.mean(learned[digit], axis=0)
+
+        self._bank = self._normalize(bank)
+        return count
+
+    def stats(self):
+        """
+        Retrieve the current rates of numbers recognized without tesseract, and of audits agreeing with tesseract.
+        """
+        reads = self.recognized + self.fallbacks
+        return {
+            "recognized": self.recognized,
+            "fallbacks": self.fallbacks,
+            "audits": self.audits,
+            "agreements": self.agreements,
+            "recognized_rate": round(self.recognized / reads, 4) if reads else 0.0,
+            "agreement_rate": round(self.agreements / self.audits, 4) if self.audits else 0.0
+        }
+
+
+digits = DigitRecognizer()
+
+
+def read_mask(mask):
+    """
+    Read the number present in a preprocessed mask (see process_stage) through our digit recognizer,
+    falling back to tesseract when the recognizer isn't confident.
+    """
+    return digits.read(mask=mask, fallback=lambda mask: ocr.image_to_string(image=mask, digits=True))
+
+
+def read_stage(image, scale=3):
+    """
+    Read the number present in an image of the stage (or advance start) region.
+    """
+    return read_mask(mask=process_stage(image=image, scale=scale))
@@ -0,0 +1,157 @@
+from PIL import Image
+
+import cv2
+import numpy as np
+import imagehash
+import time
+import zlib
+
+
+class Frame(object):
+    """
+    Frame encapsulates a single capture of the game screen.
+
+    Any derived views of the capture (grayscale, hsv, pyramid levels, hashes) are computed once
+    on first access and cached on the frame, so every consumer of the same capture shares the work.
+
+    The underlying array is always stored in BGR(X) channel order.
+    """
+    def __init__(self, image, timestamp=None, parent=None, region=None):
+        self.timestamp = timestamp or time.time()
+        self.parent = parent
+        self.region = region
+
+        self._image = None
+        self._gray = None
+        self._hsv = None
+        self._pyramid = None
+        self._average_hash = None
+        self._crc = None
+
+        if isinstance(image, Image.Image):
+            self._image = image
+            self.array = self._from_image(image=image)
+        else:
+            self.array = image
+
+        self.height, self.width = self.array.shape[:2]
+
+    def __str__(self):
+        return "{width}x{height} @ {timestamp}".format(width=self.width, height=self.height, timestamp=self.timestamp)
+
+    def __repr__(self):
+        return "<Frame: {frame}>".format(frame=self)
+
+    @staticmethod
+    def _from_image(image):
+        """
+        Convert a PIL image into a BGR(X) array.
+        """
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB")
+
+        return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR if image.mode == "RGB" else cv2.COLOR_RGBA2BGRA)
+
+    @staticmethod
+    def to_gray(array):
+        """
+        Convert a BGR(X) array into grayscale.
+
+        Our templates have always been matched against screenshots converted with their red and blue channels
+        swapped, the precision thresholds used throughout the bot are tuned to this, so we retain that weighting here.
+        """
+        if array.ndim == 2:
+            return array
+
+        return cv2.cvtColor(array, cv2.COLOR_RGB2GRAY if array.shape[2] == 3 else cv2.COLOR_RGBA2GRAY)
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    @property
+    def image(self):
+        """
+        Retrieve the frame as a PIL image, only ever built when required.
+        """
+        if self._image is None:
+            self._image = Image.fromarray(cv2.cvtColor(self.array, cv2.COLOR_BGR2RGB if self.array.shape[2] == 3 else cv2.COLOR_BGRA2RGB))
+        return self._image
+
+    @property
+    def gray(self):
+        """
+        Retrieve the grayscale view of the frame. Cropped frames slice the grayscale view of their parent.
+        """
+        if self._gray is None:
+            if self.parent is not None:
+                self._gray = self.parent.gray[self.region[1]:self.region[3], self.region[0]:self.region[2]]
+            else:
+                self._gray = self.to_gray(array=self.array)
+        return self._gray
+
+    @property
+    def hsv(self):
+        """
+        Retrieve the hsv view of the frame.
+        """
+        if self._hsv is None:
+            self._hsv = cv2.cvtColor(np.ascontiguousarray(self.array[:, :, :3]), cv2.COLOR_BGR2HSV)
+        return self._hsv
+
+    @property
+    def average_hash(self):
+        """
+        Retrieve the perceptual (average) hash of the frame.
+        """
+        if self._average_hash is None:
+            self._average_hash = imagehash.average_hash(image=self.image)
+        return self._average_hash
+
+    @property
+    def crc(self):
+        """
+        Retrieve a fast checksum of the grayscale view of the frame, frames with identical pixels share a checksum.
+        """
+        if self._crc is None:
+            self._crc = zlib.crc32(np.ascontiguousarray(self.gray))
+        return self._crc
+
+    def pyramid(self, level):
+        """
+        Retrieve the grayscale view of the frame downscaled by a factor of 2 ** level.
+        """
+        # Levels are built on a copy and swapped in, frames are shared between search threads.
+        pyramid = self._pyramid or [self.gray]
+        while len(pyramid) <= level:
+            pyramid = pyramid + [cv2.pyrDown(pyramid[-1])]
+
+        self._pyramid = pyramid
+        return pyramid[level]
+
+    def pixel(self, point):
+        """
+        Retrieve the (R, G, B) color present at the specified point.
+        """
+        b, g, r = self.array[point[1], point[0]][:3]
+        return int(r), int(g), int(b)
+
+    def pixels(self, points):
+        """
+        Retrieve the (R, G, B) colors present at every point specified, as an array of shape (points, 3).
+        """
+        points = np.asarray(points, dtype=np.intp).reshape(-1, 2)
+        return self.array[points[:, 1], points[:, 0], 2::-1]
+
+    def crop(self, region):
+        """
+        Crop the frame to the specified region (x1, y1, x2, y2). The cropped frame is a view into this frame,
+        no pixels are copied and any derived views are sliced from this frame.
+        """
+        return Frame(image=self.array[region[1]:region[3], region[0]:region[2]], timestamp=self.timestamp, parent=self, region=region)
+
+    def resize(self, downsize):
+        """
+        Generate a new frame, downsized by the specified factor.
+        """
+        return Frame(image=cv2.resize(self.array, (int(self.width / downsize), int(self.height / downsize)), interpolation=cv2.INTER_AREA), timestamp=self.timestamp)
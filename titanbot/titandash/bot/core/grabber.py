@@ -1,79 +1,231 @@
 from titandash.bot.external.imagesearch import *
 
+from .templates import templates
+from .locations import locations
+from .matchcache import matches
+from .matchers import matcher as get_matcher
+from .frame import Frame
+from .constants import GRABBER_FRAME_STALENESS, SEARCH_POOL_WORKERS
+
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import time
+
+# Template matching releases the gil, a single pool of threads is shared by every grabber
+# in the process to match multiple templates against a frame in parallel.
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=SEARCH_POOL_WORKERS, thread_name_prefix="search")
+
+# Batched search modes, "all" matches every template, "any" stops once any template is found,
+# and "first" stops once the first template (in the order specified) that is found is known.
+SEARCH_ALL = "all"
+SEARCH_ANY = "any"
+SEARCH_FIRST = "first"
+
+# Result of a single template match within a batched search.
+SearchResult = namedtuple("SearchResult", ["found", "score", "position"])
+
+# Single color check within a probe, a point is checked against either an exact (R, G, B) color,
+# or a color range ((R min, R max), (G min, G max), (B min, B max)), but not both.
+ColorCheck = namedtuple("ColorCheck", ["point", "color", "color_range"])
+ColorCheck.__new__.__defaults__ = (None, None)
+
 
 class Grabber:
     """
     Grabber class provides functionality to capture a portion of the screen, based on the height
     and width that the emulator should be set to.
     """
-    def __init__(self, window, logger):
+    def __init__(self, window, logger, staleness=GRABBER_FRAME_STALENESS):
         # Base height and width, resolution of game.
         self.window = window
         self.logger = logger
 
         # Screen is updated and set to the result of an image
         # grab as needed through the snapshot method.
-        self.current = None
+        self._current = None
+
+        # The last full frame captured, along with the window generation it was captured in.
+        # Frames are re-used until input is sent to the window or the frame is older than our staleness.
+        self.staleness = staleness
+        self._frame = None
+        self._frame_generation = None
+
+        # Region frames captured natively from the window while no valid full frame was available.
+        # Keyed by region, holding the generation each region frame was captured in.
+        self._regions = dict()
+
+        # Callables notified with every new full frame captured or produced (ie: trackers watching regions of the screen).
+        self.observers = []
+
+        self.captures = 0
+        self.captures_avoided = 0
+        self.frames_produced = 0
+
+    @property
+    def current(self):
+        return self._current
 
-    def snapshot(self, region=None, downsize=None):
+    @current.setter
+    def current(self, value):
+        """
+        Ensure our current image is always a frame, raw images (ie: mock snapshots) are wrapped when set.
+        """
+        self._current = value if value is None or isinstance(value, Frame) else Frame(image=value)
+
+    def _valid(self, frame, generation):
+        """
+        Determine whether or not a frame captured in the specified generation still represents the game screen.
+        """
+        if frame is None:
+            return False
+        if generation != self.window.generation:
+            return False
+
+        return time.time() - frame.timestamp < self.staleness
+
+    def frame_valid(self):
+        """
+        Determine whether or not the last full frame captured still represents the game screen.
+        """
+        return self._valid(frame=self._frame, generation=self._frame_generation)
+
+    def frame(self, force=False):
+        """
+        Retrieve a full frame of the game screen, re-using the last frame captured while it's still valid.
+        """
+        if not force and self.frame_valid():
+            self.captures_avoided += 1
+            self.logger.debug("re-using frame of game screen, {avoided} capture(s) avoided ({window})".format(avoided=self.captures_avoided, window=self.window))
+            return self._frame
+
+        # Windows producing frames in the background provide the latest frame captured since the last input
+        # was sent, waiting briefly for one if needed. Direct capture is only used if none is produced in time.
+        if self.window.producer is not None and self.window.producer.running:
+            frame, generation = self.window.producer.latest(generation=self.window.generation, timeout=self.window.producer.interval * 2)
+            if frame is not None and self._valid(frame=frame, generation=generation):
+                self._frame = frame
+                self._frame_generation = generation
+                self._regions.clear()
+                self.frames_produced += 1
+                self._notify(frame=self._frame)
+                return self._frame
+
+        self.logger.debug("taking snapshot of game screen ({window})".format(window=self.window))
+        generation = self.window.generation
+        self._frame = Frame(image=self.window.screenshot())
+        self._frame_generation = generation
+        self._regions.clear()
+        self.captures += 1
+        self._notify(frame=self._frame)
+
+        return self._frame
+
+    def _notify(self, frame):
+        """
+        Notify every observer of a new full frame, observers failing never prevent a frame from being used.
+        """
+        for observer in self.observers:
+            try:
+                observer(frame)
+            except Exception as exc:
+                self.logger.error("error occurred while notifying {observer} of a new frame: {exc}".format(observer=observer, exc=exc))
+
+    def region(self, region, force=False):
+        """
+        Retrieve a frame of a region of the game screen.
+
+        The last full frame is cropped while it's still valid, otherwise only the region is captured from the window,
+        which is re-used until input is sent to the window or the region frame is stale.
+        """
+        if not force and self.frame_valid():
+            self.captures_avoided += 1
+            return self._frame.crop(region)
+
+        region = tuple(region)
+        if not force and region in self._regions and self._valid(*self._regions[region]):
+            self.captures_avoided += 1
+            return self._regions[region][0]
+
+        self.logger.debug("taking snapshot of region {region} in game screen ({window})".format(region=region, window=self.window))
+        generation = self.window.generation
+        frame = Frame(image=self.window.screenshot(region=region), region=region)
+        self._regions[region] = frame, generation
+        self.captures += 1
+
+        return frame
+
+    def snapshot(self, region=None, downsize=None, force=False):
         """
         Take a snapshot of the current game session, based on the width and height of the grabber unless
         an explicit region is specified to use to take a screen-shot with.
+
+        Snapshots are taken from the last frame captured if no input has been sent to the window since, unless forced.
+        Region snapshots only capture the region specified when no full frame is available.
+
+        The frame of the snapshot is returned, the current frame is only ever a full frame of the game screen, so region
+        snapshots return their region, only updating the current frame with the full frame they were cropped from.
         """
         if not region:
-            self.logger.debug("taking snapshot of game screen ({window})".format(window=self.window))
-            self.current = self.window.screenshot()
+            frame = self.current = self.frame(force=force)
         else:
-            self.logger.debug("taking snapshot of region in game screen region {region} ({window})".format(region=region, window=self.window))
-            self.current = self.window.screenshot(region=region)
+            frame = self.region(region=region, force=force)
+            if frame.parent is not None:
+                self.current = frame.parent
 
         # Optionally, we can downsize the image grabbed, may improve performance
         # if we are grabbing or parsing many images and want them to be smaller sizes.
         if downsize:
-            self.current.thumbnail((
-                self.current.width / downsize,
-                self.current.height / downsize
-            ))
+            frame = frame.resize(downsize=downsize)
+            if not region:
+                self.current = frame
 
-        return self.current
+        return frame
 
-    def search(self, image, region=None, precision=0.8, bool_only=False, testing=False, im=None):
+    def search(self, image, region=None, precision=0.8, bool_only=False, testing=False, im=None, matcher=None):
         """
         Search the specified image for another image with a specified amount of precision.
 
-        Specifying bool_only as True will only return whether or not the image is found.
+        Specifying bool_only as True will only return whether or not the image is found. Specifying a matcher
+        ("full", "pyramid") overrides the default matcher used for this search.
 
         The testing boolean is used to aid the unit tests to use mock images as a snapshot instead
         of the actual screen.
         """
+        snapshot = None
         if not testing:
             self.logger.debug("searching for {image} in game and returning {bool_or_both}".format(
                 image=image, bool_or_both="bool only" if bool_only else "bool and position"))
-            self.snapshot()
+            snapshot = self.snapshot(region=region)
+
+        # Region searches share any derived views already computed on the current frame.
+        if im is None:
+            if snapshot is not None:
+                im = snapshot
+            else:
+                im = self.current.crop(region) if region else self.current
+        elif not isinstance(im, Frame):
+            im = Frame(image=im)
 
         found = False
         position = -1, -1
 
-        search_kwargs = {
-            "x1": region[0] if region else self.window.x,
-            "y1": region[1] if region else self.window.y,
-            "x2": region[2] if region else self.window.width,
-            "y2": region[3] if region else self.window.height,
-            "precision": precision,
-            "im": im if region else self.current if not im else im,
-            "logger": self.logger
-        }
-
-        # If a list of images to be searched for is being used, loop through and search.
-        # The first image specified that is found breaks the loop.
+        # If a list of images to be searched for is being used, every image is matched in a single batch.
+        # The first image specified that is found is used, unless only a boolean is needed, in which case
+        # any image found is enough. Templates are always retrieved from our preloaded template bank.
+        # Results are paired with their images by position, decoded arrays may be searched for as well as paths.
         if isinstance(image, list):
-            for _image in image:
-                position = imagesearcharea(window=self.window, image=_image, **search_kwargs)
-                if position[0] != -1:
+            hits = self._results(searches=[(_image, im) for _image in image], precision=precision, mode=SEARCH_ANY if bool_only else SEARCH_FIRST, matcher=matcher)
+            for _image, hit in zip(image, hits):
+                if hit is not None and hit.found:
+                    position = hit.position
                     image = _image  # Set inline var to main for logging purposes.
                     break
         else:
-            position = imagesearcharea(window=self.window, image=image, **search_kwargs)
+            hit = self._results(searches=[(image, im)], precision=precision, mode=SEARCH_FIRST, matcher=matcher)[0]
+            if hit.found:
+                position = hit.position
 
         if position[0] != -1:
             self.logger.debug("{image} was successfully found on the screen.".format(image=image))
@@ -89,26 +241,205 @@ class Grabber:
 
         return found, position
 
-    def point_is_color(self, point, color=None, color_range=None):
+    def search_many(self, images, regions=None, precision=0.8, mode=SEARCH_ALL, testing=False, im=None, matcher=None):
         """
-        Given a specified point, determine if that point is currently a specific color.
+        Search for multiple images in a single batch, matching each image on a shared thread pool.
+
+        Regions may be a single region used for every image, or a list of regions (or None) matching each image.
+        A hit map is returned, containing a search result (found, score, position) for every image matched. Images
+        skipped because the search was able to stop early (see search modes) are not present in the hit map.
+
+        Specifying a matcher ("full", "pyramid") overrides the default matcher used for every image.
         """
-        if color and color_range:
-            raise ValueError("Only one of color or color_range may be present, but not both.")
+        if mode not in (SEARCH_ALL, SEARCH_ANY, SEARCH_FIRST):
+            raise ValueError("Invalid search mode: {mode} specified.".format(mode=mode))
 
-        self.snapshot()
+        if regions is None or isinstance(regions, tuple):
+            regions = [regions] * len(images)
 
-        pt = self.current.getpixel(point)
+        # A single region shared by every image only requires a snapshot of that region.
+        if im is None:
+            if not testing:
+                distinct = set(tuple(region) if region else None for region in regions)
+                im = self.snapshot(region=distinct.pop() if len(distinct) == 1 else None)
+            else:
+                im = self.current
+        elif not isinstance(im, Frame):
+            im = Frame(image=im)
 
-        # No padding or modification is required for our color check.
-        # Since we are using the snapshot functionality, which takes into
-        # account our emulator position and title bar height. The point being used
-        # is in relation to the "current" image which already is padded properly.
-        if color:
-            return pt == color
+        searches = []
+        for image, region in zip(images, regions):
+            # Regions are cropped from the frame (sharing its grayscale view), unless the frame is already that region.
+            if region and im.region != tuple(region):
+                searches.append((image, im.crop(region)))
+            else:
+                searches.append((image, im))
 
-        # Checking for a color range allows for a bit of irregularity in the colors present
-        # at a certain location, this is mostly done to check for very different colors,
-        # for example, when perks are active, they are greyed out, and blue when available.
-        if color_range:
-            return color_range[0][0] <= pt[0] <= color_range[0][1] and color_range[1][0] <= pt[1] <= color_range[1][1] and color_range[2][0] <= pt[2] <= color_range[2][1]
+        return self._match(searches=searches, precision=precision, mode=mode, matcher=matcher)
+
+    def search_regions(self, searches, precision=0.8, testing=False, im=None, matcher=None):
+        """
+        Search for images within regions of a single frame in one batch, searches are specified as (image, region)
+        pairs, the same image may be searched for in any number of regions. A list of search results (found, score,
+        position) is returned in the same order as the searches, positions are relative to each region.
+        """
+        if im is None:
+            if not testing:
+                self.snapshot()
+            im = self.current
+        elif not isinstance(im, Frame):
+            im = Frame(image=im)
+
+        return self._results(searches=[(image, im.crop(region) if region else im) for image, region in searches], precision=precision, mode=SEARCH_ALL, matcher=matcher)
+
+    def _score(self, template, frame):
+        return imagesearchscore(window=self.window, image=template, x1=0, y1=0, x2=frame.width, y2=frame.height, im=frame, logger=self.logger)
+
+    def _score_frame(self, template, frame, precision, matcher):
+        """
+        Match a template against an entire frame with the specified matcher, also determining whether or not a
+        second match is present outside of the best match found (ie: the template is ambiguous).
+        """
+        try:
+            return matcher(frame=frame, template=template, precision=precision)
+        except cv2.error:
+            self.logger.exception("error occurred while trying to search for image: {image}".format(image=template))
+            return -1, (-1, -1), False
+
+    def _locate(self, template, frame, precision, matcher):
+        """
+        Match a template against a frame, searching the region of interest around the location the template is
+        usually found at first, only falling back to searching the entire frame when the template isn't confidently found there.
+        """
+        # Learned locations only apply to full frames of the game screen and templates loaded from disk.
+        if template.path is None or frame.region is not None:
+            return self._score_frame(template=template, frame=frame, precision=precision, matcher=matcher)[:2]
+
+        roi = locations.roi(path=template.path, size=frame.size, shape=template.shape)
+        if roi is None:
+            locations.count(counter="full")
+        # Templates whose signature clearly fails at their location are likely not present there, the region of interest
+        # is skipped and the frame is searched with the same matcher as any other full search.
+        elif not template.signature.check(frame=frame, position=locations.get(path=template.path)[:2]):
+            locations.count(counter="rejected")
+        else:
+            score, position = self._score(template=template, frame=frame.crop(roi))
+            if score >= precision and locations.confident(path=template.path, score=score):
+                locations.count(counter="hits")
+                position = position[0] + roi[0], position[1] + roi[1]
+                locations.record(path=template.path, position=position)
+                return score, position
+
+            locations.count(counter="fallbacks")
+
+        score, position, ambiguous = self._score_frame(template=template, frame=frame, precision=precision, matcher=matcher)
+        if score >= precision:
+            locations.record(path=template.path, position=position, score=score, ambiguous=ambiguous)
+
+        return score, position
+
+    def _match(self, searches, precision, mode, matcher=None):
+        """
+        Match every (image, frame) search specified, returning the ordered hit map of results.
+        """
+        hits = OrderedDict()
+
+        # Hit map is always ordered the same way the images were specified.
+        for (image, frame), result in zip(searches, self._results(searches=searches, precision=precision, mode=mode, matcher=matcher)):
+            if result is not None:
+                hits[image] = result
+
+        return hits
+
+    def _results(self, searches, precision, mode, matcher=None):
+        """
+        Match every (image, frame) search specified, returning a list of results in the same order as the searches.
+        Searches skipped because the search was able to stop early are None.
+        """
+        matcher = get_matcher(name=matcher)
+
+        def match(image, frame):
+            # Templates searched for again in pixel identical regions re-use the last result.
+            key = matches.key(image=image, frame=frame, precision=precision, matcher=matcher)
+            result = matches.get(key=key)
+            if result is None:
+                score, position = self._locate(template=templates.get(image), frame=frame, precision=precision, matcher=matcher)
+                result = SearchResult(found=score >= precision, score=score, position=tuple(position))
+                matches.put(key=key, result=result)
+
+            return result
+
+        # Single searches don't benefit from our pool.
+        if len(searches) == 1:
+            return [match(*searches[0])]
+
+        # Derived grayscale views and checksums are computed up front, once, instead of racing between threads.
+        for image, frame in searches:
+            frame.crc
+
+        futures = OrderedDict((_SEARCH_POOL.submit(match, image, frame), index) for index, (image, frame) in enumerate(searches))
+        results = [None] * len(searches)
+
+        try:
+            if mode == SEARCH_FIRST:
+                for future, index in futures.items():
+                    results[index] = future.result()
+                    if results[index].found:
+                        break
+            else:
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    if mode == SEARCH_ANY and results[futures[future]].found:
+                        break
+        finally:
+            for future in futures:
+                future.cancel()
+
+        return results
+
+    def probe(self, checks, testing=False, im=None):
+        """
+        Evaluate many color checks against a single frame, returning a boolean array with the result of each check.
+
+        Every point is read from the frame at once, and compared against the bounds of its check. Exact colors
+        are treated as a range containing only that color.
+        """
+        lower, upper = [], []
+        for check in checks:
+            if check.color and check.color_range:
+                raise ValueError("Only one of color or color_range may be present, but not both.")
+            if check.color:
+                lower.append(check.color)
+                upper.append(check.color)
+            elif check.color_range:
+                lower.append([bound[0] for bound in check.color_range])
+                upper.append([bound[1] for bound in check.color_range])
+            # Checks without any color are never satisfied.
+            else:
+                lower.append((256, 256, 256))
+                upper.append((-1, -1, -1))
+
+        if not checks:
+            return np.zeros(0, dtype=bool)
+
+        # Snapshot functionality already takes into account our emulator position and title bar height,
+        # so points are in relation to the "current" image and require no padding or modification.
+        if im is None:
+            if not testing:
+                self.snapshot()
+            im = self.current
+        elif not isinstance(im, Frame):
+            im = Frame(image=im)
+
+        pixels = im.pixels(points=[check.point for check in checks])
+        return np.all((pixels >= np.asarray(lower)) & (pixels <= np.asarray(upper)), axis=1)
+
+    def point_is_color(self, point, color=None, color_range=None):
+        """
+        Given a specified point, determine if that point is currently a specific color.
+
+        Checking for a color range allows for a bit of irregularity in the colors present
+        at a certain location, this is mostly done to check for very different colors,
+        for example, when perks are active, they are greyed out, and blue when available.
+        """
+        return bool(self.probe(checks=[ColorCheck(point=point, color=color, color_range=color_range)])[0])
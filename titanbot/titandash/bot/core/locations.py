@@ -0,0 +1,187 @@
+from settings import IMAGE_DIR, LOCAL_DATA_LOCATIONS_FILE
+
+from .constants import (
+    LOGGER_NAME, LOCATION_STABLE_HITS, LOCATION_TOLERANCE, LOCATION_PADDING, LOCATION_MARGIN, LOCATION_AUDIT_INTERVAL
+)
+
+from collections import namedtuple
+from threading import RLock
+
+import logging
+import json
+import os
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Location a template was last found at, how many times in a row it was found there, whether or not
+# it has been seen more than once on the screen, and the score it was last found with in the entire frame.
+Location = namedtuple("Location", ["x", "y", "hits", "ambiguous", "score"])
+
+
+class LocationIndex(object):
+    """
+    LocationIndex stores the location each template was last found at on the game screen, and how many times
+    in a row the template has been found there.
+
+    Templates that are found in the same location consistently are stable, and may be searched for in a small padded
+    region of interest around that location, before falling back to searching the entire frame on a miss. The index
+    is persisted between sessions so templates are stable right away.
+
+    Templates seen more than once on the screen at the same time are ambiguous, the best match in the roi may not be
+    the best match in the frame, so ambiguous templates are never searched for in their roi. Matches in the roi are
+    also only trusted when they score close to the score the template was learned with.
+    """
+    def __init__(self, path=LOCAL_DATA_LOCATIONS_FILE, stable=LOCATION_STABLE_HITS, tolerance=LOCATION_TOLERANCE, padding=LOCATION_PADDING, margin=LOCATION_MARGIN, audit=LOCATION_AUDIT_INTERVAL):
+        self.path = path
+        self.stable = stable
+        self.tolerance = tolerance
+        self.padding = padding
+        self.margin = margin
+        self.audit = audit
+        self._uses = dict()
+
+        self._locations = None
+        self._dirty = False
+        self._lock = RLock()
+
+        # Counters used to determine how much matching work is saved by the index.
+        # Hits: roi searches that found the template. Fallbacks: roi searches that missed.
+        # Full: searches with no stable location available (or audits). Rejected: templates clearly not at their location.
+        self.hits = 0
+        self.fallbacks = 0
+        self.full = 0
+        self.rejected = 0
+
+    def __len__(self):
+        return len(self.locations)
+
+    @property
+    def locations(self):
+        if self._locations is None:
+            self.load()
+        return self._locations
+
+    @staticmethod
+    def key(path):
+        """
+        Generate the key used to store a templates location, relative to our image directory so
+        keys remain valid across installations.
+        """
+        path = os.path.abspath(path)
+        if path.startswith(os.path.abspath(IMAGE_DIR)):
+            path = os.path.relpath(path, IMAGE_DIR)
+
+        return path.replace("\\", "/")
+
+    def load(self):
+        """
+        Load any persisted locations, an invalid or missing file simply results in an empty index.
+        """
+        with self._lock:
+            self._locations = dict()
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, "r") as f:
+                        self._locations = {key: Location(*value) for key, value in json.load(f).items()}
+                except (ValueError, TypeError, OSError):
+                    logger.warning("unable to load template locations from {path}, starting with an empty index.".format(path=self.path))
+
+    def save(self):
+        """
+        Persist the index if any locations have changed since it was last saved.
+        """
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+
+            tmp = "{path}.tmp".format(path=self.path)
+            with open(tmp, "w") as f:
+                json.dump({key: list(value) for key, value in self.locations.items()}, f)
+            os.replace(tmp, self.path)
+
+            self._dirty = False
+
+    def roi(self, path, size, shape):
+        """
+        Retrieve the padded region of interest (x1, y1, x2, y2) for a template of the specified shape (height, width),
+        clipped to a frame of the specified size (width, height). None is returned if the template isn't stable, is
+        ambiguous, or should be audited.
+        """
+        key = self.key(path=path)
+        location = self.locations.get(key)
+        if location is None or location.hits < self.stable or location.ambiguous:
+            return None
+
+        with self._lock:
+            self._uses[key] = uses = self._uses.get(key, 0) + 1
+        if self.audit and uses % self.audit == 0:
+            return None
+
+        return (
+            max(location.x - self.padding, 0),
+            max(location.y - self.padding, 0),
+            min(location.x + shape[1] + self.padding, size[0]),
+            min(location.y + shape[0] + self.padding, size[1])
+        )
+
+    def count(self, counter):
+        """
+        Increment one of our counters (hits, fallbacks, full, rejected), templates are located from many search threads at once.
+        """
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, path):
+        """
+        Retrieve the location of a template, None is returned if the template has never been found.
+        """
+        return self.locations.get(self.key(path=path))
+
+    def confident(self, path, score):
+        """
+        Determine whether or not a score found in a templates roi is close enough to the score it was learned with.
+        """
+        location = self.locations.get(self.key(path=path))
+        return location is not None and score >= location.score - self.margin
+
+    def record(self, path, position, score=None, ambiguous=False):
+        """
+        Record that a template was found at the specified position, and whether or not more than one match was present.
+
+        The score is only specified when the template was found in the entire frame, roi matches retain the learned score.
+        """
+        key = self.key(path=path)
+
+        with self._lock:
+            location = self.locations.get(key)
+            if location and abs(location.x - position[0]) <= self.tolerance and abs(location.y - position[1]) <= self.tolerance:
+                hits = location.hits + 1
+            else:
+                hits = 1
+
+            self.locations[key] = Location(
+                x=int(position[0]),
+                y=int(position[1]),
+                hits=hits,
+                ambiguous=ambiguous or bool(location and location.ambiguous),
+                score=float(score) if score is not None else location.score if location else 1.0
+            )
+            self._dirty = True
+
+    def stats(self):
+        """
+        Retrieve the current hit rate of the index.
+        """
+        searches = self.hits + self.fallbacks + self.full + self.rejected
+        return {
+            "locations": len(self),
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "full": self.full,
+            "rejected": self.rejected,
+            "ambiguous": len([location for location in self.locations.values() if location.ambiguous]),
+            "hit_rate": round(self.hits / searches, 4) if searches else 0.0
+        }
+
+
+locations = LocationIndex()
@@ -375,6 +375,9 @@ IMAGES = {
     "STATS": {
         "stats_title": IMAGE_DIR + "/stats/stats_title.png",
     },
+    "DIGITS": {
+        str(digit): IMAGE_DIR + "/digits/{digit}.png".format(digit=digit) for digit in range(10)
+    },
     "WELCOME": {
         "welcome_header": IMAGE_DIR + "/welcome/welcome_header.png",
         "welcome_collect_no_vip": IMAGE_DIR + "/welcome/welcome_collect_no_vip.png",
@@ -0,0 +1,97 @@
+from .constants import MATCH_CACHE_SIZE
+
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+import zlib
+
+
+class MatchCache(object):
+    """
+    MatchCache stores the most recent results of matching templates against regions of the game screen.
+
+    Results are keyed on the template, the region matched against, and a checksum of the pixels in that region. Loops
+    that wait for the screen to change re-check the same templates against identical pixels, which are then retrieved
+    from the cache. Any change to the pixels changes the checksum, so results never have to be invalidated explicitly.
+
+    The least recently used results are evicted once the cache is full, a size of zero disables the cache.
+    """
+    def __init__(self, size=MATCH_CACHE_SIZE):
+        self.size = size
+
+        self._results = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    @staticmethod
+    def identity(image):
+        """
+        Identify the template being matched. Images and templates loaded from disk are identified by their path,
+        decoded arrays (and templates generated from them) by the shape and checksum of their pixels.
+        """
+        if isinstance(image, str):
+            return image
+        if getattr(image, "path", None):
+            return image.path
+
+        array = np.ascontiguousarray(getattr(image, "image", image))
+        return array.shape, zlib.crc32(array)
+
+    @classmethod
+    def key(cls, image, frame, precision, matcher):
+        """
+        Generate the key used to store the result of matching an image against a frame.
+        """
+        return cls.identity(image=image), frame.region, frame.size, frame.crc, precision, matcher
+
+    def get(self, key):
+        """
+        Retrieve the cached result for the specified key, None is returned on a miss.
+        """
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        """
+        Cache the result for the specified key, evicting the least recently used result if the cache is full.
+        """
+        if not self.size:
+            return
+
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.size:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+    def stats(self):
+        """
+        Retrieve the current hit rate of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "results": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+matches = MatchCache()
@@ -0,0 +1,91 @@
+from .constants import (
+    SEARCH_MATCHER, PYRAMID_LEVEL, PYRAMID_MIN_SIZE, PYRAMID_SLACK, PYRAMID_CANDIDATES, PYRAMID_RADIUS
+)
+
+import cv2
+
+# Matchers search for a template within an entire frame. Every matcher returns the best match score, the top
+# left corner of that match, and whether or not a second match was present (ie: the template is ambiguous).
+MATCHER_FULL = "full"
+MATCHER_PYRAMID = "pyramid"
+
+
+def _suppress(res, loc, height, width):
+    """
+    Suppress the area (height, width) around the specified location of a match result.
+    """
+    res[max(loc[1] - height, 0):loc[1] + height + 1, max(loc[0] - width, 0):loc[0] + width + 1] = -1
+
+
+def match_full(frame, template, precision):
+    """
+    Match a template against every location of a frame at full resolution.
+    """
+    res = cv2.matchTemplate(frame.gray, template.image, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(res)
+    if max_val < precision:
+        return max_val, max_loc, False
+
+    # Suppressing the best match, any other match above our precision means the template is ambiguous.
+    _suppress(res=res, loc=max_loc, height=template.height // 2, width=template.width // 2)
+    return max_val, max_loc, cv2.minMaxLoc(res)[1] >= precision
+
+
+def match_pyramid(frame, template, precision, level=PYRAMID_LEVEL, min_size=PYRAMID_MIN_SIZE,
+                  slack=PYRAMID_SLACK, candidates=PYRAMID_CANDIDATES, radius=PYRAMID_RADIUS):
+    """
+    Match a template coarse to fine. Candidates are found by matching the downscaled template against the same
+    pyramid level of the frame, each candidate is then refined at full resolution in a small window around it.
+
+    Templates too small to be matched reliably at the specified level use the largest level they can, or are
+    matched at full resolution.
+    """
+    while level and min(template.shape) >> level < min_size:
+        level -= 1
+    if not level:
+        return match_full(frame=frame, template=template, precision=precision)
+
+    scale = 2 ** level
+    pad = (radius + 1) * scale
+    res = cv2.matchTemplate(frame.pyramid(level), template.pyramid(level), cv2.TM_CCOEFF_NORMED)
+
+    found = []
+    best_val, best_loc = -1, (-1, -1)
+    for i in range(candidates):
+        _, coarse_val, _, coarse_loc = cv2.minMaxLoc(res)
+        if coarse_val < precision - slack:
+            break
+
+        # Refining the candidate within a window that covers the area suppressed around it.
+        x1, y1 = max(coarse_loc[0] * scale - pad, 0), max(coarse_loc[1] * scale - pad, 0)
+        x2, y2 = min(coarse_loc[0] * scale + pad + template.width, frame.width), min(coarse_loc[1] * scale + pad + template.height, frame.height)
+        _, max_val, _, max_loc = cv2.minMaxLoc(cv2.matchTemplate(frame.gray[y1:y2, x1:x2], template.image, cv2.TM_CCOEFF_NORMED))
+        max_loc = max_loc[0] + x1, max_loc[1] + y1
+
+        if max_val >= precision:
+            found.append(max_loc)
+        if max_val > best_val:
+            best_val, best_loc = max_val, max_loc
+
+        _suppress(res=res, loc=coarse_loc, height=radius, width=radius)
+
+    # Matches refined from separate candidates may still be the same match, only distinct matches are ambiguous.
+    ambiguous = any(abs(loc[0] - best_loc[0]) > template.width // 2 or abs(loc[1] - best_loc[1]) > template.height // 2 for loc in found)
+    return best_val, best_loc, ambiguous
+
+
+MATCHERS = {
+    MATCHER_FULL: match_full,
+    MATCHER_PYRAMID: match_pyramid,
+}
+
+
+def matcher(name=None):
+    """
+    Retrieve the matcher with the specified name, or the default matcher if no name is specified.
+    """
+    name = name or SEARCH_MATCHER
+    try:
+        return MATCHERS[name]
+    except KeyError:
+        raise ValueError("Invalid matcher: {name} specified.".format(name=name))
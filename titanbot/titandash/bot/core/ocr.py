@@ -0,0 +1,252 @@
+from django.conf import settings
+
+from .constants import LOGGER_NAME, OCR_POOL_WORKERS
+
+from threading import Lock
+from queue import Queue, Empty
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+import numpy as np
+import pytesseract
+import ctypes
+import ctypes.util
+import logging
+import glob
+import os
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Page segmentation mode treating an image as a single line of text.
+PSM_SINGLE_LINE = 7
+
+# Characters allowed when only digits are parsed, matching the "digits" config shipped with tesseract.
+DIGITS = "0123456789-."
+
+# Resolution tesseract assumes for images without one, our images never specify a resolution.
+RESOLUTION = 70
+
+
+class OCREngineUnavailable(Exception):
+    pass
+
+
+def _candidates(command=None):
+    """
+    Retrieve the paths of every tesseract library that may be loaded, libraries installed alongside
+    our tesseract command are preferred over any library available on the system.
+    """
+    directory = os.path.dirname(command or "")
+    candidates = sorted(glob.glob(os.path.join(directory, "libtesseract*.dll")), reverse=True) if directory else []
+    if ctypes.util.find_library("tesseract"):
+        candidates.append(ctypes.util.find_library("tesseract"))
+
+    return candidates
+
+
+def _library(command=None):
+    """
+    Load the tesseract library through the c api, the first candidate library that can be loaded is used.
+    """
+    for candidate in _candidates(command=command or settings.TESSERACT_COMMAND):
+        try:
+            library = ctypes.CDLL(candidate)
+        except OSError:
+            logger.debug("tesseract library {candidate} could not be loaded.".format(candidate=candidate))
+            continue
+
+        library.TessBaseAPICreate.restype = ctypes.c_void_p
+        library.TessBaseAPIInit3.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p]
+        library.TessBaseAPIInit3.restype = ctypes.c_int
+        library.TessBaseAPISetPageSegMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        library.TessBaseAPISetVariable.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p]
+        library.TessBaseAPISetVariable.restype = ctypes.c_int
+        library.TessBaseAPISetImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        library.TessBaseAPISetSourceResolution.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        library.TessBaseAPIGetUTF8Text.argtypes = [ctypes.c_void_p]
+        library.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+        library.TessDeleteText.argtypes = [ctypes.c_void_p]
+        for function in (library.TessBaseAPIClear, library.TessBaseAPIEnd, library.TessBaseAPIDelete):
+            function.argtypes = [ctypes.c_void_p]
+
+        return library
+
+    raise OCREngineUnavailable("tesseract library could not be found.")
+
+
+def _datapath(command=None):
+    """
+    Retrieve the path of the tessdata directory used to initialize engines. The TESSDATA_PREFIX environment variable
+    is honoured when set, otherwise the tessdata installed alongside our tesseract command is used. None is returned
+    when neither is present, tesseract then uses its own default location.
+    """
+    if os.environ.get("TESSDATA_PREFIX"):
+        return os.environ["TESSDATA_PREFIX"].encode()
+
+    directory = os.path.dirname(command or settings.TESSERACT_COMMAND or "")
+    if directory and os.path.isdir(os.path.join(directory, "tessdata")):
+        return os.path.join(directory, "tessdata").encode()
+
+    return None
+
+
+class TesseractEngine(object):
+    """
+    Single tesseract engine, initialized once in process and kept alive between calls.
+
+    Engines are not thread safe, an engine is only ever used by one thread at a time.
+    """
+    def __init__(self, library, datapath=None, language="eng"):
+        self.library = library
+        self.handle = library.TessBaseAPICreate()
+
+        if library.TessBaseAPIInit3(self.handle, datapath, language.encode()) != 0:
+            library.TessBaseAPIDelete(self.handle)
+            raise OCREngineUnavailable("tesseract engine could not be initialized with language: {language} (tessdata: {datapath}).".format(language=language, datapath=datapath))
+
+    @staticmethod
+    def _array(image):
+        """
+        Convert an image into a contiguous array of 8 bit pixels (grayscale, rgb or rgba).
+        """
+        if isinstance(image, Image.Image) and image.mode not in ("L", "RGB", "RGBA"):
+            image = image.convert("RGB")
+
+        return np.ascontiguousarray(image, dtype=np.uint8)
+
+    def image_to_string(self, image, psm=PSM_SINGLE_LINE, digits=False):
+        """
+        Parse the text present in an in memory image.
+        """
+        array = self._array(image=image)
+        height, width = array.shape[:2]
+        channels = 1 if array.ndim == 2 else array.shape[2]
+
+        self.library.TessBaseAPISetPageSegMode(self.handle, psm)
+        self.library.TessBaseAPISetVariable(self.handle, b"tessedit_char_whitelist", DIGITS.encode() if digits else b"")
+        self.library.TessBaseAPISetImage(self.handle, array.ctypes.data, width, height, channels, array.strides[0])
+        self.library.TessBaseAPISetSourceResolution(self.handle, RESOLUTION)
+
+        text = self.library.TessBaseAPIGetUTF8Text(self.handle)
+        try:
+            return ctypes.string_at(text).decode("utf-8").strip() if text else ""
+        finally:
+            if text:
+                self.library.TessDeleteText(text)
+            self.library.TessBaseAPIClear(self.handle)
+
+    def end(self):
+        self.library.TessBaseAPIEnd(self.handle)
+        self.library.TessBaseAPIDelete(self.handle)
+
+
+class OCRPool(object):
+    """
+    OCRPool keeps warm tesseract engines alive in process, parsing in memory images without starting a tesseract
+    process or writing any images to disk. Engines are created as needed, up to one per thread parsing text at once.
+
+    If the tesseract library can't be loaded in process, every call falls back to running our tesseract command.
+    """
+    def __init__(self, workers=OCR_POOL_WORKERS, language="eng"):
+        self.workers = workers
+        self.language = language
+
+        self._library = None
+        self._available = None
+        self._engines = Queue()
+        self._created = 0
+        self._lock = Lock()
+        self._executor = None
+
+        self.calls = 0
+        self.fallbacks = 0
+
+    @property
+    def available(self):
+        """
+        Determine whether or not engines can be created in process, the library is only ever loaded once.
+        """
+        if self._available is None:
+            with self._lock:
+                if self._available is None:
+                    try:
+                        self._library = _library()
+                        self._available = True
+                    except OCREngineUnavailable:
+                        logger.warning("tesseract library is unavailable, ocr will fall back to the tesseract command.")
+                        self._available = False
+
+        return self._available
+
+    def _acquire(self):
+        """
+        Acquire an idle engine, creating a new engine if every engine is busy and our pool isn't full yet.
+        """
+        try:
+            return self._engines.get_nowait()
+        except Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.workers:
+                engine = TesseractEngine(library=self._library, datapath=_datapath(), language=self.language)
+                self._created += 1
+                return engine
+
+        return self._engines.get()
+
+    def image_to_string(self, image, psm=PSM_SINGLE_LINE, digits=False):
+        """
+        Parse the text present in an image, specifying digits only allows digits to be parsed.
+        """
+        with self._lock:
+            self.calls += 1
+
+        if self.available:
+            try:
+                engine = self._acquire()
+            except OCREngineUnavailable:
+                logger.warning("tesseract engine could not be created, ocr will fall back to the tesseract command.", exc_info=True)
+                self._available = False
+            else:
+                try:
+                    return engine.image_to_string(image=image, psm=psm, digits=digits)
+                finally:
+                    self._engines.put(engine)
+
+        with self._lock:
+            self.fallbacks += 1
+            fallbacks = self.fallbacks
+        logger.debug("parsing text with the tesseract command, {fallbacks} fallback(s) so far.".format(fallbacks=fallbacks))
+        pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_COMMAND
+        return pytesseract.image_to_string(image, config="--psm {psm}{digits}".format(psm=psm, digits=" nobatch digits" if digits else ""))
+
+    def image_to_strings(self, images, psm=PSM_SINGLE_LINE, digits=False):
+        """
+        Parse the text present in many images at once, each image is parsed on a separate engine concurrently.
+        The text parsed is returned in the same order as the images specified.
+        """
+        if len(images) < 2:
+            return [self.image_to_string(image=image, psm=psm, digits=digits) for image in images]
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+
+        return list(self._executor.map(lambda image: self.image_to_string(image=image, psm=psm, digits=digits), images))
+
+    def close(self):
+        """
+        End every idle engine, engines are created again as needed.
+        """
+        with self._lock:
+            while True:
+                try:
+                    self._engines.get_nowait().end()
+                except Empty:
+                    break
+                self._created -= 1
+
+
+ocr = OCRPool()
@@ -0,0 +1,118 @@
+from .constants import OCR_CACHE_SIZE, OCR_CACHE_TTL
+
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+import zlib
+import time
+
+
+class OCRCache(object):
+    """
+    OCRCache stores the most recent text parsed from regions of the game screen.
+
+    Text is keyed on the kind of text parsed, the region parsed, and a fingerprint of the pixels in that region. Regions
+    parsed with a preprocess function are fingerprinted on the preprocessed (ie: upscaled and binarized) mask that is
+    actually read, so only the text matters and animations behind the text don't change the fingerprint. Other regions
+    are fingerprinted on their exact pixels, an unchanged region retrieves its previous text without any parsing.
+
+    Text expires once it's older than the time to live of its kind, kinds without a time to live are never cached.
+    The least recently used text is evicted once the cache is full, a size of zero disables the cache.
+    """
+    def __init__(self, size=OCR_CACHE_SIZE, ttl=OCR_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+
+        self._results = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    @staticmethod
+    def fingerprint(frame, mask=None):
+        """
+        Generate a compact fingerprint of the pixels in a frame, or of the preprocessed mask of the frame when present.
+        """
+        if mask is None:
+            return frame.crc
+
+        return zlib.crc32(np.packbits(np.asarray(mask) > 0))
+
+    def key(self, kind, frame, mask=None):
+        """
+        Generate the key used to store the text of the specified kind parsed from a frame.
+        """
+        return kind, frame.region, frame.size, self.fingerprint(frame=frame, mask=mask)
+
+    def get(self, key):
+        """
+        Retrieve the cached text for the specified key, None is returned on a miss or once the text has expired.
+        """
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+
+            text, timestamp = result
+            if time.time() - timestamp > self.ttl.get(key[0], 0):
+                del self._results[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._results.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        """
+        Cache the text for the specified key, evicting the least recently used text if the cache is full.
+        """
+        if not self.size or not self.ttl.get(key[0]):
+            return
+
+        with self._lock:
+            self._results[key] = (text, time.time())
+            self._results.move_to_end(key)
+            while len(self._results) > self.size:
+                self._results.popitem(last=False)
+
+    def parse(self, kind, frame, parse, preprocess=None):
+        """
+        Retrieve the text of the specified kind present in a frame, the parse function is only called to parse its
+        text when no unexpired text is cached. When a preprocess function is specified, the frame is preprocessed
+        once, the mask is fingerprinted and passed to the parse function, otherwise the frame itself is parsed.
+        """
+        mask = preprocess(frame) if preprocess else None
+
+        key = self.key(kind=kind, frame=frame, mask=mask)
+        text = self.get(key)
+        if text is None:
+            text = parse(frame if mask is None else mask)
+            self.put(key, text)
+
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+    def stats(self):
+        """
+        Retrieve the current hit rate of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "results": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,158 @@
+from .constants import LOGGER_NAME, CAPTURE_PRODUCER_FPS, CAPTURE_RING_SIZE
+from .frame import Frame
+
+from threading import Thread, Condition, Event
+
+import numpy as np
+import logging
+import weakref
+import time
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class FrameProducer(object):
+    """
+    FrameProducer continuously captures frames from a single window on a background thread, at a
+    fixed rate, into a ring buffer of preallocated frame buffers.
+
+    Consumers retrieve the latest frame produced without waiting on a capture, or wait for a frame captured
+    after a given window generation (ie: after input has been sent to the window).
+
+    Frames handed out are read-only views of a buffer in the ring, the same frame is handed out until a newer frame
+    is produced. Buffers are leased while a frame viewing them is alive, the producer never writes into a leased
+    buffer, it's replaced in the ring with a new buffer instead, leaving the old buffer to the frame viewing it.
+    """
+    def __init__(self, window, fps=CAPTURE_PRODUCER_FPS, size=CAPTURE_RING_SIZE):
+        self.window = window
+        self.interval = 1.0 / fps
+
+        # At least two buffers are required, the latest buffer is only ever read by
+        # consumers, while the producer writes into the next buffer in the ring.
+        self.size = max(size, 2)
+
+        self._buffers = None
+        self._leases = [None] * self.size
+        self._timestamps = [None] * self.size
+        self._generations = [None] * self.size
+        self._latest = None
+
+        self._condition = Condition()
+        self._stop = Event()
+        self._thread = None
+
+        self.produced = 0
+        self.replaced = 0
+        self.errors = 0
+
+    def __str__(self):
+        return "{fps} fps, {size} buffers ({window})".format(fps=int(1.0 / self.interval), size=self.size, window=self.window)
+
+    def __repr__(self):
+        return "<FrameProducer: {producer}>".format(producer=self)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Begin producing frames on a daemon thread.
+        """
+        if self.running:
+            return
+
+        logger.debug("starting frame producer: {producer}".format(producer=self))
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="FrameProducer-{hwnd}".format(hwnd=self.window.hwnd), daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop producing frames, any consumers waiting on a frame are released.
+        """
+        logger.debug("stopping frame producer: {producer}".format(producer=self))
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.time()
+            try:
+                self.produce()
+            except Exception:
+                self.errors += 1
+                logger.debug("error occurred while producing frame ({window})".format(window=self.window), exc_info=True)
+
+            self._stop.wait(max(0, self.interval - (time.time() - started)))
+
+    def produce(self):
+        """
+        Capture a single frame into the next buffer in the ring and publish it as the latest frame.
+        """
+        # Generation is retrieved before capturing, input sent during the capture
+        # will mark this frame as belonging to the previous generation.
+        generation = self.window.generation
+        timestamp = time.time()
+        image = self.window.screenshot()
+
+        # Buffers are allocated once, and only re-allocated if the size of our captures changes.
+        if self._buffers is None or self._buffers[0].shape != image.shape:
+            with self._condition:
+                self._buffers = [np.empty(image.shape, dtype=np.uint8) for i in range(self.size)]
+                self._leases = [None] * self.size
+                self._latest = None
+
+        # The latest buffer is never written into, only buffers that aren't leased by a frame are re-used.
+        with self._condition:
+            index = 0 if self._latest is None else (self._latest + 1) % self.size
+            if self._leased(index=index) is not None:
+                self._buffers[index] = np.empty(image.shape, dtype=np.uint8)
+                self.replaced += 1
+            self._leases[index] = None
+
+        np.copyto(self._buffers[index], image)
+
+        with self._condition:
+            self._timestamps[index] = timestamp
+            self._generations[index] = generation
+            self._latest = index
+            self.produced += 1
+            self._condition.notify_all()
+
+    def _leased(self, index):
+        return self._leases[index]() if self._leases[index] is not None else None
+
+    def _available(self, generation):
+        if self._latest is None:
+            return False
+        return generation is None or self._generations[self._latest] >= generation
+
+    def latest(self, generation=None, timeout=None):
+        """
+        Retrieve the latest frame produced and the window generation it was captured in, (None, None) is returned
+        when no suitable frame is available.
+
+        Specifying a generation will only return a frame captured in (or after) that generation, waiting up to the
+        timeout specified for one to be produced. Frames returned are read-only views of the latest buffer, which
+        is leased to the frame, no pixels are copied.
+        """
+        with self._condition:
+            if generation is not None and timeout:
+                self._condition.wait_for(predicate=lambda: self._stop.is_set() or self._available(generation=generation), timeout=timeout)
+            if not self._available(generation=generation):
+                return None, None
+
+            frame = self._leased(index=self._latest)
+            if frame is None:
+                array = self._buffers[self._latest].view()
+                array.flags.writeable = False
+                frame = Frame(image=array, timestamp=self._timestamps[self._latest])
+                self._leases[self._latest] = weakref.ref(frame)
+
+            return frame, self._generations[self._latest]
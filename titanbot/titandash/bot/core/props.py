@@ -41,3 +41,14 @@ class Props(object):
             setattr(self.instance, key, value)
             # Calling save will actually send the socket signal.
             self.instance.save()
+
+    def update(self, **values):
+        """
+        Update many of our derived properties at once, our instance is only saved (and the socket signal sent) once.
+        """
+        for key, value in values.items():
+            if key not in self.fields:
+                raise ValueError("{key} is not a valid property.".format(key=key))
+            setattr(self.instance, key, value)
+
+        self.instance.save()
@@ -0,0 +1,234 @@
+from .maps import ARTIFACT_MAP
+from .templates import templates
+from .constants import LOGGER_NAME, ARTIFACT_CELL_CONTRAST, ARTIFACT_CELL_RADIUS, ARTIFACT_QUEUE_SIZE
+
+from collections import OrderedDict, namedtuple
+from threading import Thread, Event, Lock
+from queue import Queue
+
+import numpy as np
+import logging
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Artifact recognized within a cell of an artifacts panel screenshot, along with the correlation
+# score and the top left corner of the artifact within the screenshot.
+RecognizedArtifact = namedtuple("RecognizedArtifact", ["name", "score", "position"])
+
+
+class ArtifactRecognizer(object):
+    """
+    ArtifactRecognizer identifies the artifacts present in screenshots of the artifacts panel.
+
+    Every artifact template is preloaded into a bank, a matrix of normalized templates (one per row). Screenshots
+    are split into icon cells, cells are runs of rows with some contrast, separated by the flat background between
+    artifacts. Artifacts are centered within their cell, so every window close to the center of a cell is normalized
+    and correlated against the entire bank with a single matrix product, which is equivalent to matching each template
+    against the center of the cell individually.
+    """
+    def __init__(self, artifacts=ARTIFACT_MAP, precision=0.8, contrast=ARTIFACT_CELL_CONTRAST, radius=ARTIFACT_CELL_RADIUS):
+        self.artifacts = artifacts
+        self.precision = precision
+        self.contrast = contrast
+        self.radius = radius
+
+        self._banks = None
+        self._lock = Lock()
+
+    @staticmethod
+    def _normalize(matrix):
+        """
+        Normalize every row of a matrix to a zero mean and unit length, the dot product of two normalized rows
+        is then their correlation coefficient. Flat rows can not be correlated and are left as zeros.
+        """
+        matrix = matrix - matrix.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = np.inf
+
+        return matrix / norms
+
+    @property
+    def banks(self):
+        """
+        Retrieve the template banks, keyed by template shape, every bank contains the artifact names and
+        the matrix of normalized templates of that shape. Banks are only ever built once.
+        """
+        if self._banks is None:
+            with self._lock:
+                if self._banks is None:
+                    grouped = OrderedDict()
+                    for name, path in self.artifacts.items():
+                        template = templates.get(path)
+                        grouped.setdefault(template.shape, []).append((name, template.image))
+
+                    self._banks = OrderedDict((shape, (
+                        [name for name, image in group],
+                        self._normalize(np.stack([image.ravel() for name, image in group]).astype(np.float32))
+                    )) for shape, group in grouped.items())
+
+        return self._banks
+
+    def cells(self, frame):
+        """
+        Locate the icon cells (y1, y2) present in a frame. Cells too small to contain an artifact (cut off at the edge
+        of the frame), or too large to only contain a single artifact (other panel content) are skipped.
+        """
+        shapes = list(self.banks)
+        smallest, largest = min(shape[0] for shape in shapes), max(shape[0] for shape in shapes)
+
+        return [(y1, y2) for y1, y2 in self._runs(profile=frame.gray.std(axis=1)) if smallest <= y2 - y1 <= largest * 2]
+
+    def _runs(self, profile):
+        """
+        Retrieve every run (start, end) of a contrast profile that is at least our contrast.
+        """
+        runs = np.concatenate(([False], profile >= self.contrast, [False]))
+        edges = np.flatnonzero(np.diff(runs.astype(np.int8)))
+
+        return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+    def _windows(self, region, center, shape):
+        """
+        Retrieve every window of the specified shape within our radius of the center of a region, one flattened
+        window per row, along with the top left corner of each window.
+        """
+        height, width = region.shape[0] - shape[0] + 1, region.shape[1] - shape[1] + 1
+        if height < 1 or width < 1:
+            return None, None
+
+        ys = np.arange(center[1] - shape[0] // 2 - self.radius, center[1] - shape[0] // 2 + self.radius + 1)
+        xs = np.arange(center[0] - shape[1] // 2 - self.radius, center[0] - shape[1] // 2 + self.radius + 1)
+        ys, xs = np.unique(np.clip(ys, 0, height - 1)), np.unique(np.clip(xs, 0, width - 1))
+        ys, xs = np.repeat(ys, len(xs)), np.tile(xs, len(ys))
+
+        windows = np.lib.stride_tricks.as_strided(region, shape=(height, width) + shape, strides=region.strides * 2)
+        return windows[ys, xs].reshape(len(ys), shape[0] * shape[1]), np.stack((xs, ys), axis=1)
+
+    def classify(self, frame, cell):
+        """
+        Classify a single cell (y1, y2) of a frame against every artifact template, returning the best artifact
+        recognized, or None if no artifact matches with our precision.
+        """
+        region = np.ascontiguousarray(frame.gray[cell[0]:cell[1]], dtype=np.float32)
+
+        # The cell is bounded horizontally by the columns with some contrast, the cell may be cut off
+        # by the edge of the frame, in which case, the entire width of the frame is used.
+        columns = self._runs(profile=region.std(axis=0))
+        x1, x2 = (columns[0][0], columns[-1][1]) if columns else (0, region.shape[1])
+        center = (x1 + x2) // 2, region.shape[0] // 2
+
+        best = None
+        for shape, (names, bank) in self.banks.items():
+            windows, positions = self._windows(region=region, center=center, shape=shape)
+            if windows is None:
+                continue
+
+            scores = self._normalize(windows) @ bank.T
+            window, artifact = np.unravel_index(np.argmax(scores), scores.shape)
+            score = float(scores[window, artifact])
+
+            if score >= self.precision and (best is None or score > best.score):
+                best = RecognizedArtifact(name=names[artifact], score=score, position=(int(positions[window][0]), cell[0] + int(positions[window][1])))
+
+        return best
+
+    def recognize(self, frames, artifacts=None):
+        """
+        Recognize the artifacts present in every frame specified, returning the names of the artifacts found.
+
+        Specifying the artifacts being looked for (ie: unowned artifacts) stops recognition as soon as every one
+        of them has been found, any remaining cells and frames are skipped.
+        """
+        found = set()
+        remaining = set(artifacts) if artifacts is not None else None
+
+        for frame in frames:
+            for cell in self.cells(frame=frame):
+                recognized = self.classify(frame=frame, cell=cell)
+                if recognized is None:
+                    continue
+
+                found.add(recognized.name)
+                if remaining is not None:
+                    remaining.discard(recognized.name)
+                    if not remaining:
+                        return found
+
+        return found
+
+
+class RecognitionWorker(object):
+    """
+    RecognitionWorker recognizes artifacts in frames on a background thread, as soon as each frame is submitted.
+
+    Frames are submitted to a bounded queue and released once recognized, submitting a frame while the queue is
+    full waits for the worker. The worker is resolved once every artifact being looked for has been found, any
+    frames submitted after that point are released without being recognized.
+    """
+    def __init__(self, recognizer, artifacts=None, size=ARTIFACT_QUEUE_SIZE):
+        self.recognizer = recognizer
+        self.remaining = set(artifacts) if artifacts is not None else None
+        self.found = set()
+
+        self._queue = Queue(maxsize=size)
+        self._resolved = Event()
+        self._thread = None
+
+        self.processed = 0
+        self.errors = 0
+
+        if self.remaining is not None and not self.remaining:
+            self._resolved.set()
+
+    @property
+    def resolved(self):
+        return self._resolved.is_set()
+
+    def start(self):
+        """
+        Begin recognizing frames on a daemon thread.
+        """
+        self._thread = Thread(target=self._run, name="RecognitionWorker", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        """
+        Submit a frame to be recognized, waiting for the worker if too many frames are already waiting.
+        """
+        self._queue.put(frame)
+
+    def finish(self, timeout=None):
+        """
+        Wait for every frame submitted to be recognized, returning the names of the artifacts found.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+        return self.found
+
+    def _run(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            if self.resolved:
+                continue
+
+            try:
+                found = self.recognizer.recognize(frames=[frame], artifacts=self.remaining)
+            except Exception:
+                self.errors += 1
+                logger.exception("error occurred while recognizing artifacts in frame: {frame}".format(frame=frame))
+                continue
+
+            self.found |= found
+            self.processed += 1
+            if self.remaining is not None:
+                self.remaining -= found
+                if not self.remaining:
+                    self._resolved.set()
+
+
+recognizer = ArtifactRecognizer()
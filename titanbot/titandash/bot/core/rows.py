@@ -0,0 +1,70 @@
+from .maps import IMAGES, HERO_COORDS, EQUIPMENT_COORDS
+from .constants import MELEE, SPELL, RANGED
+
+from collections import namedtuple
+
+# Rows parsed from the top of the heroes panel, the type of hero is the damage type (or None),
+# and dps represents whether or not the hero has been levelled and has any damage.
+HeroRow = namedtuple("HeroRow", ["index", "type", "dps"])
+
+# Rows parsed from the top of an equipment tab, the bonus contains every damage type found in the
+# gear bonus, and equip is the point of the equip button for the gear.
+GearRow = namedtuple("GearRow", ["index", "locked", "equipped", "bonus", "equip"])
+
+# Damage types of heroes, along with the image representing each type in a hero row.
+HERO_TYPES = [
+    (MELEE, IMAGES["HEROES"]["melee_type"]),
+    (SPELL, IMAGES["HEROES"]["spell_type"]),
+    (RANGED, IMAGES["HEROES"]["ranged_type"])
+]
+
+
+def parse_hero_rows(grabber, test_image=None):
+    """
+    Parse every hero row present in the un-collapsed top of the heroes panel. Every type and dps region
+    of every row is searched in a single frame, returning a hero row for each.
+    """
+    searches = []
+    for hero_locations in HERO_COORDS["heroes"]:
+        searches.extend((image, hero_locations["type"]) for typ, image in HERO_TYPES)
+        searches.append((IMAGES["HEROES"]["zero_dps"], hero_locations["dps"]))
+
+    results = grabber.search_regions(searches=searches, im=test_image)
+
+    rows = []
+    for index in range(len(HERO_COORDS["heroes"])):
+        row = results[index * (len(HERO_TYPES) + 1):(index + 1) * (len(HERO_TYPES) + 1)]
+        found = [typ for (typ, image), result in zip(HERO_TYPES, row) if result.found]
+        # If the zero dps image is not present, this hero has levels.
+        rows.append(HeroRow(index=index, type=found[0] if found else None, dps=not row[-1].found))
+
+    return rows
+
+
+def parse_gear_rows(grabber, types=(MELEE, SPELL, RANGED), test_image=None):
+    """
+    Parse every gear row present at the top of the current equipment tab. The equip, locked and bonus regions
+    of every row are searched in a single frame, only the bonus damage types specified are searched for.
+    """
+    bonuses = [(typ, IMAGES["HEROES"]["bonus_{typ}".format(typ=typ)]) for typ in types]
+
+    searches = []
+    for gear_locations in EQUIPMENT_COORDS["gear"]:
+        searches.append((IMAGES["EQUIPMENT"]["equip"], gear_locations["base"]))
+        searches.append((IMAGES["EQUIPMENT"]["locked"], gear_locations["locked"]))
+        searches.extend((image, gear_locations["bonus"]) for typ, image in bonuses)
+
+    results = grabber.search_regions(searches=searches, im=test_image)
+
+    rows = []
+    for index, gear_locations in enumerate(EQUIPMENT_COORDS["gear"]):
+        row = results[index * (len(bonuses) + 2):(index + 1) * (len(bonuses) + 2)]
+        rows.append(GearRow(
+            index=index,
+            locked=row[1].found,
+            equipped=not row[0].found,
+            bonus=tuple(typ for (typ, image), result in zip(bonuses, row[2:]) if result.found),
+            equip=gear_locations["equip"]  # Really a point here.
+        ))
+
+    return rows
@@ -0,0 +1,176 @@
+from .maps import IMAGES
+from .grabber import SEARCH_ALL, SEARCH_ANY, SEARCH_FIRST
+
+from collections import OrderedDict
+
+# Panels that may be open in game, along with the image representing the panel being active.
+PANELS = OrderedDict([
+    ("master", IMAGES["GENERIC"]["master_active"]),
+    ("heroes", IMAGES["GENERIC"]["heroes_active"]),
+    ("equipment", IMAGES["GENERIC"]["equipment_active"]),
+    ("pets", IMAGES["GENERIC"]["pets_active"]),
+    ("artifacts", IMAGES["GENERIC"]["artifacts_active"]),
+    ("shop", IMAGES["GENERIC"]["shop_active"]),
+])
+
+# Images that are only ever visible on the game screen, any of these being present means the game is not in a transition.
+GAME_IMAGES = [
+    IMAGES["GENERIC"]["exit_panel"], IMAGES["NO_PANELS"]["clan_raid_ready"], IMAGES["NO_PANELS"]["clan_no_raid"],
+    IMAGES["NO_PANELS"]["daily_reward"], IMAGES["NO_PANELS"]["fight_boss"], IMAGES["NO_PANELS"]["hatch_egg"],
+    IMAGES["NO_PANELS"]["leave_boss"], IMAGES["NO_PANELS"]["settings"], IMAGES["NO_PANELS"]["tournament"],
+    IMAGES["NO_PANELS"]["pet_damage"], IMAGES["NO_PANELS"]["master_damage"]
+]
+
+# Images that are always visible while no panel is expanded over the game screen.
+SCREEN_IMAGES = [
+    IMAGES["NO_PANELS"]["settings"], IMAGES["NO_PANELS"]["clan_raid_ready"], IMAGES["NO_PANELS"]["clan_no_raid"]
+]
+
+AD_IMAGES = [
+    IMAGES["ADS"]["collect_ad"], IMAGES["ADS"]["watch_ad"]
+]
+
+# Every image a frame may be classified with, duplicates removed while retaining their ordering.
+STATE_IMAGES = list(OrderedDict.fromkeys(GAME_IMAGES + SCREEN_IMAGES + AD_IMAGES + list(PANELS.values()) + [
+    IMAGES["GENERIC"]["expand_panel"], IMAGES["GENERIC"]["collapse_panel"], IMAGES["GENERIC"]["large_exit_panel"],
+    IMAGES["WELCOME"]["welcome_header"], IMAGES["RATE"]["rate_icon"]
+]))
+
+
+class ScreenState(object):
+    """
+    State of the game screen within a single frame.
+
+    Features of the state are only matched when they're first accessed, and only the images required to determine
+    that feature are searched for. Every image matched is retained in the hit map of the state, so features sharing
+    images (and features accessed again) re-use those results instead of matching again.
+
+    panel: Name of the panel currently open, or None if no panel is open.
+    collapsed, expanded: Whether or not the expand (panel is collapsed), or collapse (panel is expanded) button is visible.
+    exit, large_exit: Whether or not the exit panel, or large exit panel buttons are visible.
+    screen: Whether or not the game screen is visible (ie: no panel is expanded over the game screen).
+    ad, welcome, rate: Whether or not an ad, welcome or rate prompt is present.
+    boss: "fight" when a boss fight can be started, "leave" when a boss is being fought, None otherwise.
+    game: Whether or not any image present only on the game screen is visible.
+    """
+    def __init__(self, grabber, frame):
+        self.grabber = grabber
+        self.frame = frame
+
+        self.hits = OrderedDict()
+
+    def _search(self, images, mode=SEARCH_ALL):
+        """
+        Match any images not yet present in our hit map against our frame.
+        """
+        missing = [image for image in images if image not in self.hits]
+        if missing:
+            self.hits.update(self.grabber.search_many(images=missing, mode=mode, im=self.frame))
+
+    def found(self, image):
+        """
+        Determine whether or not a single image is present.
+        """
+        self._search(images=[image])
+        return self.hits[image].found
+
+    def any(self, images):
+        """
+        Determine whether or not any of the images specified are present, matching stops at the first image found.
+        """
+        if not any(self.hits[image].found for image in images if image in self.hits):
+            self._search(images=images, mode=SEARCH_ANY)
+
+        return any(self.hits[image].found for image in images if image in self.hits)
+
+    def is_open(self, panel):
+        """
+        Determine whether or not the specified panel is open, only the image of that panel is matched.
+        """
+        return self.found(image=PANELS[panel])
+
+    @property
+    def panel(self):
+        # Panels are never open at the same time, so matching stops at the first panel found, in order.
+        if not any(self.hits[image].found for image in PANELS.values() if image in self.hits):
+            self._search(images=list(PANELS.values()), mode=SEARCH_FIRST)
+
+        return next((panel for panel, image in PANELS.items() if image in self.hits and self.hits[image].found), None)
+
+    @property
+    def collapsed(self):
+        return self.found(image=IMAGES["GENERIC"]["expand_panel"])
+
+    @property
+    def expanded(self):
+        return self.found(image=IMAGES["GENERIC"]["collapse_panel"])
+
+    @property
+    def exit(self):
+        return self.found(image=IMAGES["GENERIC"]["exit_panel"])
+
+    @property
+    def large_exit(self):
+        return self.found(image=IMAGES["GENERIC"]["large_exit_panel"])
+
+    @property
+    def screen(self):
+        return self.any(images=SCREEN_IMAGES)
+
+    @property
+    def ad(self):
+        return self.any(images=AD_IMAGES)
+
+    @property
+    def welcome(self):
+        return self.found(image=IMAGES["WELCOME"]["welcome_header"])
+
+    @property
+    def rate(self):
+        return self.found(image=IMAGES["RATE"]["rate_icon"])
+
+    @property
+    def boss(self):
+        if self.found(image=IMAGES["NO_PANELS"]["fight_boss"]):
+            return "fight"
+        if self.found(image=IMAGES["NO_PANELS"]["leave_boss"]):
+            return "leave"
+
+        return None
+
+    @property
+    def game(self):
+        return self.any(images=GAME_IMAGES)
+
+    @property
+    def transition(self):
+        return not self.game
+
+    @property
+    def prompt(self):
+        return self.ad or self.welcome or self.rate or self.large_exit
+
+
+class ScreenClassifier(object):
+    """
+    ScreenClassifier determines the state of the game screen from a single frame. Only the features of the state
+    that are accessed are ever matched, so callers only pay for the images they ask about.
+
+    The state of the last frame classified is retained, classifying the same frame again (ie: no input has been
+    sent to the window since) returns that state, re-using any images already matched.
+    """
+    def __init__(self, grabber):
+        self.grabber = grabber
+
+        self._state = None
+
+    def classify(self, testing=False):
+        """
+        Classify the current game screen. The testing boolean is used to classify the current snapshot of
+        the grabber instead of the actual screen.
+        """
+        frame = self.grabber.current if testing else self.grabber.snapshot()
+        if self._state is None or self._state.frame is not frame:
+            self._state = ScreenState(grabber=self.grabber, frame=frame)
+
+        return self._state
@@ -1,7 +1,6 @@
 from settings import BOT_VERSION
 
 from django.utils import timezone
-from django.conf import settings
 
 from titandash.models.statistics import Statistics, PrestigeStatistics, ArtifactStatistics, Session, Log
 from titandash.models.artifact import Artifact
@@ -9,16 +8,22 @@ from titandash.models.prestige import Prestige
 
 from .maps import (
     STATS_COORDS, STAGE_COORDS, GAME_LOCS, PRESTIGE_COORDS,
-    ARTIFACT_MAP, CLAN_COORDS, CLAN_RAID_COORDS, HERO_COORDS, EQUIPMENT_COORDS,
+    CLAN_COORDS, CLAN_RAID_COORDS, HERO_COORDS, EQUIPMENT_COORDS,
 )
 from .utilities import convert, delta_from_values, globals
+from .frame import Frame
+from .recognizer import recognizer, RecognitionWorker
+from .ocr import ocr
+from .digits import process_stage, read_stage, read_mask
+from .ocrcache import OCRCache
+from .rows import parse_hero_rows, parse_gear_rows
 from .constants import MELEE, SPELL, RANGED
 
 from PIL import Image
 
-import threading
+from collections import OrderedDict
+
 import datetime
-import pytesseract
 import cv2
 import numpy as np
 import imagehash
@@ -66,10 +71,8 @@ class Stats:
 
         # Grabber is used to perform OCR updates when grabbing game statistics.
         self.grabber = grabber
-
-        # Updating the pytesseract command that is used based on the one
-        # present in the django settings... Which should be handled by our bootstrapper.
-        pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_COMMAND
+        # Text parsed from regions that haven't changed is re-used instead of being parsed again.
+        self.ocr_cache = OCRCache()
 
     def increment_ads(self):
         self.statistics.bot_statistics.ads += 1
@@ -96,17 +99,15 @@ class Stats:
         Process the grabbers current image before OCR extraction attempt.
         """
         if current:
-            self.grabber.snapshot(region=region)
-        if image:
-            image = image
+            frame = self.grabber.snapshot(region=region)
+        elif image:
+            frame = image if isinstance(image, Frame) else Frame(image=image)
         else:
-            image = self.grabber.current
-
-        image = np.array(image)
+            frame = self.grabber.current
 
         # Resize and desaturate.
-        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        image = cv2.resize(frame.array, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+        image = Frame.to_gray(array=image)
         # Apply dilation and erosion.
         kernel = np.ones((1, 1), np.uint8)
         image = cv2.dilate(image, kernel, iterations=iterations)
@@ -115,29 +116,7 @@ class Stats:
         return Image.fromarray(image)
 
     def _process_stage(self, scale=5, threshold=100, image=None):
-        if image:
-            image = image
-        else:
-            image = self.grabber.current
-
-        image = np.array(image)
-
-        # Resize image.
-        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
-        # Create gray scale.
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        # Perform threshold on image.
-        retr, mask = cv2.threshold(image, 230, 255, cv2.THRESH_BINARY)
-
-        # Find contours.
-        contours, hier = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-        # Draw black over counters smaller than 200, removing un wanted blobs from stage image.
-        for contour in contours:
-            if cv2.contourArea(contour) < threshold:
-                cv2.drawContours(mask, [contour], 0, (0,), -1)
-
-        return Image.fromarray(mask)
+        return process_stage(image=image if image else self.grabber.current, scale=scale, threshold=threshold)
 
     @staticmethod
     def images_duplicate(image_one, image_two, cutoff=2):
@@ -146,9 +125,12 @@ class Stats:
         library.
 
         We can get an average hash of each image and compare them, using a cutoff to determine if
-        they are similar enough to end the loop.
+        they are similar enough to end the loop. Frames will re-use their cached hash when one is available.
         """
-        if imagehash.average_hash(image=image_one) - imagehash.average_hash(image=image_two) < cutoff:
+        hash_one = image_one.average_hash if isinstance(image_one, Frame) else imagehash.average_hash(image=image_one)
+        hash_two = image_two.average_hash if isinstance(image_two, Frame) else imagehash.average_hash(image=image_two)
+
+        if hash_one - hash_two < cutoff:
             return True
         else:
             return False
@@ -168,94 +150,66 @@ class Stats:
         from titandash.bot.core.utilities import sleep
         from titandash.bot.core.utilities import drag_mouse
 
-        _threads = []
-        _found = []
-
-        def parse_image(_artifacts, _image):
-            """
-            Threaded Function.
-
-            Initialize a thread with this function and specific image to search for the specified list of artifacts.
-            """
-            _local_found = []
-            for artifact in _artifacts:
-                if artifact.artifact.name in _found:
-                    continue
-
-                # Get cv2 re-sized version of the artifact image.
-                # We use cv2 because the imagesearch library uses that image module.
-                artifact_image = cv2.imread(ARTIFACT_MAP.get(artifact.artifact.name))
-                if self.grabber.search(image=artifact_image, bool_only=True, im=_image):
-                    _local_found.append(artifact.artifact.name)
-
-            if _local_found:
-                self.logger.info("{length} artifacts found".format(length=len(_local_found)))
-                _found.extend(_local_found)
-
         # Region used when taking screenshots of the window of artifacts.
         capture_region = ARTIFACT_COORDS["parse_region"]
         locs = GAME_LOCS["GAME_SCREEN"]
 
-        # Take an initial screenshot of the artifacts panel.
-        self.grabber.snapshot(region=capture_region)
-        # Creating a list that will be used to place image objects
-        # into from the grabber.
-        images_container = [self.grabber.current]
-
-        # Looping forever until we break from our loop
-        # due to us finding a duplicate image.
-        loops = 0
-        while True:
-            loops += 1
-
-            drag_mouse(start=locs["scroll_start"], end=locs["scroll_bottom_end"], window=self.window)
-            sleep(1)
-
-            # Take another screenshot of the screen now.
-            self.logger.info("taking screenshot {loop} of current artifacts on screen.".format(loop=loops))
-            self.grabber.snapshot(region=capture_region)
-
-            if self.images_duplicate(image_one=self.grabber.current, image_two=images_container[-1]):
-                # We should now have a list of all images available with the users entire
-                # set of owned artifacts. We can use this during parsing.
-                self.logger.info("duplicate images found, ending screenshot loop.")
-                break
-            else:
-                images_container.append(self.grabber.current)
+        # Only unowned artifacts need to be found, each screenshot is recognized by our worker as soon
+        # as it's taken, while we continue scrolling through the panel.
+        unowned = [artifact.artifact.name for artifact in self.artifact_statistics.artifacts.filter(owned=False)]
+        worker = RecognitionWorker(recognizer=recognizer, artifacts=unowned)
+        worker.start()
 
-            if loops == 30:
-                self.logger.warning("30 screenshots have been reached... breaking loop manually now.")
-                break
+        try:
+            # Take an initial screenshot of the artifacts panel. Only the last screenshot
+            # is kept, screenshots are released by the worker once recognized.
+            last = self.grabber.snapshot(region=capture_region)
+            worker.submit(frame=last)
+
+            # Looping until every unowned artifact has been found, or we break
+            # from our loop due to us finding a duplicate image.
+            loops = 0
+            while not worker.resolved:
+                loops += 1
+
+                drag_mouse(start=locs["scroll_start"], end=locs["scroll_bottom_end"], window=self.window)
+                sleep(1)
+
+                # Take another screenshot of the screen now.
+                self.logger.info("taking screenshot {loop} of current artifacts on screen.".format(loop=loops))
+                current = self.grabber.snapshot(region=capture_region)
+
+                if self.images_duplicate(image_one=current, image_two=last):
+                    # Every screenshot available with the users entire set of
+                    # owned artifacts has been taken at this point.
+                    self.logger.info("duplicate images found, ending screenshot loop.")
+                    break
+                else:
+                    last = current
+                    worker.submit(frame=last)
 
-        # Looping through each image, creating a new thread to parse the information
-        # about the artifacts present.
-        unowned = self.artifact_statistics.artifacts.filter(owned=False)
-        for index, image in enumerate(images_container):
-            # Firing and forgetting our threads... Functionality can continue while this runs.
-            # Since a prestige never takes place right after a artifacts parse (or it shouldn't).
-            _threads.append(threading.Thread(name="ParserThread{index}".format(index=index), target=parse_image, kwargs={
-                "_artifacts": unowned,
-                "_image": image
-            }))
-            self.logger.info("created new thread ({thread}) for artifact parsing.".format(thread=_threads[-1]))
+                if loops == 30:
+                    self.logger.warning("30 screenshots have been reached... breaking loop manually now.")
+                    break
+            else:
+                self.logger.info("every unowned artifact has been found, ending screenshot loop.")
 
-        for thread in _threads:
-            self.logger.info("starting thread {thread}".format(thread=thread))
-            thread.start()
+        # Waiting for every screenshot taken to be recognized.
+        finally:
+            worker.finish()
 
-        self.logger.info("waiting for threads to finish...")
-        for thread in _threads:
-            thread.join()
+        found = worker.found & set(unowned)
+        self.logger.info("{length} artifacts found".format(length=len(found)))
 
-        self.artifact_statistics.artifacts.filter(artifact__name__in=_found).update(owned=True)
+        self.artifact_statistics.artifacts.filter(artifact__name__in=found).update(owned=True)
 
     def skill_ocr(self, region):
         """
         Parse out a skills current level when given the region of the levels text on screen.
         """
-        self.grabber.snapshot(region=region)
+        frame = self.grabber.snapshot(region=region)
 
-        text = pytesseract.image_to_string(image=self._process(), config="--psm 7")
+        text = self.ocr_cache.parse(kind="skill", frame=frame, parse=lambda frame: ocr.image_to_string(image=self._process(image=frame)))
 
         if "," in text:
             text = text.split(",")[1]
@@ -269,76 +223,119 @@ class Stats:
             self.logger.warning("skill was parsed incorrectly, returning level 0.")
             return 0
 
-    def update_ocr(self, test_set=None):
+    def _parse_stat(self, key, text):
         """
-        Update the stats by parsing and extracting the text from the games stats page using the
-        tesseract OCR engine to perform text parsing.
-
-        Note that the current screen should be the stats page before calling this method.
+        Parse the value of a single statistic out of the text extracted from its region, None is
+        returned if no valid value could be parsed.
         """
-        for key, region in STATS_COORDS.items():
-            if test_set:
-                image = Image.open(test_set[key])
-            else:
-                self.grabber.snapshot(region=region)
-                image = self._process()
-
-            text = pytesseract.image_to_string(image, config='--psm 7')
-            self.logger.debug("ocr result: {key} -> {text}".format(key=key, text=text))
+        # The images do not always parse correctly, so we can attempt to parse out our expected
+        # value from the STATS_COORD tuple being used.
 
-            # The images do not always parse correctly, so we can attempt to parse out our expected
-            # value from the STATS_COORD tuple being used.
-
-            # Firstly, confirm that a number is present in the text result, if no numbers are present
-            # at all, safe to assume the OCR has failed wonderfully.
-            if not any(char.isdigit() for char in text):
-                self.logger.warning("no digits found in ocr result, skipping key: {key}".format(key=key))
-                continue
+        # Firstly, confirm that a number is present in the text result, if no numbers are present
+        # at all, safe to assume the OCR has failed wonderfully.
+        if not any(char.isdigit() for char in text):
+            self.logger.warning("no digits found in ocr result, skipping key: {key}".format(key=key))
+            return None
 
-            # Otherwise, attempt to parse out the proper value.
-            try:
-                if len(text.split(':')) == 2:
-                    value = text.split(':')[-1].replace(" ", "")
+        # Otherwise, attempt to parse out the proper value.
+        try:
+            if len(text.split(':')) == 2:
+                value = text.split(':')[-1].replace(" ", "")
+            else:
+                if key == "play_time":
+                    value = " ".join(text.split(" ")[-2:])
                 else:
-                    if key == "play_time":
-                        value = " ".join(text.split(" ")[-2:])
-                    else:
-                        value = text.split(" ")[-1].replace(" ", "")
-
-                # Finally, a small check to see that a value can successfully made into an
-                # integer, float with either its last character taken off (K, M, %, etc).
-                # This check is not required for the "play_time" key.
-                if not key == "play_time":
-                    try:
-                        if not value[-1].isdigit():
+                    value = text.split(" ")[-1].replace(" ", "")
+
+            # Finally, a small check to see that a value can successfully made into an
+            # integer, float with either its last character taken off (K, M, %, etc).
+            # This check is not required for the "play_time" key.
+            if not key == "play_time":
+                try:
+                    if not value[-1].isdigit():
+                        try:
+                            int(value[:-1])
+                        except ValueError:
                             try:
-                                int(value[:-1])
+                                float(value[:-1])
                             except ValueError:
-                                try:
-                                    float(value[:-1])
-                                except ValueError:
-                                    continue
+                                return None
 
-                        # Last character is a digit, value may be pure digit of some sort?
-                        else:
+                    # Last character is a digit, value may be pure digit of some sort?
+                    else:
+                        try:
+                            int(value)
+                        except ValueError:
                             try:
-                                int(value)
+                                float(value)
                             except ValueError:
-                                try:
-                                    float(value)
-                                except ValueError:
-                                    continue
-                    except IndexError:
-                        self.logger.error(
-                            "{key} - {value} could not be accessed parsed properly.".format(key=key, value=value))
-
-                self.logger.info("parsed value: {key} -> {value}".format(key=key, value=value))
+                                return None
+                except IndexError:
+                    self.logger.error(
+                        "{key} - {value} could not be accessed parsed properly.".format(key=key, value=value))
+
+            self.logger.info("parsed value: {key} -> {value}".format(key=key, value=value))
+            return value
+
+        # Gracefully continuing if failure occurs.
+        except ValueError:
+            self.logger.error("could not parse {key}: (ocr result: {text})".format(key=key, text=text))
+            return None
+
+    def read_stats(self, test_set=None):
+        """
+        Read every statistic present on the games stats page. The stats page is captured once, with every
+        region cropped from that single frame and parsed by our ocr engines concurrently.
+
+        A dictionary containing the value parsed for each statistic is returned, statistics that
+        could not be parsed are None.
+        """
+        if test_set:
+            images = [Image.open(test_set[key]) for key in STATS_COORDS]
+        else:
+            frame = self.grabber.snapshot()
+            images = [self._process(image=frame.crop(region)) for region in STATS_COORDS.values()]
+
+        values = OrderedDict()
+        for key, text in zip(STATS_COORDS, ocr.image_to_strings(images=images)):
+            self.logger.debug("ocr result: {key} -> {text}".format(key=key, text=text))
+            values[key] = self._parse_stat(key=key, text=text)
+
+        return values
+
+    def update_ocr(self, test_set=None):
+        """
+        Update the stats by parsing and extracting the text from the games stats page using the
+        tesseract OCR engine to perform text parsing. Every statistic parsed is saved at once.
+
+        Note that the current screen should be the stats page before calling this method.
+        """
+        values = self.read_stats(test_set=test_set)
+        for key, value in values.items():
+            if value is not None:
                 setattr(self.statistics.game_statistics, key, value)
-                self.statistics.game_statistics.save()
 
-            # Gracefully continuing loop if failure occurs.
-            except ValueError:
-                self.logger.error("could not parse {key}: (ocr result: {text})".format(key=key, text=text))
+        if any(value is not None for value in values.values()):
+            self.statistics.game_statistics.save()
+
+        return values
+
+    def _read_stage(self, image, scale=3):
+        """
+        Read the stage number present in an image of the stage region through our digit recognizer,
+        falling back to tesseract when the recognizer isn't confident.
+        """
+        return read_stage(image=image, scale=scale)
+
+    def parse_stage(self, frame):
+        """
+        Parse the stage number present in a frame of the stage region, re-using the last number parsed
+        while the region is unchanged. Only digit like characters are present in the text of the number.
+        """
+        number = self.ocr_cache.parse(kind="stage", frame=frame, parse=read_mask, preprocess=lambda frame: process_stage(image=frame, scale=3))
+        self.logger.debug("parsed value: {number}".format(number=number))
+
+        return number
 
     def stage_ocr(self, test_image=None):
         """
@@ -348,17 +345,9 @@ class Stats:
         region = STAGE_COORDS["region"]
 
         if test_image:
-            image = self._process_stage(scale=3, image=test_image)
-        else:
-            self.grabber.snapshot(region=region)
-            image = self._process_stage(scale=3)
-
-        text = pytesseract.image_to_string(image, config='--psm 7 nobatch digits')
-        self.logger.debug("parsed value: {text}".format(text=text))
+            return self._read_stage(image=test_image).text
 
-        # Do some light parse work here to make sure only digit like characters are present
-        # in the returned 'text' variable retrieved through tesseract.
-        return ''.join(filter(lambda x: x.isdigit(), text))
+        return self.parse_stage(frame=self.grabber.snapshot(region=region)).text
 
     def get_advance_start(self, test_image=None):
         """
@@ -370,17 +359,15 @@ class Stats:
         self.logger.info("attempting to parse out the advance start value for current prestige")
         region = PRESTIGE_COORDS["event" if globals.events() else "base"]["advance_start"]
 
+        # Reading the value through our digit recognizer, similar to the stage ocr function.
         if test_image:
-            image = self._process_stage(test_image)
+            text = self._read_stage(image=test_image, scale=5).text
         else:
-            self.grabber.snapshot(region=region)
-            image = self._process_stage()
+            text = self.ocr_cache.parse(kind="advance_start", frame=self.grabber.snapshot(region=region), parse=read_mask, preprocess=lambda frame: process_stage(image=frame, scale=5)).text
 
-        text = pytesseract.image_to_string(image, config="--psm 7 nobatch digits")
         self.logger.info("parsed value: {text}".format(text=text))
 
-        # Doing some light parse work, similar to the stage ocr function to remove letters if present.
-        return ''.join(filter(lambda x: x.isdigit(), text))
+        return text
 
     def update_prestige(self, artifact, current_stage=None, test_image=None):
         """
@@ -401,7 +388,7 @@ class Stats:
         else:
             image = self._process(scale=3, current=True, region=region)
 
-        text = pytesseract.image_to_string(image, config='--psm 7')
+        text = ocr.image_to_string(image=image)
         self.logger.info("parsed value: {text}".format(text=text))
 
         # We now have the amount of time that this prestige took place, appending it to the list of prestiges
@@ -457,15 +444,15 @@ class Stats:
         region_name = CLAN_COORDS["info_name"]
         region_code = CLAN_COORDS["info_code"]
 
+        def parse(frame):
+            return ocr.image_to_string(image=self._process(image=frame))
+
         if test_images:
-            image_name = self._process(test_images[0])
-            image_code = self._process(test_images[1])
+            name = parse(test_images[0])
+            code = parse(test_images[1])
         else:
-            image_name = self._process(current=True, region=region_name)
-            image_code = self._process(current=True, region=region_code)
-
-        name = pytesseract.image_to_string(image=image_name, config="--psm 7")
-        code = pytesseract.image_to_string(image=image_code, config="--psm 7")
+            name = self.ocr_cache.parse(kind="clan_name", frame=self.grabber.snapshot(region=region_name), parse=parse)
+            code = self.ocr_cache.parse(kind="clan_code", frame=self.grabber.snapshot(region=region_code), parse=parse)
 
         return name, code
 
@@ -483,7 +470,7 @@ class Stats:
         else:
             image = self._process(current=True, region=region)
 
-        text = pytesseract.image_to_string(image=image, config="--psm 7")
+        text = ocr.image_to_string(image=image)
         self.logger.info("text parsed: {text}".format(text=text))
 
         delta = delta_from_values(values=text.split(" ")[3:])
@@ -494,72 +481,42 @@ class Stats:
         else:
             return None
 
-    def get_first_hero_information(self):
-        """
-        Given a tuple of coordinates that represents an individual "hero" present in the un-collapsed top
-        of our heroes panel, we can loop until we find a hero that has been levelled at least one.
-        """
-        for hero_locations in HERO_COORDS["heroes"]:
-            hero = None
-            dps = False
-            # Checking the first three heroes on our panel for the one with damage information.
-            # This represents our first "valid" hero, gathering the damage type only.
-            for loc, region in hero_locations.items():
-                if loc == "type":
-                    if self.grabber.search(image=self.images.melee_type, region=region, bool_only=True):
-                        hero = MELEE
-                    elif self.grabber.search(image=self.images.spell_type, region=region, bool_only=True):
-                        hero = SPELL
-                    elif self.grabber.search(image=self.images.ranged_type, region=region, bool_only=True):
-                        hero = RANGED
-
-                # Check for zero dps.
-                # If the zero dps image is not present, this hero has levels.
-                elif loc == "dps":
-                    dps = not self.grabber.search(image=self.images.zero_dps, region=region, bool_only=True)
-
-            # Returning the first non zero dps hero once one is found.
-            # That damage type can be used if a locked piece of equipment is available.
-            if dps and hero:
-                return hero
+    def parse_hero_rows(self, test_image=None):
+        """
+        Parse every hero row present in the un-collapsed top of our heroes panel.
+        """
+        return parse_hero_rows(grabber=self.grabber, test_image=test_image)
+
+    def get_first_hero_information(self, test_image=None):
+        """
+        Find the first hero that has been levelled at least once in the un-collapsed top of our heroes panel,
+        returning the damage type of that hero. That damage type can be used if a locked piece of equipment is available.
+        """
+        for row in self.parse_hero_rows(test_image=test_image):
+            if row.dps and row.type:
+                return row.type
         return None
 
-    def get_first_gear_of(self, typ):
+    def parse_gear_rows(self, types=(MELEE, SPELL, RANGED), test_image=None):
+        """
+        Parse every gear row present at the top of the current equipment tab.
+        """
+        return parse_gear_rows(grabber=self.grabber, types=types, test_image=test_image)
+
+    def get_first_gear_of(self, typ, test_image=None):
         """
         Attempt to find the first "locked" piece of gear of the specified type on the screen.
 
         We are expecting that the equipment tab is open at this point and at the top of the screen.
         """
-        for gear_locations in EQUIPMENT_COORDS["gear"]:
-            gear = {
-                typ: False,
-                "equip": None,
-                "locked": False,
-                "equipped": False,
-            }
-            for loc, region in gear_locations.items():
-                if loc == "base":
-                    gear["equipped"] = not self.grabber.search(image=self.images.equip, region=region, bool_only=True)
-                elif loc == "locked":
-                    gear["locked"] = self.grabber.search(image=self.images.locked, region=region, bool_only=True)
-                elif loc == "bonus":
-                    # Looking for the bonus "type" within the region for the "bonus" image.
-                    # The specified type would be present (bonus=True) if this gear is of the right type.
-                    gear[typ] = self.grabber.search(image=getattr(self.images, 'bonus_{typ}'.format(typ=typ)), region=region, bool_only=True)
-                # Store location of equip button for each gear parsed.
-                elif loc == "equip":
-                    gear["equip"] = region  # Really a point here.
-
-            # Gear is not locked, skip this piece...
-            if not gear["locked"]:
-                continue
-            # Gear is not proper type.
-            if not gear[typ]:
+        for row in self.parse_gear_rows(types=(typ,), test_image=test_image):
+            # Gear is not locked, or not the proper type, skip this piece...
+            if not row.locked or typ not in row.bonus:
                 continue
-            if gear["equipped"]:
+            if row.equipped:
                 return True, "EQUIPPED"
             else:
-                return True, gear["equip"]
+                return True, row.equip
 
         # No specified gear of the type was found, return
         # invalid tuple of vales.
@@ -0,0 +1,198 @@
+from .maps import IMAGES, ARTIFACT_MAP
+from .constants import (
+    LOGGER_NAME, SIGNATURE_GRID, SIGNATURE_CORRELATION, SIGNATURE_HISTOGRAM_BINS, SIGNATURE_HISTOGRAM_THRESHOLD
+)
+
+from threading import Lock
+
+import numpy as np
+import cv2
+import logging
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class TemplateLoadError(Exception):
+    pass
+
+
+class Signature(object):
+    """
+    Signature derived from a template, used to cheaply determine whether or not a template is clearly absent
+    from a location in a frame, without correlating the template against it.
+
+    Samples are the average intensity of each cell in a grid over the template, so they remain stable when a
+    template is found a pixel or two away from where it's expected. Like our template matching, samples and histograms
+    are compared after normalizing their brightness and contrast, so templates on dimmed screens still match.
+    """
+    def __init__(self, image, grid=SIGNATURE_GRID, bins=SIGNATURE_HISTOGRAM_BINS):
+        self.height, self.width = image.shape[:2]
+        self.grid = grid
+        self.bins = bins
+
+        self.samples = self._samples(gray=image)
+        self.histogram = self._histogram(gray=image)
+
+    def _samples(self, gray):
+        samples = cv2.resize(gray, (self.grid, self.grid), interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+        samples -= samples.mean()
+        norm = np.linalg.norm(samples)
+        return samples / norm if norm else None
+
+    def _histogram(self, gray):
+        gray = gray.astype(np.float32)
+        std = gray.std()
+        if not std:
+            return None
+
+        histogram = np.histogram(np.clip((gray - gray.mean()) / std, -2.5, 2.5), bins=self.bins, range=(-2.5, 2.5))[0]
+        return histogram / histogram.sum()
+
+    def check(self, frame, position, correlation=SIGNATURE_CORRELATION, threshold=SIGNATURE_HISTOGRAM_THRESHOLD):
+        """
+        Check the signature against the specified location (top left corner) of a frame. False is only returned
+        when both the samples and the intensity histogram clearly fail to match.
+        """
+        x, y = position
+        if x < 0 or y < 0 or x + self.width > frame.width or y + self.height > frame.height:
+            return True
+        # Flat templates can't be told apart by their signature.
+        if self.samples is None or self.histogram is None:
+            return True
+
+        gray = frame.gray[y:y + self.height, x:x + self.width]
+
+        samples = self._samples(gray=gray)
+        if samples is not None and np.dot(samples, self.samples) >= correlation:
+            return True
+
+        histogram = self._histogram(gray=gray)
+        return histogram is not None and bool(np.minimum(histogram, self.histogram).sum() >= threshold)
+
+
+class Template(object):
+    """
+    Template represents a single image that is searched for on the screen. The image is decoded from disk
+    once, converted to grayscale and stored alongside the shape metadata used when clicking on the template.
+    """
+    def __init__(self, path, image):
+        self.path = path
+        self.image = image
+        self.height, self.width = image.shape[:2]
+
+        self._pyramid = None
+        self._signature = None
+
+    def __str__(self):
+        return "{path} ({width}x{height})".format(path=self.path, width=self.width, height=self.height)
+
+    def __repr__(self):
+        return "<Template: {template}>".format(template=self)
+
+    @property
+    def shape(self):
+        return self.height, self.width
+
+    @property
+    def signature(self):
+        """
+        Retrieve the signature of the template, derived on first access.
+        """
+        if self._signature is None:
+            self._signature = Signature(image=self.image)
+        return self._signature
+
+    def pyramid(self, level):
+        """
+        Retrieve the template downscaled by a factor of 2 ** level.
+        """
+        # Levels are built on a copy and swapped in, templates are shared between search threads.
+        pyramid = self._pyramid or [self.image]
+        while len(pyramid) <= level:
+            pyramid = pyramid + [cv2.pyrDown(pyramid[-1])]
+
+        self._pyramid = pyramid
+        return pyramid[level]
+
+    @classmethod
+    def from_array(cls, array, path=None):
+        """
+        Generate a template from an already decoded cv2 (BGR) or grayscale array.
+        """
+        if array.ndim == 3:
+            array = cv2.cvtColor(array, cv2.COLOR_BGR2GRAY)
+
+        return cls(path=path, image=array)
+
+
+class TemplateBank(object):
+    """
+    Process wide store of all templates used by the bot.
+
+    Every image present in our IMAGES and ARTIFACT_MAP is decoded once and shared by all bot
+    instances running in the process, any image search or image click should retrieve their templates from here.
+    """
+    def __init__(self):
+        self._templates = dict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._templates)
+
+    def __contains__(self, path):
+        return path in self._templates
+
+    @staticmethod
+    def paths():
+        """
+        Retrieve every template path that is known to the bot.
+        """
+        paths = [path for group in IMAGES.values() for path in group.values()]
+        paths.extend(ARTIFACT_MAP.values())
+
+        # Removing duplicate paths while retaining their original ordering.
+        return list(dict.fromkeys(paths))
+
+    def _load(self, path):
+        """
+        Decode the specified path into a grayscale template.
+        """
+        image = cv2.imread(path, 0)
+        if image is None:
+            raise TemplateLoadError("unable to load template image: {path}".format(path=path))
+
+        return Template(path=path, image=image)
+
+    def preload(self):
+        """
+        Load every known template into the bank, templates that have already been loaded are skipped.
+        """
+        with self._lock:
+            for path in self.paths():
+                if path not in self._templates:
+                    self._templates[path] = self._load(path=path)
+
+        logger.debug("{length} templates loaded into template bank.".format(length=len(self)))
+
+    def get(self, image):
+        """
+        Retrieve the template for the specified image.
+
+        The image may be a path to an image (loaded and stored if it is not yet present), an existing
+        template, or a decoded cv2 array which is converted into a template without being stored.
+        """
+        if isinstance(image, Template):
+            return image
+        if not isinstance(image, str):
+            return Template.from_array(array=image)
+
+        try:
+            return self._templates[image]
+        except KeyError:
+            with self._lock:
+                if image not in self._templates:
+                    self._templates[image] = self._load(path=image)
+                return self._templates[image]
+
+
+templates = TemplateBank()
@@ -7,12 +7,20 @@ from titandash.models.statistics import Session
 from titandash.models.bot import BotInstance
 from titandash.bot.core.window import WindowHandler
 from titandash.bot.core.bot import Bot
+from titandash.bot.core.digits import digits
+
+from settings import IMAGE_DIR
 
 from pynput.mouse import Listener, Button
 
 
+from PIL import Image
+
 from datetime import timedelta
 
+import numpy as np
+import os
+
 
 def make_bot():
     """
@@ -142,3 +150,22 @@ def make_prestige(instance_id=None, session_uuid=None):
         session=session,
         instance=instance
     )
+
+
+def learn_digits(directory=IMAGE_DIR + "/digits/samples"):
+    """
+    Learn the digit bank from every sample mask present in the samples directory, saving the bank as our digit templates.
+
+    Samples are thresholded masks of numbers in the games digit font, named after the number present in them
+    (ie: 3159_3.png, the suffix is ignored). Samples are cropped from captures of the game, and never from the
+    stage images used by the digit tests, so those tests remain a held out check of the bank.
+
+    from titandash.bot.core.tester import *; learn_digits()
+    """
+    samples = [
+        (np.asarray(Image.open(os.path.join(directory, name)).convert("L")), name.split("_")[0].split(".")[0])
+        for name in sorted(os.listdir(directory)) if name.endswith(".png")
+    ]
+
+    print("learned {count}/{total} samples.".format(count=digits.learn(samples=samples), total=len(samples)))
+    digits.save()
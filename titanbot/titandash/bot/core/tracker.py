@@ -0,0 +1,157 @@
+from django.utils import timezone
+
+from .maps import STAGE_COORDS
+from .constants import STAGE_CHANGE_THRESHOLD, STAGE_CHANGE_PIXELS
+
+from threading import Lock
+
+import numpy as np
+import datetime
+
+
+class StageTracker(object):
+    """
+    StageTracker watches the stage region of every full frame captured by a grabber, only parsing the current
+    stage once the region actually changes, instead of parsing the stage on a fixed interval.
+
+    Changes are determined with a cheap pixel difference of the binarized region against the region last checked.
+    Observing a frame only ever performs this check, so capturing frames never waits on a parse. Changes observed are
+    parsed once the stage is tracked, along with any change to the region since the last frame observed.
+
+    Stages parsed are published to the props of the bot, along with the confidence of the digit recognizer
+    (a score between 0 and 1) and the time that the stage last changed.
+
+    The parse function is called with a frame of the stage region, returning the number recognized within it.
+    """
+    def __init__(self, grabber, props, parse, logger, validate=None, region=STAGE_COORDS["region"], threshold=STAGE_CHANGE_THRESHOLD, pixels=STAGE_CHANGE_PIXELS):
+        self.grabber = grabber
+        self.props = props
+        self.parse = parse
+        self.logger = logger
+        self.validate = validate
+        self.region = tuple(region)
+        self.threshold = threshold
+        self.pixels = pixels
+
+        self._mask = None
+        self._lock = Lock()
+        self._parse_lock = Lock()
+
+        # Last full frame observed, and the time of the last change to the region since the stage was last parsed.
+        self._observed = None
+        self._pending = None
+
+        self.last_stage = None
+
+        # Counters used to determine how often the stage region changes between frames tracked.
+        self.frames = 0
+        self.changes = 0
+
+    def start(self):
+        """
+        Start observing every full frame captured by our grabber.
+        """
+        if self.observe not in self.grabber.observers:
+            self.grabber.observers.append(self.observe)
+
+    def stop(self):
+        if self.observe in self.grabber.observers:
+            self.grabber.observers.remove(self.observe)
+
+    def changed(self, frame):
+        """
+        Determine whether or not the stage region has changed since it was last checked.
+        """
+        mask = frame.gray > self.threshold
+        if self._mask is not None and self._mask.shape == mask.shape and np.count_nonzero(mask != self._mask) <= self.pixels:
+            return False
+
+        self._mask = mask
+        return True
+
+    def check(self, frame, parent=None):
+        """
+        Check a frame of the stage region for changes, the region is pending a parse once it has changed.
+        """
+        self._observed = parent
+        self.frames += 1
+        if self.changed(frame=frame):
+            self.changes += 1
+            self._pending = frame.timestamp
+
+    def observe(self, frame):
+        """
+        Observe the stage region of a full frame, the stage is never parsed here.
+        """
+        with self._lock:
+            self.check(frame=frame.crop(self.region), parent=frame)
+
+    def track(self):
+        """
+        Track the stage region of the game screen, re-using the last full frame captured while it's still valid.
+
+        The stage is only parsed if a change was observed, or if the region has changed since the last frame observed.
+        A boolean is returned representing whether or not a new stage was published.
+        """
+        frame = self.grabber.region(region=self.region)
+        with self._lock:
+            if frame.parent is None or frame.parent is not self._observed:
+                self.check(frame=frame, parent=frame.parent)
+
+            pending, self._pending = self._pending, None
+
+        if pending is None:
+            return False
+
+        return self.update(frame=frame, timestamp=pending)
+
+    def retry(self, timestamp):
+        """
+        Re-arm a change that could not be parsed, so the stage is parsed again the next time it's tracked,
+        unless a newer change has already been observed in the meantime.
+        """
+        with self._lock:
+            if self._pending is None:
+                self._pending = timestamp
+
+    def update(self, frame, timestamp):
+        """
+        Parse and publish the stage present in a frame of the stage region, the timestamp being when the change was seen.
+        A boolean is returned representing whether or not a new stage was published.
+
+        Changes that can't be parsed, or aren't valid, are retried the next time the stage is tracked.
+        """
+        with self._parse_lock:
+            number = self.parse(frame)
+            try:
+                stage = int(number.text)
+            except ValueError:
+                self.logger.debug("current stage could not be parsed... retrying.")
+                self.retry(timestamp=timestamp)
+                return False
+
+            if self.validate and not self.validate(stage):
+                self.retry(timestamp=timestamp)
+                return False
+            if stage == self.props.current_stage:
+                return False
+
+            self.logger.debug("current stage parsed as: {stage} (confidence: {confidence:.2f})".format(stage=stage, confidence=number.score))
+            self.last_stage = self.props.current_stage
+            self.props.update(
+                current_stage=stage,
+                current_stage_confidence=round(number.score, 4),
+                current_stage_changed=datetime.datetime.fromtimestamp(timestamp, tz=timezone.utc)
+            )
+
+            return True
+
+    def stats(self):
+        """
+        Retrieve the current rate of frames tracked that required the stage to be parsed.
+        """
+        return {
+            "frames": self.frames,
+            "changes": self.changes,
+            "change_rate": round(self.changes / self.frames, 4) if self.frames else 0.0
+        }
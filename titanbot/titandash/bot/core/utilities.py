@@ -6,6 +6,7 @@ from titandash.bot.external.imagesearch import *
 from titandash.models.globals import GlobalSettings
 
 from .maps import MASTER_LOCS
+from .templates import templates
 from .constants import (
     STATS_LOOKUP_MULTIPLIER, STATS_TIMEDELTA_STR,
     LOGGER_NAME, LOGGER_FORMAT, LOGGER_FILE_NAME, LOGGER_FILE_NAME_STRFMT,
@@ -263,7 +264,7 @@ def click_on_image(window, image=None, pos=None, button="left", pause=0.0):
     logger.debug("{button} clicking on {image} located at {pos} with {pause}s pause".format(button=button, image=image, pos=pos, pause=pause))
     click_image(
         window=window,
-        image=image,
+        image=templates.get(image),
         pos=pos,
         action=button,
         timestamp=0,
@@ -295,31 +296,34 @@ def in_transition_func(*args, max_loops, **kwargs):
     _self = args[0]
     loops = 0
     while True:
-        # Check for the early game/non vip game prompts that may pop up
-        # while playing the game.
-        _self.welcome_screen_check()
-        _self.rate_screen_check()
-
-        # Is a panel open that should be closed? This large exit panel will close any in game
-        # panels that may of been opened on accident.
-        _self.find_and_click(
-            image=_self.images.large_exit_panel,
-            pause=0.5
-        )
-
-        # Is an ad panel open that should be accepted/declined?
-        _self.collect_ad_no_transition()
-
-        # Check the screen for any images that would represent a non active transition state.
-        # If any of these are found, it's safe to say that we are NOT in a transition.
-        if _self.grabber.search(
-                image=[
-                    _self.images.exit_panel, _self.images.clan_raid_ready, _self.images.clan_no_raid, _self.images.daily_reward,
-                    _self.images.fight_boss, _self.images.hatch_egg, _self.images.leave_boss, _self.images.settings, _self.images.tournament,
-                    _self.images.pet_damage, _self.images.master_damage
-                ],
-                bool_only=True
-        ):
+        # Classifying the screen once, every prompt and transition check below is determined
+        # from the same frame, only re-classifying when a prompt was present and dealt with.
+        state = _self.classifier.classify()
+        if state.prompt:
+            # Check for the early game/non vip game prompts that may pop up
+            # while playing the game.
+            if state.welcome:
+                _self.welcome_screen_check()
+            if state.rate:
+                _self.rate_screen_check()
+
+            # Is a panel open that should be closed? This large exit panel will close any in game
+            # panels that may of been opened on accident.
+            if state.large_exit:
+                _self.find_and_click(
+                    image=_self.images.large_exit_panel,
+                    pause=0.5
+                )
+
+            # Is an ad panel open that should be accepted/declined?
+            if state.ad:
+                _self.collect_ad_no_transition()
+
+            state = _self.classifier.classify()
+
+        # Any images present that would represent a non active transition state mean
+        # it's safe to say that we are NOT in a transition.
+        if not state.transition:
             break
 
         # Clicking the top of the screen in case of a transition taking place due to something being
@@ -1,25 +1,28 @@
 from .constants import (
-    MEMU_WINDOW_FILTER, NOX_WINDOW_FILTER
+    MEMU_WINDOW_FILTER, NOX_WINDOW_FILTER, CAPTURE_BACKEND, WINDOW_GEOMETRY_TTL
 )
 
 from .utilities import globals
-
-from PIL import Image
+from .capture import capture_backend
+from .producer import FrameProducer
+from .x11 import x11
+
+# Windows, geometry and input rely on win32 on windows, and on X11 elsewhere (see x11.py).
+try:
+    import win32gui
+    import win32api
+    import win32con
+except ImportError:
+    win32gui = win32api = win32con = None
+
+from collections import namedtuple
 from threading import Lock
-from ctypes import windll
-
-import win32gui
-import win32ui
-import win32api
-import win32con
 
 import time
 
-# Making use of a screenshot lock, instantiated at the module level of our window.py file.
-# We do this so that any additional bot instances that are started, always use this lock.
-# Only a SINGLE screenshot should be taken at any given time, otherwise we run into issues
-# with our DC retrieval (GetCompatibleDC) and DC deletion.
-_SCREENSHOT_LOCK = Lock()
+
+# Snapshot of a windows title and client rectangle, along with the time it was retrieved.
+WindowGeometry = namedtuple("WindowGeometry", ["text", "rect", "timestamp"])
 
 
 class Window(object):
@@ -28,16 +31,33 @@ class Window(object):
         "left": (win32con.WM_LBUTTONDOWN, win32con.WM_LBUTTONUP),
         "right": (win32con.WM_RBUTTONDOWN, win32con.WM_RBUTTONUP),
         "middle": (win32con.WM_MBUTTONDOWN, win32con.WM_MBUTTONUP),
-    }
+    } if win32con is not None else {button: (button, button) for button in x11.BUTTONS}
 
     EMULATOR_WIDTH = 480
     EMULATOR_HEIGHT = 800
 
-    def __init__(self, hwnd):
+    def __init__(self, hwnd, backend=CAPTURE_BACKEND, ttl=WINDOW_GEOMETRY_TTL):
         self.hwnd = hwnd
         self.x_subtract = 0
         self.debug = hwnd == "DEBUG"
 
+        # Window title and geometry are cached, only retrieved again once older than our ttl,
+        # or when explicitly refreshed. The number of geometry changes detected is tracked.
+        self.ttl = ttl
+        self._geometry = None
+        self.changes = 0
+
+        # Capture backend used to grab the contents of the window, chosen based on
+        # the current platform unless a backend is explicitly specified.
+        self.backend = capture_backend(window=self, name=backend)
+
+        # Optional background frame producer, only present while started.
+        self.producer = None
+
+        # Generation is incremented whenever input is sent to the window, any frames
+        # captured before the current generation no longer represent the screen.
+        self.generation = 0
+
         # Depending on the type of emulator being used (and supported), some differences in the way their window object is defined.
         # Nox: X Axis is not included in window rectangle.  MEmu: X Axis is included. Based on these differences, we should modify appropriately
         # the width and height values before calculating padding.
@@ -51,13 +71,36 @@ class Window(object):
     def __repr__(self):
         return "<Window: {window}>".format(window=self)
 
+    def refresh(self):
+        """
+        Retrieve the current title and geometry of the window, replacing the cached snapshot.
+        """
+        if self.debug:
+            text, rect = "DEBUG WINDOW", (0, 0, self.EMULATOR_WIDTH, self.EMULATOR_HEIGHT)
+        elif win32gui is not None:
+            text, rect = win32gui.GetWindowText(self.hwnd), tuple(win32gui.GetClientRect(self.hwnd))
+        else:
+            text, rect = x11.geometry(hwnd=self.hwnd)
+
+        if self._geometry is not None and self._geometry.rect != rect:
+            self.changes += 1
+
+        self._geometry = WindowGeometry(text=text, rect=rect, timestamp=time.time())
+        return self._geometry
+
+    @property
+    def geometry(self):
+        if self._geometry is None or time.time() - self._geometry.timestamp > self.ttl:
+            return self.refresh()
+        return self._geometry
+
     @property
     def text(self):
-        return win32gui.GetWindowText(self.hwnd) if not self.debug else "DEBUG WINDOW"
+        return self.geometry.text
 
     @property
     def rect(self):
-        return win32gui.GetClientRect(self.hwnd) if not self.debug else [0, 0, self.EMULATOR_WIDTH, self.EMULATOR_HEIGHT]
+        return self.geometry.rect
 
     @property
     def x_padding(self):
@@ -96,6 +139,24 @@ class Window(object):
 
         return False
 
+    def _press(self, point, button="left", down=True):
+        """
+        Press (or release) a mouse button at a point in the window, the point is offset by our expected y padding.
+        """
+        if win32api is not None:
+            win32api.SendMessage(self.hwnd, self.SUPPORTED_CLICK_EVENTS[button][0 if down else 1], 1 if down else 0, win32api.MAKELONG(point[0], point[1] + self.y_padding))
+        else:
+            x11.press(hwnd=self.hwnd, point=(point[0], point[1] + self.y_padding), button=button, down=down)
+
+    def _move(self, point):
+        """
+        Move the mouse (with the left button held) to a point in the window, the point is offset by our expected y padding.
+        """
+        if win32api is not None:
+            win32api.SendMessage(self.hwnd, win32con.WM_MOUSEMOVE, 1, win32api.MAKELONG(point[0], point[1] + self.y_padding))
+        else:
+            x11.move(hwnd=self.hwnd, point=(point[0], point[1] + self.y_padding))
+
     def click(self, point, clicks=1, interval=0.0, button="left", pause=0.0):
         """
         Perform a click on the given window in the background.
@@ -104,24 +165,19 @@ class Window(object):
         whether the window is visible or not.
         """
         globals.failsafe()
-        evt_d = self.SUPPORTED_CLICK_EVENTS[button][0]
-        evt_u = self.SUPPORTED_CLICK_EVENTS[button][1]
-
-        param = win32api.MAKELONG(
-            point[0],
-            point[1] + self.y_padding
-        )
 
         # Loop through all clicks that should take place.
         for x in range(clicks):
             globals.failsafe()
-            win32api.SendMessage(self.hwnd, evt_d, 1, param)
-            win32api.SendMessage(self.hwnd, evt_u, 0, param)
+            self._press(point=point, button=button, down=True)
+            self._press(point=point, button=button, down=False)
 
             # Interval sleeping?
             if interval:
                 time.sleep(interval)
 
+        self.generation += 1
+
         # Pausing after clicks are finished?
         if pause:
             time.sleep(pause)
@@ -134,24 +190,13 @@ class Window(object):
         the window is visible or not.
         """
         globals.failsafe()
-        evt_d = self.SUPPORTED_CLICK_EVENTS[button][0]
-        evt_u = self.SUPPORTED_CLICK_EVENTS[button][1]
-
-        start_param = win32api.MAKELONG(
-            start[0],
-            start[1] + self.y_padding
-        )
-        end_param = win32api.MAKELONG(
-            end[0],
-            end[1] + self.y_padding
-        )
 
         # Perform actionable click on start point just to ensure that
         # our drag will take place.
 
         # Moving the mouse to the starting position for the mouse drag.
         # Mouse left button is DOWN after this point.
-        win32api.SendMessage(self.hwnd, evt_d, 1, start_param)
+        self._press(point=start, button=button, down=True)
 
         # How many mouse movements are needed to complete our drag?
         # DOWN DRAG
@@ -165,12 +210,13 @@ class Window(object):
 
         time.sleep(0.05)
         for i in range(clicks):
-            param = win32api.MAKELONG(start[0], start[1] - i if down else start[1] + i)
-            win32api.SendMessage(self.hwnd, win32con.WM_MOUSEMOVE, 1, param)
+            self._move(point=(start[0], start[1] - i if down else start[1] + i))
             time.sleep(0.001)
 
         time.sleep(0.1)
-        win32api.SendMessage(self.hwnd, evt_u, 0, end_param)
+        self._press(point=end, button=button, down=False)
+
+        self.generation += 1
 
         if pause:
             time.sleep(pause)
@@ -178,46 +224,54 @@ class Window(object):
     def screenshot(self, region=None):
         """
         Take a screenshot of the current window. The window may be visible or behind another window.
+
+        The screenshot is returned as a BGRX array, use a frame to retrieve a PIL image when one is required.
         """
-        _SCREENSHOT_LOCK.acquire()
-
-        hwnd_dc = win32gui.GetWindowDC(self.hwnd)
-        mfc_dc = win32ui.CreateDCFromHandle(hwnd_dc)
-        save_dc = mfc_dc.CreateCompatibleDC()
-        save_bitmap = win32ui.CreateBitmap()
-        save_bitmap.CreateCompatibleBitmap(mfc_dc, self.width, self.height)
-        save_dc.SelectObject(save_bitmap)
-        result = windll.user32.PrintWindow(self.hwnd, save_dc.GetSafeHdc(), 0)
-
-        bmp_info = save_bitmap.GetInfo()
-        bmp_str = save_bitmap.GetBitmapBits(True)
-        image = Image.frombuffer("RGB", (bmp_info["bmWidth"], bmp_info["bmHeight"]), bmp_str, "raw", "BGRX", 0, 1)
-
-        save_dc.DeleteDC()
-        mfc_dc.DeleteDC()
-        win32gui.ReleaseDC(self.hwnd, hwnd_dc)
-        win32gui.DeleteObject(save_bitmap.GetHandle())
-
-        image = image.crop(
-            box=(
-                0,
-                self.y_padding,
-                self.EMULATOR_WIDTH,
-                self.EMULATOR_HEIGHT + self.y_padding
-            )
-        )
-
-        # If a region is present, we can ensure our image is cropped to the
-        # bounding box specified. The region should already take into account
-        # our expected y padding (ie: (110, 440) -> (110, 410). Give or take a couple of pixels.
+        # If a region is present, only the bounding box specified is grabbed from the window.
+        # The region should already take into account our expected y padding (ie: (110, 440) -> (110, 410).
+        # Give or take a couple of pixels.
         if region:
-            image = image.crop(
-                box=region
-            )
+            y_padding = self.y_padding
+            return self.backend.grab(region=(
+                max(region[0], 0),
+                max(region[1], 0) + y_padding,
+                min(region[2], self.EMULATOR_WIDTH),
+                min(region[3], self.EMULATOR_HEIGHT) + y_padding
+            ))
+
+        image = self.backend.grab()
+
+        # Captures are sized by the window itself, a capture that doesn't match our cached geometry means the window
+        # was resized since, the geometry is refreshed right away instead of waiting for it to expire.
+        if image.shape[:2] != (self.height, self.width):
+            self.refresh()
+
+        # Crops are array slices, the returned array is a view into the grabbed bitmap.
+        y_padding = self.y_padding
+        return image[y_padding:self.EMULATOR_HEIGHT + y_padding, 0:self.EMULATOR_WIDTH]
+
+    def start_producer(self, **kwargs):
+        """
+        Start producing frames for this window in the background.
+        """
+        if self.producer is None:
+            self.producer = FrameProducer(window=self, **kwargs)
+        self.producer.start()
 
-        _SCREENSHOT_LOCK.release()
+    def stop_producer(self):
+        """
+        Stop producing frames for this window, if a producer is present.
+        """
+        if self.producer is not None:
+            self.producer.stop()
+            self.producer = None
 
-        return image
+    def close(self):
+        """
+        Release any capture resources held by this window.
+        """
+        self.stop_producer()
+        self.backend.close()
 
     def json(self):
         """Convert window instance to a json compliant dictionary."""
@@ -241,31 +295,73 @@ class InvalidHwndValue(Exception):
 
 
 class WindowHandler(object):
-    """Window handle encapsulates all functionality for handling windows and processes needed."""
+    """
+    Window handle encapsulates all functionality for handling windows and processes needed.
+
+    Windows are stored in a registry shared by every handler, enumerating only ever creates windows that
+    have been opened and removes windows that have been closed since the last enumeration. Filtering information
+    is indexed per window and only re-computed when the cached geometry of a window changes.
+    """
+    _windows = dict()
+    _index = dict()
+    _lock = Lock()
+
     def __init__(self):
         self.filter_lst = MEMU_WINDOW_FILTER + NOX_WINDOW_FILTER
-        self.windows = dict()
+
+    @property
+    def windows(self):
+        return self._windows
 
     def _cb(self, hwnd, extra):
         """Callback handler used when current windows are enumerated."""
-        if hwnd in self.windows:
-            pass
-
-        self.windows[hwnd] = Window(hwnd=hwnd)
+        extra.append(hwnd)
 
     def enum(self):
-        """Begin enumerating windows and generate windows objects."""
-        win32gui.EnumWindows(self._cb, None)
+        """Begin enumerating windows and update the window registry with any added or removed windows."""
+        hwnds = []
+        if win32gui is not None:
+            win32gui.EnumWindows(self._cb, hwnds)
+        else:
+            hwnds = x11.windows()
+
+        with self._lock:
+            current = set(hwnds)
+            for hwnd in set(self._windows) - current:
+                self._windows.pop(hwnd).close()
+                self._index.pop(hwnd, None)
+            for hwnd in current - set(self._windows):
+                self._windows[hwnd] = Window(hwnd=hwnd)
 
     def grab(self, hwnd):
-        self.enum()
+        try:
+            hwnd = int(hwnd)
+        except ValueError:
+            raise InvalidHwndValue()
+
+        # Only enumerating when the window isn't already present in our registry, or it's no longer valid.
+        if hwnd not in self._windows or not (win32gui.IsWindow(hwnd) if win32gui is not None else x11.exists(hwnd=hwnd)):
+            self.enum()
 
         try:
-            return self.windows[int(hwnd)]
+            return self._windows[hwnd]
         except KeyError:
             raise WindowNotFoundError()
-        except ValueError:
-            raise InvalidHwndValue()
+
+    def _indexed(self, window):
+        """
+        Retrieve the indexed ((title, rect), title match, width, height) of the specified window.
+
+        Geometry is compared by value, so refreshing a window whose title and rect are unchanged re-uses the index.
+        """
+        geometry = window.geometry.text, window.geometry.rect
+        entry = self._index.get(window.hwnd)
+
+        if entry is None or entry[0] != geometry:
+            entry = geometry, window.find(self.filter_lst), window.width, window.height
+            self._index[window.hwnd] = entry
+
+        return entry
 
     def filter(self, filter_titles=True, ignore_hidden=True, ignore_smaller=(400, 720)):
         """
@@ -275,14 +371,17 @@ class WindowHandler(object):
         Hidden (ie: 0x0 sized windows are ignored by default).
         Smaller: (ie: Windows smaller than the specified amount).
         """
-        if filter_titles:
-            dct = {hwnd: window for hwnd, window in self.windows.items() if window.find(self.filter_lst)}
-        else:
-            dct = self.windows
-
-        if ignore_hidden:
-            dct = {hwnd: window for hwnd, window in dct.items() if window.width != 0 and window.height != 0}
-        if ignore_smaller:
-            dct = {hwnd: window for hwnd, window in dct.items() if window.width > ignore_smaller[0] and window.height > ignore_smaller[1]}
+        dct = dict()
+        for hwnd, window in list(self._windows.items()):
+            _, title, width, height = self._indexed(window=window)
+
+            if filter_titles and not title:
+                continue
+            if ignore_hidden and (width == 0 or height == 0):
+                continue
+            if ignore_smaller and not (width > ignore_smaller[0] and height > ignore_smaller[1]):
+                continue
+
+            dct[hwnd] = window
 
         return dct
@@ -0,0 +1,107 @@
+from threading import Lock
+
+import sys
+
+# Windows, geometry and input on linux (X11) rely on python3_xlib, only imported when available.
+try:
+    from Xlib import X
+    from Xlib.display import Display
+    from Xlib.error import XError
+    from Xlib.ext import xtest
+except ImportError:
+    X = Display = XError = xtest = None
+
+
+class X11(object):
+    """
+    X11 encapsulates the window functionality used by the bot on linux hosts (ie: emulators running under Xvfb).
+
+    A single display connection is opened on first use and shared by every window, requests are locked so windows
+    may be used from multiple threads. Input is sent through the XTEST extension, at the position of the window on
+    the root window, so every emulator should have its own display when running farms of emulators.
+    """
+    BUTTONS = {
+        "left": 1,
+        "middle": 2,
+        "right": 3,
+    }
+
+    def __init__(self):
+        self._display = None
+        self._lock = Lock()
+
+    @staticmethod
+    def available():
+        """
+        Determine if X11 windows can be used on the current platform.
+        """
+        return Display is not None and not sys.platform.startswith("win")
+
+    @property
+    def display(self):
+        if self._display is None:
+            self._display = Display()
+        return self._display
+
+    def _window(self, hwnd):
+        return self.display.create_resource_object("window", int(hwnd))
+
+    def windows(self):
+        """
+        Retrieve the ids of every top level window present on the display.
+        """
+        with self._lock:
+            return [window.id for window in self.display.screen().root.query_tree().children]
+
+    def exists(self, hwnd):
+        """
+        Determine whether or not the specified window is still present on the display.
+        """
+        with self._lock:
+            try:
+                self._window(hwnd=hwnd).get_geometry()
+            except XError:
+                return False
+
+        return True
+
+    def geometry(self, hwnd):
+        """
+        Retrieve the (title, client rectangle) of the specified window, the rectangle matches the (0, 0, width, height)
+        layout of a win32 client rectangle.
+        """
+        with self._lock:
+            window = self._window(hwnd=hwnd)
+            geometry = window.get_geometry()
+            text = window.get_wm_name() or ""
+
+        return text if isinstance(text, str) else text.decode("utf-8", "replace"), (0, 0, geometry.width, geometry.height)
+
+    def _root(self, hwnd, point):
+        """
+        Translate a point in the specified window to the same point on the root window.
+        """
+        translated = self.display.screen().root.translate_coords(self._window(hwnd=hwnd), point[0], point[1])
+        return translated.x, translated.y
+
+    def move(self, hwnd, point):
+        """
+        Move the pointer to a point in the specified window.
+        """
+        with self._lock:
+            x, y = self._root(hwnd=hwnd, point=point)
+            xtest.fake_input(self.display, X.MotionNotify, x=x, y=y)
+            self.display.sync()
+
+    def press(self, hwnd, point, button="left", down=True):
+        """
+        Press (or release) a mouse button at a point in the specified window.
+        """
+        with self._lock:
+            x, y = self._root(hwnd=hwnd, point=point)
+            xtest.fake_input(self.display, X.MotionNotify, x=x, y=y)
+            xtest.fake_input(self.display, X.ButtonPress if down else X.ButtonRelease, self.BUTTONS[button])
+            self.display.sync()
+
+
+x11 = X11()
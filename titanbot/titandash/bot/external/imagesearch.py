@@ -3,39 +3,46 @@ import numpy as np
 import random
 
 
-def imagesearcharea(window, image, x1, y1, x2, y2, precision=0.8, im=None, logger=None):
+def imagesearchscore(window, image, x1, y1, x2, y2, im=None, logger=None):
     """
-    Searches for an image within an area
+    Searches for an image within an area, returning the best match score and location
 
     input :
-    image : path to the image file (see opencv imread for supported types)
+    image : path to the image file (see opencv imread for supported types), or a preloaded template
     x1 : top left x value
     y1 : top left y value
     x2 : bottom right x value
     y2 : bottom right y value
-    precision : the higher, the lesser tolerant and fewer false positives are found default is 0.8
-    im : a PIL image, useful if you intend to search the same unchanging region for several elements
+    im : a PIL image, BGR(X) array or frame, useful if you intend to search the same unchanging region for several elements
 
     returns :
-    the top left corner coordinates of the element if found as an array [x,y] or [-1,-1] if not
+    the best match score and the top left corner coordinates of that match, or -1 and [-1,-1] if the search fails
     """
     if im is None:
         im = window.screenshot(region=(x1, y1, x2, y2))
 
-    img_rgb = np.array(im)
-    img_gray = cv2.cvtColor(img_rgb, cv2.COLOR_BGR2GRAY)
+    # Frames carry their own cached grayscale view, shared between searches.
+    if hasattr(im, "gray"):
+        img_gray = im.gray
+    # Window screenshots are BGRX arrays, converted with the same channel weighting as our frames.
+    elif isinstance(im, np.ndarray):
+        img_gray = im if im.ndim == 2 else cv2.cvtColor(im, cv2.COLOR_RGBA2GRAY if im.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
+    else:
+        img_rgb = np.array(im)
+        img_gray = cv2.cvtColor(img_rgb, cv2.COLOR_BGR2GRAY)
 
     if isinstance(image, str):
         template = cv2.imread(image, 0)
+    # Preloaded templates are already decoded and converted to grayscale.
+    elif hasattr(image, "image"):
+        template = image.image
     else:
         template = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
     try:
         res = cv2.matchTemplate(img_gray, template, cv2.TM_CCOEFF_NORMED)
         min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
-        if max_val < precision:
-            return [-1, -1]
-        return max_loc
+        return max_val, max_loc
 
     # Catching our error, logging some information about it, and continuing our operation.
     # It seems like that an cv2.error is raised sometimes when attempting to run a cv2.matchTemplate.
@@ -44,9 +51,31 @@ def imagesearcharea(window, image, x1, y1, x2, y2, precision=0.8, im=None, logge
         if logger:
             logger.exception("error occurred while trying to search for image: {image}".format(image=image))
 
-        # Returning the default "not found" list value when our image search does fail.
+        # Returning the default "not found" values when our image search does fail.
         # Our log is present and if many errors are occurring, it can be debugged by users.
+        return -1, [-1, -1]
+
+
+def imagesearcharea(window, image, x1, y1, x2, y2, precision=0.8, im=None, logger=None):
+    """
+    Searches for an image within an area
+
+    input :
+    image : path to the image file (see opencv imread for supported types), or a preloaded template
+    x1 : top left x value
+    y1 : top left y value
+    x2 : bottom right x value
+    y2 : bottom right y value
+    precision : the higher, the lesser tolerant and fewer false positives are found default is 0.8
+    im : a PIL image, BGR(X) array or frame, useful if you intend to search the same unchanging region for several elements
+
+    returns :
+    the top left corner coordinates of the element if found as an array [x,y] or [-1,-1] if not
+    """
+    max_val, max_loc = imagesearchscore(window=window, image=image, x1=x1, y1=y1, x2=x2, y2=y2, im=im, logger=logger)
+    if max_val < precision:
         return [-1, -1]
+    return max_loc
 
 
 def click_image(window, image, pos, action, timestamp, offset=5, pause=0):
@@ -58,13 +87,15 @@ def click_image(window, image, pos, action, timestamp, offset=5, pause=0):
     this function doesn't search for the image, it's only meant for easy clicking on the images.
 
     input :
-    image : path to the image file (see opencv imread for supported types)
+    image : path to the image file (see opencv imread for supported types), or a preloaded template
     pos : array containing the position of the top left corner of the image [x,y]
     action : button of the mouse to activate : "left" "right" "middle", see pyautogui.click documentation for more info
     time : time taken for the mouse to move from where it was to the new position
     """
-    img = cv2.imread(image)
-    height, width, channels = img.shape
+    if hasattr(image, "image"):
+        height, width = image.height, image.width
+    else:
+        height, width = cv2.imread(image).shape[:2]
 
     point = int(pos[0] + r(width / 2, offset)), int(pos[1] + r(height / 2, offset))
     window.click(point=point, button=action, pause=pause)
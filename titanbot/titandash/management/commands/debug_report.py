@@ -5,6 +5,7 @@ from django.conf import settings
 from titanauth.models.user_reference import ExternalAuthReference
 
 from titandash.bot.core.window import WindowHandler
+from titandash.bot.core.frame import Frame
 from titandash.models.bot import BotInstance
 from titandash.models.globals import GlobalSettings
 from titandash.models.statistics import Session, ArtifactStatistics, Statistics
@@ -123,10 +124,11 @@ class Command(BaseCommand):
         wh.enum()
 
         for hwnd, window in wh.filter().items():
-            window.screenshot().save(fp=os.path.join(bot_settings.LOCAL_DATA_DEBUG_DIR, "{text}_{hwnd}.png".format(
+            Frame(image=window.screenshot()).image.save(fp=os.path.join(bot_settings.LOCAL_DATA_DEBUG_DIR, "{text}_{hwnd}.png".format(
                 text=slugify(window.text),
                 hwnd=window.hwnd
             )))
+            window.close()
 
         # Finally, dump our data object into a file as well.
         with open(bot_settings.LOCAL_DATA_DEBUG_FILE, "w") as f:
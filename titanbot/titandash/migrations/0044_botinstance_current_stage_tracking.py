@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titandash', '0043_configuration_enable_forbidden_contract'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='botinstance',
+            name='current_stage_confidence',
+            field=models.FloatField(blank=True, null=True, verbose_name='Current Stage Confidence'),
+        ),
+        migrations.AddField(
+            model_name='botinstance',
+            name='current_stage_changed',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Current Stage Changed'),
+        ),
+    ]
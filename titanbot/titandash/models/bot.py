@@ -87,6 +87,8 @@ class BotInstance(models.Model):
     shortcuts = models.BooleanField(verbose_name="Enable Shortcuts", blank=True, null=True)
     log = models.ForeignKey(verbose_name="Current Log", to=Log, on_delete=models.CASCADE, blank=True, null=True)
     current_stage = models.PositiveIntegerField(verbose_name="Current Stage", blank=True, null=True)
+    current_stage_confidence = models.FloatField(verbose_name="Current Stage Confidence", blank=True, null=True)
+    current_stage_changed = models.DateTimeField(verbose_name="Current Stage Changed", blank=True, null=True)
     newest_hero = models.CharField(verbose_name="Newest Hero", max_length=255, blank=True, null=True)
     next_action_run = models.DateTimeField(verbose_name="Next Action Run", blank=True, null=True)
     next_master_level = models.DateTimeField(verbose_name="Next Master Level", blank=True, null=True)
@@ -188,7 +190,12 @@ class BotInstance(models.Model):
             "current_stage": {
                 "stage": self.current_stage,
                 "diff_from_max": self.get_diff_from_max_stage(),
-                "percent_from_max": self.get_diff_from_max_stage(percent=True)
+                "percent_from_max": self.get_diff_from_max_stage(percent=True),
+                "confidence": self.current_stage_confidence,
+                "changed": {
+                    "datetime": str(self.current_stage_changed) if self.current_stage_changed else None,
+                    "formatted": self.current_stage_changed.astimezone().strftime(DATETIME_FMT) if self.current_stage_changed else None
+                }
             },
             "newest_hero": {
                 "title": title(self.newest_hero) if self.newest_hero else None,
@@ -319,6 +326,8 @@ class BotInstance(models.Model):
         self.shortcuts = None
         self.log_file = None
         self.current_stage = None
+        self.current_stage_confidence = None
+        self.current_stage_changed = None
         self.newest_hero = None
         self.next_master_level = None
         self.next_heroes_level = None
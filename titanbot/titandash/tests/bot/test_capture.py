@@ -0,0 +1,41 @@
+"""
+test_capture.py
+
+Test functionality related to the capture backends used to grab window contents.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.capture import (
+    capture_backend, DebugCaptureBackend, CaptureBackendUnavailable, CAPTURE_BACKENDS
+)
+
+
+class MockWindow(object):
+    """Mock window used to select capture backends."""
+    def __init__(self, hwnd):
+        self.hwnd = hwnd
+        self.debug = hwnd == "DEBUG"
+        self.width, self.height = 480, 800
+
+
+class TestCaptureBackend(TestCase):
+    """Test functionality related to capture backend selection here."""
+    def test_debug_backend(self):
+        """Test that debug windows always use the debug backend."""
+        backend = capture_backend(window=MockWindow(hwnd="DEBUG"))
+
+        self.assertTrue(isinstance(backend, DebugCaptureBackend))
+        self.assertEqual(backend.grab().shape, (800, 480, 4))
+
+    def test_explicit_backend(self):
+        """Test that an explicit backend name is respected."""
+        backend = capture_backend(window=MockWindow(hwnd=1), name="debug")
+
+        self.assertTrue(isinstance(backend, DebugCaptureBackend))
+
+    def test_unavailable_backend(self):
+        """Test that requesting a backend unavailable on the current platform raises an error."""
+        for name, backend in CAPTURE_BACKENDS.items():
+            if not backend.available():
+                with self.assertRaises(CaptureBackendUnavailable):
+                    capture_backend(window=MockWindow(hwnd=1), name=name)
@@ -0,0 +1,118 @@
+"""
+test_digits.py
+
+Test functionality related to reading numbers through the digit recognizer.
+"""
+from django.test import TestCase
+
+from settings import TEST_IMAGE_DIR
+
+from titandash.bot.core.digits import DigitRecognizer, digits, process_stage
+
+from PIL import Image
+
+import numpy as np
+import os
+
+
+class TestDigitRecognizer(TestCase):
+    """Test functionality related to the digit recognizer here."""
+    @classmethod
+    def setUpClass(cls):
+        super(TestDigitRecognizer, cls).setUpClass()
+
+        # Stage images, along with the stage present in each one.
+        cls.test_dir = os.path.join(TEST_IMAGE_DIR, "ocr/stage")
+        cls.test_images = [
+            [Image.open(os.path.join(cls.test_dir, "test_stage_01.png")), "12493"],
+            [Image.open(os.path.join(cls.test_dir, "test_stage_02.png")), "10651"],
+            [Image.open(os.path.join(cls.test_dir, "test_stage_03.png")), "11289"],
+            [Image.open(os.path.join(cls.test_dir, "test_stage_04.png")), "10411"],
+            [Image.open(os.path.join(cls.test_dir, "test_stage_05.png")), "10920"],
+            [Image.open(os.path.join(cls.test_dir, "test_stage_06.png")), "7111"],
+            [Image.open(os.path.join(cls.test_dir, "test_stage_07.png")), "9840"],
+            [Image.open(os.path.join(cls.test_dir, "test_stage_08.png")), "7284"],
+            [Image.open(os.path.join(cls.test_dir, "test_stage_09.png")), "7180"],
+        ]
+
+    def masks(self):
+        """Generate the stage masks at the scales used by the stage and advance start parsing."""
+        return [(process_stage(image=image, scale=scale), text) for image, text in self.test_images for scale in (3, 5)]
+
+    def learner(self):
+        """Generate a recognizer with an empty digit bank, so only the digits learned are ever recognized."""
+        return DigitRecognizer(templates={str(digit): os.path.join(self.test_dir, "missing_{digit}.png".format(digit=digit)) for digit in range(10)})
+
+    def test_recognize(self):
+        """
+        Test that every stage is recognized by the bundled digit bank, which is learned from separate samples and never
+        from these stages. Most stages should be recognized confidently, the rest are left to the fallback.
+        """
+        masks = self.masks()
+        confident = 0
+        for mask, text in masks:
+            number = digits.recognize(mask=mask)
+
+            self.assertEqual(number.text, text, number)
+            confident += number.confident
+
+        self.assertGreaterEqual(confident, len(masks) * 3 / 4)
+
+    def test_read_fallback(self):
+        """Test that numbers that aren't recognized confidently are parsed by the fallback."""
+        recognizer = DigitRecognizer()
+        number = recognizer.read(mask=np.zeros((20, 40), dtype=np.uint8), fallback=lambda mask: "Stage: 42")
+
+        self.assertEqual(number.text, "42")
+        self.assertFalse(number.confident)
+        self.assertEqual(recognizer.fallbacks, 1)
+
+    def test_read_unconfident(self):
+        """Test that numbers recognized with a low score, or with a low margin over the next best digit are parsed by the fallback."""
+        mask, text = self.masks()[0]
+        for recognizer in (DigitRecognizer(score=1.0, margin=0.0), DigitRecognizer(score=0.0, margin=1.0)):
+            parsed = []
+            number = recognizer.read(mask=mask, fallback=lambda m: parsed.append(m) or "Stage: 42")
+
+            self.assertEqual(number.text, "42")
+            self.assertFalse(number.confident)
+            self.assertEqual(len(parsed), 1)
+            self.assertEqual(recognizer.fallbacks, 1)
+
+    def test_read_audit(self):
+        """Test that confident numbers are audited against the fallback, counting their agreements."""
+        recognizer = DigitRecognizer(audit=1)
+        for mask, text in self.masks():
+            self.assertEqual(recognizer.read(mask=mask, fallback=lambda m: text).text, text)
+
+        self.assertEqual(recognizer.audits + recognizer.fallbacks, len(self.test_images) * 2)
+        self.assertEqual(recognizer.stats()["agreement_rate"], 1.0)
+
+    def test_learn(self):
+        """Test that a digit bank learned from samples recognizes the same numbers."""
+        recognizer = self.learner()
+        masks = self.masks()
+
+        self.assertEqual(recognizer.learn(samples=masks), len(masks))
+        for mask, text in masks:
+            self.assertEqual(recognizer.recognize(mask=mask).text, text)
+
+    def test_held_out(self):
+        """
+        Test that a digit bank learned without a stage recognizes that stage confidently only when every one of its
+        digits was learned from the other stages, stages containing a digit never learned are parsed by the fallback.
+        """
+        masks = self.masks()
+        for image, text in self.test_images:
+            samples = [(mask, _text) for mask, _text in masks if _text != text]
+            learned = set("".join(_text for mask, _text in samples))
+
+            recognizer = self.learner()
+            recognizer.learn(samples=samples)
+            for mask in [mask for mask, _text in masks if _text == text]:
+                parsed = []
+                number = recognizer.read(mask=mask, fallback=lambda m: parsed.append(m) or text)
+
+                self.assertEqual(number.text, text)
+                self.assertEqual(number.confident, set(text).issubset(learned), number)
+                self.assertEqual(len(parsed), 0 if number.confident else 1)
@@ -0,0 +1,52 @@
+"""
+test_frame.py
+
+Test functionality related to the frames captured and used throughout image recognition.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.frame import Frame
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+import numpy as np
+
+
+class TestFrame(TestCase):
+    """Test functionality related to frames and their derived views here."""
+    def setUp(self):
+        self.image = Image.open(TEST_IMAGES["PANELS"]["no_panel_open"]).convert("RGB")
+        self.frame = Frame(image=self.image)
+
+    def test_derived_views_cached(self):
+        """Test that derived views are only ever computed once."""
+        self.assertIs(self.frame.gray, self.frame.gray)
+        self.assertIs(self.frame.hsv, self.frame.hsv)
+        self.assertIs(self.frame.pyramid(level=2), self.frame.pyramid(level=2))
+        self.assertIs(self.frame.average_hash, self.frame.average_hash)
+
+    def test_pyramid_levels(self):
+        """Test that each pyramid level halves the size of the frame."""
+        self.assertEqual(self.frame.pyramid(level=0).shape, self.frame.gray.shape)
+        self.assertEqual(self.frame.pyramid(level=1).shape, ((self.frame.height + 1) // 2, (self.frame.width + 1) // 2))
+
+    def test_pixel(self):
+        """Test that pixels are retrieved in (R, G, B) order."""
+        for point in [(0, 0), (100, 200), (240, 400)]:
+            self.assertEqual(self.frame.pixel(point), self.image.getpixel(point))
+
+    def test_crop(self):
+        """Test that cropped frames are views into their parent frame."""
+        region = (10, 20, 110, 70)
+        crop = self.frame.crop(region)
+
+        self.assertEqual(crop.size, (100, 50))
+        self.assertTrue(np.shares_memory(crop.array, self.frame.array))
+        self.assertTrue(np.array_equal(crop.gray, self.frame.gray[20:70, 10:110]))
+
+    def test_image_round_trip(self):
+        """Test that frames built from arrays produce the same image."""
+        frame = Frame(image=self.frame.array)
+
+        self.assertTrue(np.array_equal(np.array(frame.image), np.array(self.image)))
@@ -0,0 +1,207 @@
+"""
+test_grabber.py
+
+Test functionality related to the grabber and the frames it captures from a window.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.grabber import Grabber, ColorCheck, SEARCH_FIRST
+from titandash.bot.core.maps import IMAGES as BOT_IMAGES
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+import logging
+
+
+class MockWindow(object):
+    """Mock window used to count the screenshots taken by a grabber."""
+    def __init__(self, image):
+        self.image = image
+        self.generation = 0
+        self.screenshots = 0
+        self.producer = None
+        self.regions = []
+
+        self.x, self.y = 0, 0
+        self.width, self.height = image.size
+
+    def screenshot(self, region=None):
+        self.screenshots += 1
+        self.regions.append(region)
+        return self.image.crop(region) if region else self.image
+
+    def click(self):
+        self.generation += 1
+
+
+class TestGrabberFrames(TestCase):
+    """Test functionality related to grabber frame re-use here."""
+    def setUp(self):
+        self.window = MockWindow(image=Image.open(TEST_IMAGES["PANELS"]["no_panel_open"]).convert("RGB"))
+        self.grabber = Grabber(window=self.window, logger=logging.getLogger(__name__), staleness=60)
+
+    def test_frame_reused(self):
+        """Test that consecutive snapshots re-use a single capture."""
+        self.grabber.snapshot()
+        self.grabber.snapshot()
+        self.grabber.snapshot(region=(0, 0, 100, 100))
+        self.grabber.point_is_color(point=(10, 10), color=(0, 0, 0))
+
+        self.assertEqual(self.window.screenshots, 1)
+        self.assertEqual(self.grabber.captures, 1)
+        self.assertEqual(self.grabber.captures_avoided, 3)
+
+    def test_frame_invalidated_by_input(self):
+        """Test that input sent to the window invalidates the last frame."""
+        self.grabber.snapshot()
+        self.window.click()
+        self.grabber.snapshot()
+
+        self.assertEqual(self.window.screenshots, 2)
+
+    def test_frame_invalidated_by_staleness(self):
+        """Test that stale frames are re-captured."""
+        self.grabber.staleness = 0
+        self.grabber.snapshot()
+        self.grabber.snapshot()
+
+        self.assertEqual(self.window.screenshots, 2)
+
+    def test_frame_forced(self):
+        """Test that forced snapshots always capture a new frame."""
+        self.grabber.snapshot()
+        self.grabber.snapshot(force=True)
+
+        self.assertEqual(self.window.screenshots, 2)
+
+    def test_region_snapshot(self):
+        """Test that region snapshots are cropped from the full frame, which remains the current frame."""
+        full = self.grabber.snapshot()
+        frame = self.grabber.snapshot(region=(10, 20, 110, 70))
+
+        self.assertEqual(self.window.regions, [None])
+        self.assertEqual(frame.size, (100, 50))
+        self.assertEqual(frame.pixel((0, 0)), self.window.image.getpixel((10, 20)))
+        self.assertIs(self.grabber.current, full)
+
+    def test_region_search_current(self):
+        """Test that region searches never replace the current frame with the region searched."""
+        self.grabber.snapshot()
+        found, position = self.grabber.search(image=BOT_IMAGES["NO_PANELS"]["master_damage"], region=(0, 600, 100, 680))
+        self.assertTrue(found)
+
+        self.assertEqual(self.grabber.current.size, self.window.image.size)
+        self.assertEqual(self.grabber.search(image=BOT_IMAGES["NO_PANELS"]["master_damage"], testing=True), (True, (position[0], position[1] + 600)))
+
+    def test_region_capture(self):
+        """Test that region snapshots only capture the region when no full frame is available."""
+        self.grabber.snapshot(region=(10, 20, 110, 70))
+        frame = self.grabber.snapshot(region=(10, 20, 110, 70))
+
+        self.assertEqual(self.window.regions, [(10, 20, 110, 70)])
+        self.assertEqual(frame.size, (100, 50))
+        self.assertEqual(frame.pixel((0, 0)), self.window.image.getpixel((10, 20)))
+        self.assertIsNone(self.grabber.current)
+
+        self.window.click()
+        self.grabber.snapshot(region=(10, 20, 110, 70))
+
+        self.assertEqual(self.window.screenshots, 2)
+
+
+class TestGrabberSearchMany(TestCase):
+    """Test functionality related to batched template searches here."""
+    def setUp(self):
+        self.grabber = Grabber(window=MockWindow(image=Image.open(TEST_IMAGES["PANELS"]["no_panel_open"]).convert("RGB")), logger=logging.getLogger(__name__))
+        self.grabber.current = self.grabber.window.image
+        self.images = [BOT_IMAGES["GENERIC"]["exit_panel"], BOT_IMAGES["NO_PANELS"]["settings"], BOT_IMAGES["NO_PANELS"]["fight_boss"], BOT_IMAGES["NO_PANELS"]["master_damage"]]
+
+    def test_search_all(self):
+        """Test that every image is present in the hit map and matches a single search."""
+        hits = self.grabber.search_many(images=self.images, testing=True)
+
+        self.assertEqual(list(hits), self.images)
+        for image, hit in hits.items():
+            found, position = self.grabber.search(image=image, testing=True)
+            self.assertEqual(hit.found, found)
+            if found:
+                self.assertEqual(hit.position, position)
+
+    def test_search_first(self):
+        """Test that first searches stop once the first image found is known."""
+        hits = self.grabber.search_many(images=self.images, mode=SEARCH_FIRST, testing=True)
+        found = [image for image, hit in hits.items() if hit.found]
+
+        self.assertEqual(found, [list(hits)[-1]])
+        self.assertEqual(self.grabber.search(image=self.images, testing=True), (True, hits[found[0]].position))
+
+    def test_search_regions(self):
+        """Test that regions specified per image are searched within."""
+        region = (0, 0, 240, 400)
+        hits = self.grabber.search_many(images=self.images, regions=[region, None, None, None], testing=True)
+
+        self.assertEqual(hits[self.images[0]], self.grabber.search_many(images=[self.images[0]], regions=region, testing=True)[self.images[0]])
+
+    def test_invalid_mode(self):
+        """Test that an invalid search mode raises an error."""
+        with self.assertRaises(ValueError):
+            self.grabber.search_many(images=self.images, mode="invalid", testing=True)
+
+    def test_search_matcher(self):
+        """Test that searches using the pyramid matcher find the same images as the full matcher."""
+        full = self.grabber.search_many(images=self.images, testing=True, matcher="full")
+        pyramid = self.grabber.search_many(images=self.images, testing=True, matcher="pyramid")
+
+        for image in self.images:
+            self.assertEqual(full[image].found, pyramid[image].found)
+            if full[image].found:
+                self.assertEqual(full[image].position, pyramid[image].position)
+
+    def test_search_region_pairs(self):
+        """Test that the same image is searched for in many regions, matching a single search of each region."""
+        regions = [(0, 0, 240, 400), (240, 0, 523, 400), None]
+        results = self.grabber.search_regions(searches=[(self.images[3], region) for region in regions], testing=True)
+
+        self.assertEqual(len(results), len(regions))
+        for region, result in zip(regions, results):
+            found, position = self.grabber.search(image=self.images[3], region=region, testing=True)
+            self.assertEqual(result.found, found)
+            if found:
+                self.assertEqual(result.position, tuple(position))
+
+
+class TestGrabberProbe(TestCase):
+    """Test functionality related to probing many points for colors at once here."""
+    def setUp(self):
+        self.window = MockWindow(image=Image.open(TEST_IMAGES["PANELS"]["no_panel_open"]).convert("RGB"))
+        self.grabber = Grabber(window=self.window, logger=logging.getLogger(__name__))
+        self.points = [(10, 10), (200, 300), (400, 700)]
+
+    def test_probe(self):
+        """Test that probes match the colors present at each point, from a single capture."""
+        colors = [self.window.image.getpixel(point) for point in self.points]
+        checks = [ColorCheck(point=point, color=color) for point, color in zip(self.points, colors)]
+        checks.append(ColorCheck(point=self.points[0], color=tuple((channel + 1) % 256 for channel in colors[0])))
+
+        self.assertEqual(list(self.grabber.probe(checks=checks)), [True, True, True, False])
+        self.assertEqual(self.window.screenshots, 1)
+
+    def test_probe_range(self):
+        """Test that probes check points against color ranges."""
+        r, g, b = self.window.image.getpixel(self.points[0])
+
+        self.assertEqual(list(self.grabber.probe(checks=[
+            ColorCheck(point=self.points[0], color_range=((r - 1, r + 1), (g, g), (b - 1, b + 1))),
+            ColorCheck(point=self.points[0], color_range=((r + 1, r + 2), (g, g), (b, b)))
+        ])), [True, False])
+
+    def test_point_is_color(self):
+        """Test that single points are checked for colors."""
+        self.assertTrue(self.grabber.point_is_color(point=self.points[1], color=self.window.image.getpixel(self.points[1])))
+        self.assertFalse(self.grabber.point_is_color(point=self.points[1], color=(1, 2, 3)))
+
+    def test_invalid_check(self):
+        """Test that checks with both a color and a color range raise an error."""
+        with self.assertRaises(ValueError):
+            self.grabber.probe(checks=[ColorCheck(point=self.points[0], color=(0, 0, 0), color_range=((0, 0), (0, 0), (0, 0)))])
@@ -4,7 +4,18 @@ test_heroes.py
 Test functionality related to image search functionality when
 used to search for different images on the heroes panel.
 """
+from django.test import TestCase
+
 from titandash.tests.bot.base import BaseBotTest
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+from titandash.tests.bot.test_grabber import MockWindow
+from titandash.bot.core.grabber import Grabber
+from titandash.bot.core.maps import IMAGES as BOT_IMAGES, HERO_COORDS, EQUIPMENT_COORDS
+from titandash.bot.core.rows import HeroRow, GearRow, parse_hero_rows, parse_gear_rows
+
+from PIL import Image
+
+import logging
 
 
 class TestHeroesPanels(BaseBotTest):
@@ -40,3 +51,37 @@ class TestHeroesPanels(BaseBotTest):
             self.is_image_visible(
                 game_image=image,
                 find_image=self.BOT_IMAGES["HEROES"]["story"])
+
+
+
+class TestRows(TestCase):
+    """Test functionality related to parsing hero and gear rows from a single frame here."""
+    def setUp(self):
+        self.grabber = Grabber(window=MockWindow(image=Image.open(TEST_IMAGES["PANELS"]["no_panel_open"]).convert("RGB")), logger=logging.getLogger(__name__))
+
+    def found(self, image, region, test_image):
+        return self.grabber.search(image=image, region=region, bool_only=True, testing=True, im=test_image.crop(region))
+
+    def test_parse_hero_rows(self):
+        """Test that every hero row is parsed from a single frame, matching a search of each region."""
+        for image in (TEST_IMAGES["PANELS"]["heroes_collapsed"], TEST_IMAGES["PANELS"]["heroes_expanded"]):
+            test_image = Image.open(image).convert("RGB")
+            rows = parse_hero_rows(grabber=self.grabber, test_image=test_image)
+
+            self.assertEqual(len(rows), len(HERO_COORDS["heroes"]))
+            for row, hero_locations in zip(rows, HERO_COORDS["heroes"]):
+                self.assertIsInstance(row, HeroRow)
+                self.assertEqual(row.dps, not self.found(image=BOT_IMAGES["HEROES"]["zero_dps"], region=hero_locations["dps"], test_image=test_image))
+
+    def test_parse_gear_rows(self):
+        """Test that every gear row is parsed from a single frame, matching a search of each region."""
+        for image in (TEST_IMAGES["PANELS"]["equipment_collapsed"], TEST_IMAGES["PANELS"]["equipment_expanded"]):
+            test_image = Image.open(image).convert("RGB")
+            rows = parse_gear_rows(grabber=self.grabber, test_image=test_image)
+
+            self.assertEqual(len(rows), len(EQUIPMENT_COORDS["gear"]))
+            for row, gear_locations in zip(rows, EQUIPMENT_COORDS["gear"]):
+                self.assertIsInstance(row, GearRow)
+                self.assertEqual(row.locked, self.found(image=BOT_IMAGES["EQUIPMENT"]["locked"], region=gear_locations["locked"], test_image=test_image))
+                self.assertEqual(row.equipped, not self.found(image=BOT_IMAGES["EQUIPMENT"]["equip"], region=gear_locations["base"], test_image=test_image))
+                self.assertEqual(row.equip, gear_locations["equip"])
@@ -0,0 +1,178 @@
+"""
+test_locations.py
+
+Test functionality related to the learned locations of templates on the game screen.
+"""
+from django.test import TestCase
+
+from titandash.bot.core import grabber
+from titandash.bot.core.grabber import Grabber
+from titandash.bot.core.locations import LocationIndex, Location
+from titandash.bot.core.matchcache import MatchCache
+from titandash.bot.core.maps import IMAGES as BOT_IMAGES
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+from titandash.tests.bot.test_grabber import MockWindow
+
+from PIL import Image
+
+from threading import Thread
+
+import tempfile
+import logging
+import os
+
+
+class TestLocationIndex(TestCase):
+    """Test functionality related to the location index here."""
+    def setUp(self):
+        self.index = LocationIndex(path=None, stable=3, tolerance=2, padding=10, audit=0)
+
+    def test_roi_requires_stable(self):
+        """Test that a region of interest is only available once a template is stable."""
+        for i in range(2):
+            self.index.record(path="template.png", position=(100, 200), score=0.9)
+            self.assertIsNone(self.index.roi(path="template.png", size=(480, 800), shape=(20, 40)))
+
+        self.index.record(path="template.png", position=(101, 199), score=0.9)
+        self.assertEqual(self.index.roi(path="template.png", size=(480, 800), shape=(20, 40)), (91, 189, 151, 229))
+
+    def test_roi_clipped(self):
+        """Test that a region of interest is clipped to the frame."""
+        for i in range(3):
+            self.index.record(path="template.png", position=(0, 790), score=0.9)
+
+        self.assertEqual(self.index.roi(path="template.png", size=(480, 800), shape=(20, 40)), (0, 780, 50, 800))
+
+    def test_moved_resets(self):
+        """Test that a template found outside of the tolerance is no longer stable."""
+        for i in range(3):
+            self.index.record(path="template.png", position=(100, 200), score=0.9)
+        self.index.record(path="template.png", position=(100, 300), score=0.9)
+
+        self.assertIsNone(self.index.roi(path="template.png", size=(480, 800), shape=(20, 40)))
+
+    def test_ambiguous(self):
+        """Test that ambiguous templates never receive a region of interest."""
+        self.index.record(path="template.png", position=(100, 200), score=0.9, ambiguous=True)
+        for i in range(3):
+            self.index.record(path="template.png", position=(100, 200), score=0.9)
+
+        self.assertIsNone(self.index.roi(path="template.png", size=(480, 800), shape=(20, 40)))
+
+    def test_confident(self):
+        """Test that roi scores are only trusted when close to the score a template was learned with."""
+        self.index.margin = 0.05
+        self.index.record(path="template.png", position=(100, 200), score=0.95)
+        self.index.record(path="template.png", position=(100, 200))
+
+        self.assertTrue(self.index.confident(path="template.png", score=0.92))
+        self.assertFalse(self.index.confident(path="template.png", score=0.85))
+
+    def test_audit(self):
+        """Test that stable templates are periodically searched for in the entire frame."""
+        self.index.audit = 2
+        for i in range(3):
+            self.index.record(path="template.png", position=(100, 200), score=0.9)
+
+        self.assertIsNotNone(self.index.roi(path="template.png", size=(480, 800), shape=(20, 40)))
+        self.assertIsNone(self.index.roi(path="template.png", size=(480, 800), shape=(20, 40)))
+
+    def test_counted_concurrently(self):
+        """Test that counters and audit uses updated from many search threads at once are never lost."""
+        self.index.audit = 1000
+        for i in range(3):
+            self.index.record(path="template.png", position=(100, 200), score=0.9)
+
+        def locate():
+            for i in range(100):
+                self.index.roi(path="template.png", size=(480, 800), shape=(20, 40))
+                self.index.count(counter="hits")
+
+        threads = [Thread(target=locate) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.index.hits, 800)
+        self.assertEqual(self.index._uses[self.index.key(path="template.png")], 800)
+
+    def test_persisted(self):
+        """Test that locations are saved and loaded between sessions."""
+        with tempfile.TemporaryDirectory() as directory:
+            self.index.path = os.path.join(directory, "locations.json")
+            for i in range(3):
+                self.index.record(path="template.png", position=(100, 200), score=0.9)
+            self.index.save()
+
+            index = LocationIndex(path=self.index.path, stable=3, padding=10, audit=0)
+            self.assertEqual(index.locations, self.index.locations)
+            self.assertIsNotNone(index.roi(path="template.png", size=(480, 800), shape=(20, 40)))
+
+    def test_invalid_file(self):
+        """Test that an invalid locations file results in an empty index."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "locations.json")
+            with open(path, "w") as f:
+                f.write("invalid")
+
+            self.assertEqual(len(LocationIndex(path=path)), 0)
+
+
+class TestGrabberLocations(TestCase):
+    """Test functionality related to searching templates at their learned locations here."""
+    def setUp(self):
+        self.locations = grabber.locations
+        grabber.locations = LocationIndex(path=None, stable=2, audit=0)
+        # Repeated searches of the same frame must reach the index, instead of our match cache.
+        self.matches = grabber.matches
+        grabber.matches = MatchCache(size=0)
+
+        self.grabber = Grabber(window=MockWindow(image=Image.open(TEST_IMAGES["PANELS"]["no_panel_open"]).convert("RGB")), logger=logging.getLogger(__name__))
+        self.grabber.snapshot()
+        self.image = BOT_IMAGES["NO_PANELS"]["master_damage"]
+
+    def tearDown(self):
+        grabber.locations = self.locations
+        grabber.matches = self.matches
+
+    def test_roi_search(self):
+        """Test that stable templates are searched for in their region of interest, with the same results."""
+        expected = self.grabber.search(image=self.image, testing=True)
+        self.grabber.search(image=self.image, testing=True)
+        self.assertEqual(grabber.locations.full, 2)
+
+        self.assertEqual(self.grabber.search(image=self.image, testing=True), expected)
+        self.assertEqual(grabber.locations.hits, 1)
+
+    def test_roi_fallback(self):
+        """Test that templates not confidently found in their region of interest fall back to a full search."""
+        grabber.locations.locations[grabber.locations.key(path=self.image)] = Location(x=15, y=626, hits=2, ambiguous=False, score=1.5)
+
+        found, position = self.grabber.search(image=self.image, testing=True)
+        self.assertTrue(found)
+        self.assertEqual(grabber.locations.fallbacks, 1)
+        self.assertEqual(grabber.locations.locations[grabber.locations.key(path=self.image)][:2], tuple(position))
+
+    def test_signature_rejected(self):
+        """Test that templates whose signature fails at their location skip their region of interest, with the same results."""
+        expected = self.grabber.search(image=self.image, testing=True)
+        grabber.locations.locations[grabber.locations.key(path=self.image)] = Location(x=100, y=100, hits=2, ambiguous=False, score=0.95)
+
+        self.assertEqual(self.grabber.search(image=self.image, testing=True), expected)
+        self.assertEqual(grabber.locations.rejected, 1)
+        self.assertEqual(grabber.locations.fallbacks, 0)
+
+    def test_signature_matcher(self):
+        """Test that templates whose signature fails are searched for with the matcher specified, with the same results as without a signature check."""
+        images = [self.image, BOT_IMAGES["GENERIC"]["exit_panel"], BOT_IMAGES["GENERIC"]["large_exit_panel"]]
+
+        for matcher in ("full", "pyramid"):
+            for image in images:
+                grabber.locations.locations.clear()
+                expected = self.grabber.search(image=image, testing=True, matcher=matcher)
+
+                grabber.locations.locations[grabber.locations.key(path=image)] = Location(x=100, y=100, hits=2, ambiguous=False, score=0.95)
+                self.assertEqual(self.grabber.search(image=image, testing=True, matcher=matcher), expected)
+
+        self.assertEqual(grabber.locations.rejected, len(images) * 2)
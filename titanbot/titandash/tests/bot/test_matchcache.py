@@ -0,0 +1,96 @@
+"""
+test_matchcache.py
+
+Test functionality related to caching the results of template matches.
+"""
+from django.test import TestCase
+
+from titandash.bot.core import grabber
+from titandash.bot.core.grabber import Grabber, SearchResult
+from titandash.bot.core.matchcache import MatchCache
+from titandash.bot.core.frame import Frame
+from titandash.bot.core.maps import IMAGES as BOT_IMAGES
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+from titandash.tests.bot.test_grabber import MockWindow
+
+from PIL import Image
+
+import numpy as np
+import logging
+import cv2
+
+
+class TestMatchCache(TestCase):
+    """Test functionality related to the match cache here."""
+    def setUp(self):
+        self.cache = MatchCache(size=2)
+        self.frame = Frame(image=np.zeros((20, 20, 3), dtype=np.uint8))
+        self.result = SearchResult(found=True, score=0.9, position=(1, 1))
+
+    def key(self, image, frame=None):
+        return self.cache.key(image=image, frame=frame or self.frame, precision=0.8, matcher=None)
+
+    def test_hit_miss(self):
+        """Test that cached results are retrieved, and hits and misses are counted."""
+        self.assertIsNone(self.cache.get(key=self.key(image="template.png")))
+        self.cache.put(key=self.key(image="template.png"), result=self.result)
+
+        self.assertEqual(self.cache.get(key=self.key(image="template.png")), self.result)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_pixels_changed(self):
+        """Test that results are not retrieved once the pixels of the frame have changed."""
+        self.cache.put(key=self.key(image="template.png"), result=self.result)
+
+        array = self.frame.array.copy()
+        array[5, 5] = 255
+        self.assertIsNone(self.cache.get(key=self.key(image="template.png", frame=Frame(image=array))))
+        self.assertIsNotNone(self.cache.get(key=self.key(image="template.png", frame=Frame(image=self.frame.array.copy()))))
+
+    def test_evicted(self):
+        """Test that the least recently used result is evicted once the cache is full."""
+        for image in ("one.png", "two.png"):
+            self.cache.put(key=self.key(image=image), result=self.result)
+        self.cache.get(key=self.key(image="one.png"))
+        self.cache.put(key=self.key(image="three.png"), result=self.result)
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get(key=self.key(image="two.png")))
+        self.assertIsNotNone(self.cache.get(key=self.key(image="one.png")))
+
+    def test_disabled(self):
+        """Test that a cache with no size never stores any results."""
+        self.cache.size = 0
+        self.cache.put(key=self.key(image="template.png"), result=self.result)
+
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestGrabberMatchCache(TestCase):
+    """Test functionality related to the grabber re-using cached match results here."""
+    def setUp(self):
+        self.matches = grabber.matches
+        grabber.matches = MatchCache()
+
+        self.grabber = Grabber(window=MockWindow(image=Image.open(TEST_IMAGES["PANELS"]["no_panel_open"]).convert("RGB")), logger=logging.getLogger(__name__))
+        self.grabber.snapshot()
+
+    def tearDown(self):
+        grabber.matches = self.matches
+
+    def test_search_cached(self):
+        """Test that searching an unchanged frame again re-uses the cached result."""
+        expected = self.grabber.search(image=BOT_IMAGES["NO_PANELS"]["master_damage"], testing=True)
+        self.assertEqual(self.grabber.search(image=BOT_IMAGES["NO_PANELS"]["master_damage"], testing=True), expected)
+
+        self.assertEqual((grabber.matches.hits, grabber.matches.misses), (1, 1))
+
+    def test_search_array(self):
+        """Test that decoded arrays are searched for like their paths, and cached on their pixels."""
+        array = cv2.imread(BOT_IMAGES["NO_PANELS"]["master_damage"])
+        expected = self.grabber.search(image=BOT_IMAGES["NO_PANELS"]["master_damage"], testing=True)
+
+        self.assertEqual(self.grabber.search(image=array, testing=True), expected)
+        self.assertEqual(self.grabber.search(image=array.copy(), testing=True), expected)
+        self.assertEqual(self.grabber.search(image=[array], bool_only=True, testing=True), expected[0])
+        self.assertEqual(grabber.matches.hits, 2)
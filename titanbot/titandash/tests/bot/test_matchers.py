@@ -0,0 +1,53 @@
+"""
+test_matchers.py
+
+Test functionality related to the matchers used to search for templates within a frame.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.matchers import matcher, match_full, match_pyramid, MATCHER_FULL, MATCHER_PYRAMID
+from titandash.bot.core.templates import templates
+from titandash.bot.core.frame import Frame
+from titandash.bot.core.maps import IMAGES as BOT_IMAGES
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+
+class TestMatchers(TestCase):
+    """Test functionality related to the template matchers here."""
+    def setUp(self):
+        self.frames = [Frame(image=Image.open(path)) for path in TEST_IMAGES["PANELS"].values()]
+        self.templates = [templates.get(path) for group in ("GENERIC", "NO_PANELS", "MASTER") for path in BOT_IMAGES[group].values()]
+
+    def test_matcher_selection(self):
+        """Test that matchers are retrieved by name, or the default when no name is specified."""
+        self.assertIs(matcher(name=MATCHER_FULL), match_full)
+        self.assertIs(matcher(name=MATCHER_PYRAMID), match_pyramid)
+        self.assertTrue(matcher() in (match_full, match_pyramid))
+
+    def test_invalid_matcher(self):
+        """Test that an invalid matcher raises an error."""
+        with self.assertRaises(ValueError):
+            matcher(name="invalid")
+
+    def test_pyramid_matches_full(self):
+        """Test that the pyramid matcher finds the same templates at the same positions as the full matcher."""
+        for frame in self.frames:
+            for template in self.templates:
+                full = match_full(frame=frame, template=template, precision=0.8)
+                pyramid = match_pyramid(frame=frame, template=template, precision=0.8)
+
+                self.assertEqual(full[0] >= 0.8, pyramid[0] >= 0.8, template)
+                if full[0] >= 0.8:
+                    self.assertEqual(tuple(full[1]), tuple(pyramid[1]), template)
+
+    def test_pyramid_small_template(self):
+        """Test that templates too small for the pyramid level specified are matched at full resolution."""
+        frame = self.frames[0]
+        template = min(self.templates, key=lambda t: min(t.shape))
+
+        self.assertEqual(
+            match_pyramid(frame=frame, template=template, precision=0.8, level=4),
+            match_full(frame=frame, template=template, precision=0.8)
+        )
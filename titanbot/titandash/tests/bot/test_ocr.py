@@ -5,21 +5,35 @@ Test the functionality related to the optical character recognition processes pr
 in the bot.
 """
 from django.conf import settings
+from django.test import TestCase
 
-from titandash.tests.bot.base import BaseBotTest
+from titandash.bot.core import ocr
+from titandash.bot.core.digits import read_stage
+from titandash.bot.core.ocr import OCRPool, OCREngineUnavailable
+from titandash.bot.core.constants import LOGGER_NAME
 
 from PIL import Image
 
+from unittest import mock, skipUnless
+
+import pytesseract
+import tempfile
+import shutil
+import glob
 import os
 
+# Tests parsing text through tesseract require the tesseract command, engines fall back to it when they are unavailable.
+TESSERACT_AVAILABLE = shutil.which(settings.TESSERACT_COMMAND or "tesseract") is not None
+
 
-class TestBotStageOCR(BaseBotTest):
+@skipUnless(TESSERACT_AVAILABLE, "tesseract is not installed.")
+class TestStageOCR(TestCase):
     """
     Test functionality relating to the stage parsing and recognition process.
     """
     @classmethod
-    def setUpTestData(cls):
-        super(TestBotStageOCR, cls).setUpTestData()
+    def setUpClass(cls):
+        super(TestStageOCR, cls).setUpClass()
 
         # Directory containing all of our test images for use
         # with the stage image recognition.
@@ -45,6 +59,127 @@ class TestBotStageOCR(BaseBotTest):
         """
         for lst in self.test_images:
             self.assertEqual(
-                first=self.bot.stats.stage_ocr(test_image=lst[0]),
+                first=read_stage(image=lst[0]).text,
                 second=lst[1]
             )
+
+
+@skipUnless(TESSERACT_AVAILABLE, "tesseract is not installed.")
+class TestOCRPool(TestCase):
+    """
+    Test functionality relating to the pool of tesseract engines used to parse text.
+    """
+    def setUp(self):
+        self.pool = OCRPool(workers=1)
+        self.images = [Image.open(path) for path in sorted(glob.glob(os.path.join(settings.TEST_IMAGE_DIR, "ocr/stage/*.png")))]
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_pool_matches_command(self):
+        """
+        Test that text parsed by the pool matches the text parsed by the tesseract command, re-using a single engine.
+        """
+        for image in self.images:
+            self.assertEqual(
+                first=self.pool.image_to_string(image=image, digits=True),
+                second=pytesseract.image_to_string(image, config="--psm 7 nobatch digits")
+            )
+        if self.pool.available:
+            self.assertEqual(self.pool._created, 1)
+
+    def test_pool_fallback(self):
+        """
+        Test that the tesseract command is used when no engines are available in process.
+        """
+        self.pool._available = False
+        self.pool.image_to_string(image=self.images[0])
+
+        self.assertEqual(self.pool.fallbacks, 1)
+
+    def test_pool_batch(self):
+        """
+        Test that text parsed from many images at once is returned in order, matching each image parsed alone.
+        """
+        pool = OCRPool(workers=3)
+        try:
+            self.assertEqual(
+                first=pool.image_to_strings(images=self.images, digits=True),
+                second=[self.pool.image_to_string(image=image, digits=True) for image in self.images]
+            )
+        finally:
+            pool.close()
+
+
+class MockLibrary(object):
+    """Mock tesseract library whose engines can never be initialized."""
+    def TessBaseAPICreate(self):
+        return 1
+
+    def TessBaseAPIInit3(self, handle, datapath, language):
+        return -1
+
+    def TessBaseAPIDelete(self, handle):
+        pass
+
+
+class TestOCRResolution(TestCase):
+    """
+    Test functionality relating to resolving the tesseract library and tessdata, without tesseract being installed.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.command = os.path.join(self.directory.name, "tesseract.exe")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_candidates(self):
+        """
+        Test that libraries installed alongside the tesseract command are preferred, newest first.
+        """
+        for name in ("libtesseract-4.dll", "libtesseract-5.dll"):
+            open(os.path.join(self.directory.name, name), "w").close()
+
+        self.assertEqual(ocr._candidates(command=self.command)[:2], [
+            os.path.join(self.directory.name, "libtesseract-5.dll"),
+            os.path.join(self.directory.name, "libtesseract-4.dll")
+        ])
+
+    def test_library_unavailable(self):
+        """
+        Test that an error is raised when no candidate library can be loaded.
+        """
+        open(os.path.join(self.directory.name, "libtesseract-4.dll"), "w").close()
+        with mock.patch("ctypes.util.find_library", return_value=None):
+            with self.assertRaises(OCREngineUnavailable):
+                ocr._library(command=self.command)
+
+    def test_datapath(self):
+        """
+        Test that the tessdata directory itself is used, honouring the TESSDATA_PREFIX environment variable.
+        """
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertIsNone(ocr._datapath(command=self.command))
+
+            os.mkdir(os.path.join(self.directory.name, "tessdata"))
+            self.assertEqual(ocr._datapath(command=self.command), os.path.join(self.directory.name, "tessdata").encode())
+
+            os.environ["TESSDATA_PREFIX"] = "/usr/share/tessdata"
+            self.assertEqual(ocr._datapath(command=self.command), b"/usr/share/tessdata")
+
+    def test_init_fallback(self):
+        """
+        Test that engines failing to initialize fall back to the tesseract command, and that the fallback is logged.
+        """
+        pool = OCRPool(workers=1)
+        pool._available = True
+        pool._library = MockLibrary()
+
+        with mock.patch.object(ocr, "_datapath", return_value=None), mock.patch.object(ocr.pytesseract, "image_to_string", return_value="42") as command:
+            with self.assertLogs(LOGGER_NAME, level="WARNING"):
+                self.assertEqual(pool.image_to_string(image=Image.new("L", (10, 10))), "42")
+
+        command.assert_called_once()
+        self.assertFalse(pool.available)
+        self.assertEqual(pool.fallbacks, 1)
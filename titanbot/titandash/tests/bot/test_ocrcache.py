@@ -0,0 +1,101 @@
+"""
+test_ocrcache.py
+
+Test functionality related to caching the text parsed from regions of the game screen.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.ocrcache import OCRCache
+from titandash.bot.core.digits import process_stage
+from titandash.bot.core.frame import Frame
+
+import numpy as np
+
+
+class TestOCRCache(TestCase):
+    """Test functionality related to the ocr cache here."""
+    def setUp(self):
+        self.cache = OCRCache(size=2, ttl={"stage": 60, "skill": 60})
+        self.array = np.zeros((20, 40, 3), dtype=np.uint8)
+        self.array[5:15, 5:10] = 255
+        self.frame = Frame(image=self.array)
+        self.parsed = []
+
+    def parse(self, frame):
+        self.parsed.append(frame)
+        return "42"
+
+    def changed(self, value):
+        """Generate a frame with a single pixel of the background changed to the specified value."""
+        array = self.array.copy()
+        array[2, 30] = value
+        return Frame(image=array)
+
+    def test_parse_cached(self):
+        """Test that text parsed from an unchanged region is re-used without parsing again."""
+        self.assertEqual(self.cache.parse(kind="skill", frame=self.frame, parse=self.parse), "42")
+        self.assertEqual(self.cache.parse(kind="skill", frame=Frame(image=self.array.copy()), parse=self.parse), "42")
+
+        self.assertEqual(len(self.parsed), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_pixels_changed(self):
+        """Test that text is parsed again once the pixels of the region have changed."""
+        self.cache.parse(kind="skill", frame=self.frame, parse=self.parse)
+        self.cache.parse(kind="skill", frame=self.changed(value=100), parse=self.parse)
+
+        self.assertEqual(len(self.parsed), 2)
+
+    def preprocess(self, frame):
+        return process_stage(image=frame, scale=3, threshold=0)
+
+    def test_preprocessed(self):
+        """Test that preprocessed regions only parse the mask again once the mask read has changed."""
+        self.cache.parse(kind="stage", frame=self.frame, parse=self.parse, preprocess=self.preprocess)
+        self.cache.parse(kind="stage", frame=self.changed(value=100), parse=self.parse, preprocess=self.preprocess)
+        self.assertEqual(len(self.parsed), 1)
+        self.assertEqual(self.parsed[0].size, (120, 60))
+
+        self.cache.parse(kind="stage", frame=self.changed(value=255), parse=self.parse, preprocess=self.preprocess)
+        self.assertEqual(len(self.parsed), 2)
+
+    def test_preprocessed_blobs(self):
+        """Test that bright pixels removed while preprocessing never change the fingerprint of the mask."""
+        preprocess = lambda frame: process_stage(image=frame, scale=3)
+
+        self.cache.parse(kind="stage", frame=self.frame, parse=self.parse, preprocess=preprocess)
+        self.cache.parse(kind="stage", frame=self.changed(value=255), parse=self.parse, preprocess=preprocess)
+        self.assertEqual(len(self.parsed), 1)
+
+    def test_kinds(self):
+        """Test that text of different kinds parsed from the same pixels is cached separately."""
+        self.cache.parse(kind="stage", frame=self.frame, parse=self.parse)
+        self.cache.parse(kind="skill", frame=self.frame, parse=self.parse)
+
+        self.assertEqual(len(self.parsed), 2)
+
+    def test_expired(self):
+        """Test that text older than the time to live of its kind is parsed again."""
+        self.cache.parse(kind="skill", frame=self.frame, parse=self.parse)
+        self.cache.ttl = {"skill": -1}
+        self.cache.parse(kind="skill", frame=self.frame, parse=self.parse)
+
+        self.assertEqual(len(self.parsed), 2)
+        self.assertEqual(self.cache.expired, 1)
+
+    def test_uncached_kind(self):
+        """Test that kinds without a time to live are never cached."""
+        self.cache.parse(kind="clan_name", frame=self.frame, parse=self.parse)
+        self.cache.parse(kind="clan_name", frame=self.frame, parse=self.parse)
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(len(self.parsed), 2)
+
+    def test_evicted(self):
+        """Test that the least recently used text is evicted once the cache is full."""
+        for value in (100, 150, 200):
+            self.cache.parse(kind="skill", frame=self.changed(value=value), parse=self.parse)
+
+        self.assertEqual(len(self.cache), 2)
+        self.cache.parse(kind="skill", frame=self.changed(value=100), parse=self.parse)
+        self.assertEqual(len(self.parsed), 4)
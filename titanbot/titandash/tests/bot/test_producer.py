@@ -0,0 +1,105 @@
+"""
+test_producer.py
+
+Test functionality related to the background frame producer and its ring buffer.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.producer import FrameProducer
+from titandash.bot.core.grabber import Grabber
+
+import numpy as np
+import logging
+
+
+class MockWindow(object):
+    """Mock window producing sequentially numbered screenshots."""
+    def __init__(self):
+        self.hwnd = "MOCK"
+        self.generation = 0
+        self.screenshots = 0
+        self.producer = None
+
+    def screenshot(self, region=None):
+        self.screenshots += 1
+        return np.full((80, 48, 4), self.screenshots % 256, dtype=np.uint8)
+
+
+class TestFrameProducer(TestCase):
+    """Test functionality related to frame production here."""
+    def setUp(self):
+        self.window = MockWindow()
+        self.producer = FrameProducer(window=self.window, fps=100, size=3)
+
+    def tearDown(self):
+        self.producer.stop()
+
+    def test_no_frame(self):
+        """Test that no frame is returned before one is produced."""
+        self.assertEqual(self.producer.latest(), (None, None))
+
+    def test_latest_frame(self):
+        """Test that the latest frame is returned as a read-only view of the ring buffer, shared until a new frame is produced."""
+        self.producer.produce()
+        self.producer.produce()
+        frame, generation = self.producer.latest()
+
+        self.assertEqual(frame.pixel((0, 0)), (2, 2, 2))
+        self.assertEqual(generation, 0)
+        self.assertTrue(np.shares_memory(frame.array, self.producer._buffers[self.producer._latest]))
+        self.assertFalse(frame.array.flags.writeable)
+        self.assertIs(self.producer.latest()[0], frame)
+
+        self.producer.produce()
+        self.assertIsNot(self.producer.latest()[0], frame)
+
+    def test_leased_frame(self):
+        """Test that buffers viewed by a frame are never written into, the buffer is replaced in the ring instead."""
+        self.producer.produce()
+        frame = self.producer.latest()[0]
+        for i in range(10):
+            self.producer.produce()
+
+        self.assertEqual(frame.pixel((0, 0)), (1, 1, 1))
+        self.assertEqual(self.producer.replaced, 1)
+
+        # Buffers are re-used once the frame viewing them is released.
+        del frame
+        for i in range(10):
+            self.producer.produce()
+        self.assertEqual(self.producer.replaced, 1)
+
+    def test_ring_preallocated(self):
+        """Test that producing frames re-uses the same preallocated buffers."""
+        self.producer.produce()
+        buffers = self.producer._buffers
+        for i in range(10):
+            self.producer.produce()
+
+        self.assertIs(self.producer._buffers, buffers)
+        self.assertEqual(self.producer.latest()[0].pixel((0, 0)), (11, 11, 11))
+
+    def test_generation(self):
+        """Test that frames captured before a given generation are never returned."""
+        self.producer.produce()
+        self.window.generation += 1
+
+        self.assertEqual(self.producer.latest(generation=self.window.generation, timeout=0.01), (None, None))
+
+        self.producer.produce()
+        self.assertEqual(self.producer.latest(generation=self.window.generation)[1], 1)
+
+    def test_background_production(self):
+        """Test that started producers capture frames in the background and grabbers make use of them."""
+        self.window.producer = self.producer
+        self.producer.start()
+        grabber = Grabber(window=self.window, logger=logging.getLogger(__name__), staleness=60)
+
+        self.window.generation += 1
+        self.producer.latest(generation=self.window.generation, timeout=5)
+        grabber.snapshot()
+        self.producer.stop()
+
+        self.assertFalse(self.producer.running)
+        self.assertEqual(grabber.frames_produced, 1)
+        self.assertEqual(grabber.captures, 0)
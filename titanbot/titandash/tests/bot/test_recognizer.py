@@ -0,0 +1,91 @@
+"""
+test_recognizer.py
+
+Test functionality related to recognizing artifacts present in screenshots of the artifacts panel.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.recognizer import ArtifactRecognizer, RecognitionWorker
+from titandash.bot.core.templates import templates
+from titandash.bot.core.frame import Frame
+from titandash.bot.core.maps import ARTIFACT_MAP, ARTIFACT_COORDS
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+import cv2
+
+
+class TestArtifactRecognizer(TestCase):
+    """Test functionality related to the artifact recognizer here."""
+    def setUp(self):
+        self.recognizer = ArtifactRecognizer()
+        self.frames = [
+            Frame(image=Image.open(TEST_IMAGES["PANELS"][image]).convert("RGB")).crop(ARTIFACT_COORDS["parse_region"])
+            for image in ("artifacts_expanded", "artifacts_collapsed")
+        ]
+
+    def test_recognized_matches_search(self):
+        """Test that the artifacts recognized are the artifacts found when searching for each artifact individually."""
+        for frame in self.frames:
+            expected = set()
+            for name, path in ARTIFACT_MAP.items():
+                _, score, _, _ = cv2.minMaxLoc(cv2.matchTemplate(frame.gray, templates.get(path).image, cv2.TM_CCOEFF_NORMED))
+                if score >= 0.8:
+                    expected.add(name)
+
+            self.assertEqual(self.recognizer.recognize(frames=[frame]), expected)
+
+    def test_classify_position(self):
+        """Test that recognized artifacts are located at the same position as a search for the artifact."""
+        frame = self.frames[0]
+        for cell in self.recognizer.cells(frame=frame):
+            recognized = self.recognizer.classify(frame=frame, cell=cell)
+            if recognized is None:
+                continue
+
+            _, score, _, position = cv2.minMaxLoc(cv2.matchTemplate(frame.gray, templates.get(ARTIFACT_MAP[recognized.name]).image, cv2.TM_CCOEFF_NORMED))
+            self.assertEqual(recognized.position, position)
+            self.assertAlmostEqual(recognized.score, score, places=3)
+
+    def test_stops_when_resolved(self):
+        """Test that recognition stops once every artifact specified has been found."""
+        found = self.recognizer.recognize(frames=self.frames, artifacts=["swamp_gauntlet"])
+
+        # Swamp gauntlet is present in the second cell of the first frame, no other cells are recognized.
+        self.assertEqual(found, {"heroic_shield", "swamp_gauntlet"})
+
+
+class TestRecognitionWorker(TestCase):
+    """Test functionality related to recognizing artifacts on a background worker here."""
+    def setUp(self):
+        self.recognizer = ArtifactRecognizer()
+        self.frames = [
+            Frame(image=Image.open(TEST_IMAGES["PANELS"][image]).convert("RGB")).crop(ARTIFACT_COORDS["parse_region"])
+            for image in ("artifacts_expanded", "artifacts_collapsed")
+        ]
+
+    def test_worker_recognizes_frames(self):
+        """Test that every frame submitted to the worker is recognized."""
+        worker = RecognitionWorker(recognizer=self.recognizer, size=1)
+        worker.start()
+        for frame in self.frames:
+            worker.submit(frame=frame)
+
+        self.assertEqual(worker.finish(), self.recognizer.recognize(frames=self.frames))
+        self.assertEqual(worker.processed, len(self.frames))
+
+    def test_worker_resolved(self):
+        """Test that the worker is resolved once every artifact specified has been found, skipping any remaining frames."""
+        worker = RecognitionWorker(recognizer=self.recognizer, artifacts=["swamp_gauntlet"])
+        worker.start()
+        for frame in self.frames:
+            worker.submit(frame=frame)
+        worker.finish()
+
+        self.assertTrue(worker.resolved)
+        self.assertEqual(worker.processed, 1)
+
+    def test_worker_nothing_to_find(self):
+        """Test that a worker looking for no artifacts is resolved right away."""
+        self.assertTrue(RecognitionWorker(recognizer=self.recognizer, artifacts=[]).resolved)
@@ -0,0 +1,95 @@
+"""
+test_state.py
+
+Test functionality related to classifying the state of the game screen.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.grabber import Grabber
+from titandash.bot.core.state import ScreenClassifier, STATE_IMAGES, PANELS
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+from titandash.tests.bot.test_grabber import MockWindow
+
+from PIL import Image
+
+import logging
+
+
+class TestScreenClassifier(TestCase):
+    """Test functionality related to the screen classifier here."""
+    def classify(self, image):
+        self.grabber = Grabber(window=MockWindow(image=Image.open(image).convert("RGB")), logger=logging.getLogger(__name__))
+        self.grabber.snapshot()
+        self.classifier = ScreenClassifier(grabber=self.grabber)
+
+        return self.classifier.classify(testing=True)
+
+    def test_panels(self):
+        """Test that the open panel, and whether or not it's collapsed or expanded is classified."""
+        for panel in PANELS:
+            if panel == "shop":
+                continue
+            for collapsed in (True, False):
+                state = self.classify(image=TEST_IMAGES["PANELS"]["{panel}_{state}".format(panel=panel, state="collapsed" if collapsed else "expanded")])
+
+                self.assertEqual(state.panel, panel)
+                self.assertEqual(state.collapsed, collapsed)
+                self.assertEqual(state.expanded, not collapsed)
+                self.assertEqual(state.screen, collapsed)
+                self.assertTrue(state.exit)
+                self.assertFalse(state.transition)
+
+    def test_shop(self):
+        """Test that the shop panel is classified, the shop can not be collapsed or expanded."""
+        state = self.classify(image=TEST_IMAGES["PANELS"]["shop_open"])
+
+        self.assertEqual(state.panel, "shop")
+        self.assertFalse(state.collapsed or state.expanded or state.screen)
+
+    def test_no_panel(self):
+        """Test that the game screen is classified when no panel is open."""
+        state = self.classify(image=TEST_IMAGES["PANELS"]["no_panel_open"])
+
+        self.assertIsNone(state.panel)
+        self.assertTrue(state.screen)
+        self.assertFalse(state.exit or state.prompt or state.transition)
+
+    def test_ad(self):
+        """Test that ad prompts are classified."""
+        state = self.classify(image=TEST_IMAGES["ADS"]["skill_prompt"])
+
+        self.assertTrue(state.ad)
+        self.assertTrue(state.prompt)
+
+    def test_matches_search(self):
+        """Test that every image classified is found when searched for individually."""
+        state = self.classify(image=TEST_IMAGES["PANELS"]["master_collapsed"])
+        for image in STATE_IMAGES:
+            self.assertEqual(state.found(image=image), self.grabber.search(image=image, bool_only=True, testing=True), image)
+
+    def test_lazy(self):
+        """Test that only the images required by the features accessed are ever matched."""
+        state = self.classify(image=TEST_IMAGES["PANELS"]["master_collapsed"])
+        self.assertEqual(len(state.hits), 0)
+
+        self.assertTrue(state.is_open(panel="master"))
+        self.assertEqual(list(state.hits), [PANELS["master"]])
+
+        self.assertTrue(state.exit)
+        self.assertFalse(state.transition)
+        self.assertLess(len(state.hits), len(STATE_IMAGES))
+
+    def test_panel_stops_early(self):
+        """Test that the open panel is classified without matching the remaining panels."""
+        state = self.classify(image=TEST_IMAGES["PANELS"]["master_collapsed"])
+
+        self.assertEqual(state.panel, "master")
+        self.assertNotIn(PANELS["shop"], state.hits)
+
+    def test_cached(self):
+        """Test that classifying the same frame again re-uses the last state classified."""
+        state = self.classify(image=TEST_IMAGES["PANELS"]["no_panel_open"])
+        self.assertIs(self.classifier.classify(testing=True), state)
+
+        self.grabber.snapshot(force=True)
+        self.assertIsNot(self.classifier.classify(testing=True), state)
@@ -0,0 +1,66 @@
+"""
+test_templates.py
+
+Test functionality related to the template bank used to store all preloaded bot images.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.templates import TemplateBank, Template, TemplateLoadError
+from titandash.bot.core.frame import Frame
+from titandash.bot.core.maps import IMAGES, ARTIFACT_MAP
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+import cv2
+
+
+class TestTemplateBank(TestCase):
+    """Test functionality related to the template bank here."""
+    def setUp(self):
+        self.bank = TemplateBank()
+
+    def test_preload_all_templates(self):
+        """Test that every image and artifact is loaded into the bank."""
+        self.bank.preload()
+
+        for path in [path for group in IMAGES.values() for path in group.values()] + list(ARTIFACT_MAP.values()):
+            self.assertTrue(path in self.bank)
+
+    def test_template_shared(self):
+        """Test that retrieving a template multiple times returns the same decoded template."""
+        path = IMAGES["GENERIC"]["exit_panel"]
+
+        self.assertIs(self.bank.get(path), self.bank.get(path))
+        self.assertIs(self.bank.get(self.bank.get(path)), self.bank.get(path))
+
+    def test_template_shape(self):
+        """Test that templates contain the grayscale image and proper shape metadata."""
+        path = IMAGES["NO_PANELS"]["settings"]
+        template = self.bank.get(path)
+
+        self.assertEqual(template.image.ndim, 2)
+        self.assertEqual(template.shape, cv2.imread(path).shape[:2])
+        self.assertEqual((template.height, template.width), template.shape)
+
+    def test_template_from_array(self):
+        """Test that decoded arrays are converted into unstored templates."""
+        template = self.bank.get(cv2.imread(IMAGES["GENERIC"]["exit_panel"]))
+
+        self.assertTrue(isinstance(template, Template))
+        self.assertEqual(template.image.ndim, 2)
+        self.assertEqual(len(self.bank), 0)
+
+    def test_invalid_template(self):
+        """Test that an invalid template path raises an error."""
+        with self.assertRaises(TemplateLoadError):
+            self.bank.get("invalid/path/to/template.png")
+
+    def test_template_signature(self):
+        """Test that template signatures only fail where the template clearly isn't present."""
+        frame = Frame(image=Image.open(TEST_IMAGES["PANELS"]["no_panel_open"]))
+        signature = self.bank.get(IMAGES["NO_PANELS"]["master_damage"]).signature
+
+        self.assertTrue(signature.check(frame=frame, position=(15, 626)))
+        self.assertTrue(signature.check(frame=frame, position=(16, 627)))
+        self.assertFalse(signature.check(frame=frame, position=(100, 100)))
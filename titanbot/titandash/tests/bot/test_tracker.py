@@ -0,0 +1,150 @@
+"""
+test_tracker.py
+
+Test functionality related to tracking the current stage as the stage region changes.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.grabber import Grabber
+from titandash.bot.core.tracker import StageTracker
+from titandash.bot.core.digits import RecognizedNumber
+from titandash.bot.core.maps import STAGE_COORDS
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+from titandash.tests.bot.test_grabber import MockWindow
+
+from PIL import Image
+
+import logging
+
+
+class MockProps(object):
+    """Mock props used to record the stages published by a tracker."""
+    def __init__(self):
+        self.current_stage = None
+        self.updates = []
+
+    def update(self, **values):
+        self.updates.append(values)
+        for key, value in values.items():
+            setattr(self, key, value)
+
+
+class TestStageTracker(TestCase):
+    """Test functionality related to the stage tracker here."""
+    def setUp(self):
+        self.window = MockWindow(image=Image.open(TEST_IMAGES["PANELS"]["no_panel_open"]).convert("RGB"))
+        self.grabber = Grabber(window=self.window, logger=logging.getLogger(__name__), staleness=60)
+        self.props = MockProps()
+        self.parsed = []
+        self.stage = "100"
+
+        self.tracker = StageTracker(grabber=self.grabber, props=self.props, parse=self.parse, logger=logging.getLogger(__name__))
+        self.tracker.start()
+
+    def parse(self, frame):
+        self.parsed.append(frame)
+        return RecognizedNumber(text=self.stage, score=0.9, margin=0.3, confident=True)
+
+    def capture(self, stage=False, track=True):
+        """Capture a new frame, optionally changing the pixels of the stage region, and track the stage."""
+        if stage:
+            image = self.window.image.copy()
+            x, y = STAGE_COORDS["region"][:2]
+            image.paste((255, 255, 255), (x, y, x + 10, y + 10))
+            self.window.image = image
+
+        self.window.click()
+        self.grabber.snapshot()
+        if track:
+            self.tracker.track()
+
+    def test_observe_defers(self):
+        """Test that capturing frames only checks the stage region, the stage is parsed once it's tracked."""
+        self.capture(track=False)
+        self.assertEqual(self.parsed, [])
+        self.assertEqual(self.tracker.changes, 1)
+
+        self.tracker.track()
+        self.assertEqual(len(self.parsed), 1)
+        self.assertEqual(self.props.current_stage, 100)
+
+    def test_parsed_once_unchanged(self):
+        """Test that the stage is only parsed once while the stage region is unchanged."""
+        for i in range(3):
+            self.capture()
+
+        self.assertEqual(len(self.parsed), 1)
+        self.assertEqual(self.tracker.stats(), {"frames": 3, "changes": 1, "change_rate": round(1 / 3, 4)})
+
+    def test_parsed_changed(self):
+        """Test that the stage is parsed again and published once the stage region changes."""
+        self.capture()
+        self.stage = "101"
+        self.capture(stage=True)
+
+        self.assertEqual(len(self.parsed), 2)
+        self.assertEqual(self.props.current_stage, 101)
+        self.assertEqual(self.props.current_stage_confidence, 0.9)
+        self.assertAlmostEqual(self.props.current_stage_changed.timestamp(), self.grabber.current.timestamp, places=3)
+        self.assertEqual(self.tracker.last_stage, 100)
+
+    def test_same_stage(self):
+        """Test that a changed region parsed as the current stage isn't published again."""
+        self.capture()
+        self.capture(stage=True)
+
+        self.assertEqual(len(self.parsed), 2)
+        self.assertEqual(len(self.props.updates), 1)
+
+    def test_invalid_stage(self):
+        """Test that stages that can't be parsed, or aren't valid are never published."""
+        self.stage = ""
+        self.capture()
+
+        self.tracker.validate = lambda stage: stage < 100
+        self.stage = "100"
+        self.capture(stage=True)
+
+        self.assertEqual(len(self.parsed), 2)
+        self.assertIsNone(self.props.current_stage)
+
+    def test_retry(self):
+        """Test that a change that can't be parsed is parsed again once tracked, and published once it's parsed."""
+        self.stage = ""
+        self.capture()
+        self.assertIsNone(self.props.current_stage)
+
+        self.stage = "100"
+        self.tracker.track()
+
+        self.assertEqual(len(self.parsed), 2)
+        self.assertEqual(self.props.current_stage, 100)
+        self.assertAlmostEqual(self.props.current_stage_changed.timestamp(), self.grabber.current.timestamp, places=3)
+
+        # Published changes are never parsed again.
+        self.tracker.track()
+        self.assertEqual(len(self.parsed), 2)
+
+    def test_track(self):
+        """Test that tracking re-uses the last frame captured, without capturing a new frame or checking it again."""
+        self.capture()
+        self.tracker.track()
+
+        self.assertEqual(self.window.screenshots, 1)
+        self.assertEqual(len(self.parsed), 1)
+        self.assertEqual(self.tracker.frames, 1)
+
+    def test_track_unobserved(self):
+        """Test that tracking checks the stage region itself when no full frame was observed."""
+        self.tracker.stop()
+        self.capture()
+
+        self.assertEqual(len(self.parsed), 1)
+        self.assertEqual(self.tracker.frames, 1)
+
+    def test_stop(self):
+        """Test that frames captured once a tracker is stopped are not observed."""
+        self.tracker.stop()
+        self.capture(track=False)
+
+        self.assertEqual(self.tracker.frames, 0)
@@ -0,0 +1,112 @@
+"""
+test_window.py
+
+Test functionality related to windows and their cached geometry.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.window import Window, WindowHandler, WindowNotFoundError, InvalidHwndValue
+
+import numpy as np
+
+
+class MockBackend(object):
+    """Mock capture backend grabbing the window at a fixed size."""
+    def __init__(self, size):
+        self.size = size
+
+    def grab(self, region=None):
+        return np.zeros((self.size[1], self.size[0], 4), dtype=np.uint8)
+
+
+class TestWindowGeometry(TestCase):
+    """Test functionality related to window geometry caching here."""
+    def setUp(self):
+        self.window = Window(hwnd="DEBUG")
+
+    def test_geometry_cached(self):
+        """Test that window geometry is only retrieved once while it's not expired."""
+        geometry = self.window.geometry
+
+        self.assertIs(self.window.geometry, geometry)
+        self.assertEqual((self.window.width, self.window.height), (480, 800))
+        self.assertEqual((self.window.x, self.window.y), (0, 0))
+
+    def test_geometry_expired(self):
+        """Test that expired window geometry is retrieved again."""
+        geometry = self.window.geometry
+        self.window.ttl = -1
+
+        self.assertIsNot(self.window.geometry, geometry)
+        self.assertEqual(self.window.changes, 0)
+
+    def test_geometry_change(self):
+        """Test that geometry changes are detected when refreshed."""
+        self.window.EMULATOR_HEIGHT = 832
+        self.window.refresh()
+
+        self.assertEqual(self.window.changes, 1)
+        self.assertEqual(self.window.y_padding, 32)
+
+    def test_geometry_capture_mismatch(self):
+        """Test that captures sized differently than the cached geometry refresh the geometry right away."""
+        self.window.geometry
+        self.window.EMULATOR_HEIGHT = 832
+        self.window.backend = MockBackend(size=(480, 832))
+
+        image = self.window.screenshot()
+
+        self.assertEqual(self.window.changes, 1)
+        self.assertEqual(self.window.y_padding, 32)
+        self.assertEqual(image.shape[:2], (800, 480))
+
+        self.window.screenshot()
+        self.assertEqual(self.window.changes, 1)
+
+
+class TestWindowHandler(TestCase):
+    """Test functionality related to the window handler registry here."""
+    def setUp(self):
+        self.handler = WindowHandler()
+        self.handler.enum()
+
+    def test_registry_persistent(self):
+        """Test that enumerating windows again re-uses any windows already present."""
+        windows = dict(self.handler.windows)
+        self.handler.enum()
+
+        for hwnd, window in self.handler.windows.items():
+            if hwnd in windows:
+                self.assertIs(window, windows[hwnd])
+
+    def test_registry_shared(self):
+        """Test that every handler shares the same window registry."""
+        self.assertIs(WindowHandler().windows, self.handler.windows)
+
+    def test_filter(self):
+        """Test that filtered windows are always a subset of all windows."""
+        filtered = self.handler.filter()
+        unfiltered = self.handler.filter(filter_titles=False, ignore_hidden=False, ignore_smaller=False)
+
+        self.assertEqual(set(unfiltered), set(self.handler.windows))
+        self.assertTrue(set(filtered).issubset(set(unfiltered)))
+
+    def test_index_geometry(self):
+        """Test that window filtering is only indexed again once the title or rect of a window changes."""
+        window = Window(hwnd="DEBUG")
+        self.addCleanup(self.handler._index.pop, window.hwnd, None)
+
+        entry = self.handler._indexed(window=window)
+        window.refresh()
+        self.assertIs(self.handler._indexed(window=window), entry)
+
+        window.EMULATOR_HEIGHT = 832
+        window.refresh()
+        self.assertIsNot(self.handler._indexed(window=window), entry)
+
+    def test_grab_invalid(self):
+        """Test that grabbing invalid or missing windows raises an error."""
+        with self.assertRaises(InvalidHwndValue):
+            self.handler.grab(hwnd="invalid")
+        with self.assertRaises(WindowNotFoundError):
+            self.handler.grab(hwnd=-1)
@@ -21,6 +21,7 @@ from titandash.models.prestige import Prestige
 from titandash.models.queue import Queue
 
 from titandash.bot.core.window import WindowHandler, Window
+from titandash.bot.core.frame import Frame
 from titandash.bot.core.decorators import BotProperty
 
 from io import BytesIO
@@ -690,7 +691,9 @@ def screen(request):
     inst = BotInstance.objects.get(pk=request.GET.get("instance"))
     window = inst.window
 
-    grab = Window(hwnd=window["hwnd"]).screenshot().resize((360, 600), ANTIALIAS)
+    window = Window(hwnd=window["hwnd"])
+    grab = Frame(image=window.screenshot()).image.resize((360, 600), ANTIALIAS)
+    window.close()
     buffered = BytesIO()
     grab.save(buffered, format="JPEG", quality=30)
 